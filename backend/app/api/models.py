@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 
 class BoundingBox(BaseModel):
@@ -24,7 +24,13 @@ class DamageResponse(BaseModel):
     longitude: float
     confidence_score: float
     detected_at: datetime
-    image_url: str
+    # Records stored by a re-analysis have no image
+    image_url: Optional[str] = None
+
+
+class DamagePage(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None
 
 
 class ProcessingStatusResponse(BaseModel):
@@ -33,6 +39,61 @@ class ProcessingStatusResponse(BaseModel):
     processed_frames: int
     detections_found: int
     error_message: Optional[str] = None
+    profile_url: Optional[str] = None
+    raw_outputs: bool = False
+    reanalysis_of: Optional[str] = None
+    frames_from_index: int = 0
+    frame_index_hit_pct: float = 0.0
+
+
+class RunDetectionResponse(BaseModel):
+    id: str
+    frame_number: int
+    class_id: int
+    confidence: float
+    bbox: List[int]
+
+
+class ReanalysisResponse(BaseModel):
+    job_id: str
+    reanalysis_of: str
+    status: str
+    settings: dict
+    processed_frames: int
+    detections_found: int
+    unchanged: int
+    added: List[RunDetectionResponse]
+    restored: List[RunDetectionResponse] = []
+    removed: List[RunDetectionResponse]
+    duration_ms: float
+
+
+class ImageDetectionResponse(BaseModel):
+    id: str
+    damage_type: str
+    class_id: int
+    confidence: float
+    bbox: List[int]
+
+
+class ImageResultResponse(BaseModel):
+    filename: str
+    status: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    detections: List[ImageDetectionResponse] = []
+    error_message: Optional[str] = None
+
+
+class ImageBatchResponse(BaseModel):
+    job_id: str
+    status: str
+    images: int
+    processed_images: int
+    detections_found: int
+    error_message: Optional[str] = None
+    duration_ms: Optional[float] = None
+    results: Optional[List[ImageResultResponse]] = None
 
 
 class VideoMetadata(BaseModel):
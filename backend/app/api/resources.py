@@ -0,0 +1,153 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+import logging
+from fastapi import Request
+from app.services.clustering import DamageClusterService, TileCache
+from app.services.frame_index import PerceptualFrameIndex
+from app.services.model_registry import ModelRegistry
+from app.services.raw_outputs import RawOutputStore
+from app.services.response_cache import ResponseCache
+from app.services.spool import DetectionSpool
+from app.services.storage_backend import create_storage_backend
+from app.services.storage_service import DamageStorageService
+from app.services.video_index import ProcessedVideoIndex
+from app.utils.loop_lag import LoopLagMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class AppResources:
+    """Long-lived objects shared by every request.
+    
+    Built and started by the application lifespan and closed on shutdown,
+    so importing the API builds nothing and opens no connections.
+    """
+    
+    def __init__(
+        self,
+        storage_service: DamageStorageService,
+        damages_cache: ResponseCache,
+        cluster_service: DamageClusterService,
+        model_registry: ModelRegistry,
+        inference_executor: ThreadPoolExecutor,
+        loop_monitor: Optional[LoopLagMonitor] = None,
+        raw_output_store: Optional[RawOutputStore] = None,
+        video_index: Optional[ProcessedVideoIndex] = None,
+        frame_index: Optional[PerceptualFrameIndex] = None,
+        decode_executor: Optional[ThreadPoolExecutor] = None
+    ):
+        self.storage_service = storage_service
+        self.damages_cache = damages_cache
+        self.cluster_service = cluster_service
+        self.model_registry = model_registry
+        self.inference_executor = inference_executor
+        self.loop_monitor = loop_monitor
+        self.raw_output_store = raw_output_store
+        self.video_index = video_index
+        self.frame_index = frame_index
+        self.decode_executor = decode_executor
+        self.startup_ms: Dict[str, float] = {}
+        self.started = False
+    
+    @classmethod
+    def create(cls, settings, storage_service: Optional[DamageStorageService] = None) -> "AppResources":
+        """Build every resource from ``settings``; benchmarks may pass their own storage service"""
+        if storage_service is None:
+            storage_service = DamageStorageService(
+                create_storage_backend(settings),
+                spool=DetectionSpool(settings.spool_dir) if settings.spool_enabled else None
+            )
+        
+        # Dashboards poll /damages/latest; serve repeats from memory until this
+        # process inserts new damage or the TTL runs out
+        damages_cache = ResponseCache(
+            ttl_seconds=settings.damages_cache_ttl_seconds,
+            max_entries=settings.damages_cache_max_entries
+        )
+        storage_service.add_insert_listener(lambda records: damages_cache.invalidate())
+        
+        # Map viewports are served as per-tile clusters, invalidated tile by
+        # tile as detections are inserted
+        cluster_service = DamageClusterService(
+            storage_service,
+            grid_size=settings.cluster_grid_size,
+            max_zoom=settings.cluster_max_zoom,
+            max_tiles=settings.cluster_max_tiles,
+            max_points=settings.cluster_max_points,
+            page_size=settings.cluster_page_size,
+            cache=TileCache(
+                max_entries=settings.cluster_tile_cache_size,
+                ttl_seconds=settings.cluster_tile_ttl_seconds
+            ),
+            max_load_points=settings.cluster_max_load_points
+        )
+        
+        # Frames close to one analysed in an earlier job reuse its detections
+        frame_index = None
+        if settings.frame_index_enabled:
+            frame_index = PerceptualFrameIndex(
+                method=settings.frame_index_method,
+                max_distance=settings.frame_index_max_distance,
+                max_entries=settings.frame_index_max_entries,
+                ttl_seconds=settings.frame_index_ttl_seconds
+            )
+        
+        return cls(
+            storage_service,
+            damages_cache,
+            cluster_service,
+            ModelRegistry(settings.model_path),
+            ThreadPoolExecutor(max_workers=settings.inference_workers, thread_name_prefix="inference"),
+            LoopLagMonitor(settings.loop_lag_interval_ms / 1000) if settings.loop_lag_interval_ms > 0 else None,
+            RawOutputStore(settings.raw_outputs_dir),
+            ProcessedVideoIndex(settings.video_index_path) if settings.video_dedup_enabled else None,
+            frame_index,
+            # Photo batches decode on their own pool; cv2 releases the GIL
+            ThreadPoolExecutor(max_workers=settings.image_decode_workers, thread_name_prefix="image-decode")
+        )
+    
+    async def start(self, preload_model: bool = False):
+        start = time.perf_counter()
+        self.storage_service.start()
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+        self.startup_ms["storage"] = (time.perf_counter() - start) * 1000
+        
+        if preload_model:
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self.inference_executor, self.model_registry.preload)
+            except Exception as e:
+                # Reads keep working; readiness reports the model as unavailable
+                logger.error(f"Model preload failed: {e}")
+            self.startup_ms["model"] = (time.perf_counter() - start) * 1000
+        
+        self.started = True
+    
+    async def close(self):
+        self.started = False
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        await self.storage_service.close()
+        self.inference_executor.shutdown(wait=True)
+        if self.decode_executor is not None:
+            self.decode_executor.shutdown(wait=True)
+        self.model_registry.close()
+        if self.video_index is not None:
+            self.video_index.close()
+    
+    async def check_storage(self, timeout: float) -> bool:
+        """Whether the storage backend answers a trivial query within ``timeout``"""
+        backend = self.storage_service.backend
+        try:
+            return await asyncio.wait_for(self.storage_service._run_read(backend.test_connection), timeout)
+        except Exception as e:
+            logger.warning(f"Storage readiness check failed: {e}")
+            return False
+
+
+def get_resources(request: Request) -> AppResources:
+    return request.app.state.resources
@@ -1,82 +1,289 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from datetime import datetime
+from functools import partial
+from typing import List, Optional
+import asyncio
+import hashlib
 import logging
 import os
+import time
 import uuid
-from app.api.models import DamageResponse, ProcessingStatusResponse
-from app.services.video_processor import VideoProcessor
-from app.services.onnx_service import ONNXModelService
+from app.api.models import (
+    DamagePage,
+    DamageResponse,
+    ImageBatchResponse,
+    ProcessingStatusResponse,
+    ReanalysisResponse
+)
+from app.api.resources import AppResources, get_resources
 from app.services.detection_tracker import DetectionTracker
-from app.services.storage_service import DamageStorageService
-from app.services.supabase_client import SupabaseClientService
+from app.services.damage_query import (
+    DEFAULT_FIELDS,
+    ROAD_DAMAGE_COLUMNS,
+    DamageQuery,
+    decode_cursor,
+    parse_fields
+)
+from app.services.export import EXPORT_FORMATS, create_exporter, stream_export
+from app.services.frame_index import gps_bucket
+from app.services.http_pool import pool_stats
+from app.services.image_batch import ImageInput, decode_for_model, expand_archives, image_result
+from app.services.profiler import SamplingProfiler, profile_paths, save_profile
+from app.services.reanalysis import diff_run, run_detection, run_manifest, track_raw_outputs
+from app.services.response_cache import etag_matches
 from app.config import settings
-from app.utils.errors import VideoError, ModelError, StorageError
+from app.utils.errors import ImageError, ModelError, ProcessingError, StorageError, VideoError
+from app.utils.fast_json import FastJSONResponse, dumps
+from app.utils.hashing import file_sha256
+from app.utils.metrics import (
+    DETECTIONS_TOTAL,
+    DUPLICATE_UPLOADS_TOTAL,
+    DUPLICATES_TOTAL,
+    ERRORS_TOTAL,
+    FRAME_INDEX_ENTRIES,
+    FRAME_INDEX_HITS_TOTAL,
+    FRAMES_TOTAL,
+    IMAGES_TOTAL,
+    JOBS_IN_PROGRESS,
+    JOBS_TOTAL,
+    STAGE_SECONDS
+)
+from app.utils.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1")
 
-# Initialize services
-supabase_service = SupabaseClientService()
-storage_service = DamageStorageService(supabase_service)
-
 # Job status tracking (in-memory for simplicity)
 job_status = {}
 
 
 @router.post("/process-video")
-async def process_video(video: UploadFile = File(...)):
-    """Process uploaded video for road damage detection"""
+async def process_video(
+    video: UploadFile = File(...),
+    profile: bool = Query(default=False, description="Profile this job; download via /processing-status/{job_id}/profile"),
+    keep_raw: bool = Query(default=False, description="Keep the raw model output so the job can be re-analysed"),
+    force: bool = Query(default=False, description="Process the video even if the same file was processed before"),
+    latitude: Optional[float] = Query(default=None, ge=-90, le=90, description="Where the video was shot; narrows frame index matches"),
+    longitude: Optional[float] = Query(default=None, ge=-180, le=180),
+    resources: AppResources = Depends(get_resources)
+):
+    """Process uploaded video for road damage detection.
+    
+    A video already processed with the same model and settings is not run
+    again: its earlier job is returned, unless ``force`` is set.
+    """
     job_id = str(uuid.uuid4())
     
+    if profile and not settings.profiling_enabled:
+        raise HTTPException(status_code=400, detail="Job profiling is disabled on this server")
+    
     try:
-        # Validate file size
-        file_size_mb = 0
         temp_path = f"./uploads/{job_id}_{video.filename}"
-        
         os.makedirs("./uploads", exist_ok=True)
         
-        # Save uploaded file
-        with open(temp_path, "wb") as f:
-            content = await video.read()
-            file_size_mb = len(content) / (1024 * 1024)
-            
-            if file_size_mb > settings.max_video_size_mb:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Video size exceeds maximum allowed size of {settings.max_video_size_mb}MB"
+        # Stream the upload to disk, hashing it on the way, instead of
+        # holding the whole file in memory
+        video_hash = await _save_upload(video, temp_path)
+        
+        previous = None
+        if resources.video_index is not None and not force:
+            try:
+                model_version = await asyncio.to_thread(lambda: resources.model_registry.get().version)
+            except ModelError:
+                # The job itself reports the model failure
+                model_version = None
+            if model_version is not None:
+                previous = await asyncio.to_thread(
+                    resources.video_index.lookup, video_hash, model_version, _dedup_settings()
                 )
-            
-            f.write(content)
+            # Asked to keep raw output that the earlier job did not keep
+            if previous is not None and keep_raw:
+                if await asyncio.to_thread(resources.raw_output_store.load_run, previous.job_id) is None:
+                    previous = None
+        if previous is not None:
+            os.remove(temp_path)
+            DUPLICATE_UPLOADS_TOTAL.inc()
+            logger.info(f"Upload {video.filename} was processed before as job {previous.job_id}")
+            # The job may predate this process
+            job_status.setdefault(previous.job_id, {
+                "status": "completed",
+                "processed_frames": previous.processed_frames,
+                "detections_found": previous.detections_found,
+                "error_message": None
+            })
+            return {
+                "job_id": previous.job_id,
+                "status": "completed",
+                "deduplicated": True,
+                "processed_frames": previous.processed_frames,
+                "detections_found": previous.detections_found
+            }
         
         # Initialize job status
         job_status[job_id] = {
             "status": "processing",
             "processed_frames": 0,
             "detections_found": 0,
+            "frames_from_index": 0,
             "error_message": None
         }
         
+        location = (latitude, longitude) if latitude is not None and longitude is not None else None
+        
+        # Only profiled jobs start a sampler; the rest run untouched. It
+        # samples this event loop thread, which decodes and tracks, and the
+        # inference threads while they run this job's frames
+        profiler = None
+        if profile:
+            profiler = SamplingProfiler(interval=settings.profile_interval_ms / 1000)
+            profiler.attach()
+            profiler.start()
+        
         # Process video (simplified synchronous version)
         try:
-            await process_video_task(job_id, temp_path, video.filename)
+            await process_video_task(
+                resources,
+                job_id,
+                temp_path,
+                video.filename,
+                keep_raw=keep_raw,
+                video_hash=video_hash,
+                location=location,
+                profiler=profiler
+            )
         except Exception as e:
             logger.error(f"Video processing failed: {e}")
             job_status[job_id]["status"] = "failed"
             job_status[job_id]["error_message"] = str(e)
+        finally:
+            if profiler is not None:
+                profiler.stop()
+                profiler.detach()
+                await asyncio.to_thread(
+                    save_profile, profiler, settings.profile_dir, job_id, settings.profile_top_n
+                )
+                job_status[job_id]["profile_url"] = f"{router.prefix}/processing-status/{job_id}/profile"
         
-        return {"job_id": job_id, "status": job_status[job_id]["status"]}
-        
+        return {"job_id": job_id, "status": job_status[job_id]["status"], "deduplicated": False}
+    
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Video upload failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def process_video_task(job_id: str, video_path: str, video_filename: str):
-    """Background task to process video"""
+async def _save_upload(video: UploadFile, path: str) -> str:
+    """Write ``video`` to ``path`` chunk by chunk and return its SHA-256"""
+    digest = hashlib.sha256()
+    max_bytes = settings.max_video_size_mb * 1024 * 1024
+    chunk_size = settings.upload_chunk_size_kb * 1024
+    size = 0
     try:
-        # Initialize services
-        model_service = ONNXModelService(settings.model_path)
+        with open(path, "wb") as f:
+            while True:
+                chunk = await video.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Video size exceeds maximum allowed size of {settings.max_video_size_mb}MB"
+                    )
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return digest.hexdigest()
+
+
+def _infer_and_record(model_service, image, min_confidence: float, timer: StageTimer, raw_writer, frame_number: int):
+    # Same steps as model_service.infer, keeping the raw output for re-analysis
+    raw_output = model_service.infer_raw(image, timer)
+    raw_writer.append(frame_number, raw_output)
+    with timer.measure("postprocess"):
+        return model_service.postprocess_output(raw_output, min_confidence, image.shape)
+
+
+def _detect_with_index(frame_index, bucket, exclude_source, lookup: bool, image, infer, timer: StageTimer):
+    """Detections of the closest indexed frame, else ``infer()``'s, indexed for later jobs.
+    
+    Returns ``(detections, from_index)``.
+    """
+    with timer.measure("frame_hash"):
+        frame_hash = frame_index.hash_frame(image)
+    if lookup:
+        match = frame_index.lookup(frame_hash, image.shape, bucket, exclude_source)
+        if match is not None:
+            return match.detections, True
+    detections = infer()
+    frame_index.add(frame_hash, image.shape, detections, bucket, exclude_source or "")
+    return detections, False
+
+
+def _job_settings() -> dict:
+    return {
+        "confidence_threshold": settings.confidence_threshold,
+        "iou_threshold": settings.iou_threshold,
+        "tracking_window_size": settings.tracking_window_size,
+        "frame_stride": max(1, settings.frame_stride)
+    }
+
+
+def _dedup_settings() -> dict:
+    # Everything that changes what a job stores for the same video and model
+    return {
+        **_job_settings(),
+        "image_output_mode": settings.image_output_mode,
+        "image_format": settings.image_format,
+        # Only present when on, so enabling it leaves earlier entries valid
+        **({"frame_index_max_distance": settings.frame_index_max_distance} if settings.frame_index_enabled else {})
+    }
+
+
+def _lost_detections(storage_service) -> int:
+    # Detections that never reached the database: failed encodes or uploads,
+    # and records the write buffer gave up on
+    return storage_service.failed_detections + storage_service.write_buffer.dead_lettered
+
+
+async def process_video_task(
+    resources: AppResources,
+    job_id: str,
+    video_path: str,
+    video_filename: str,
+    keep_raw: bool = False,
+    video_hash: Optional[str] = None,
+    location: Optional[tuple] = None,
+    profiler: Optional[SamplingProfiler] = None
+):
+    """Background task to process video.
+    
+    ``video_hash`` is the video's SHA-256 when the caller already has it;
+    completed jobs with a hash are added to the processed-video index. Jobs
+    that lost detections to storage failures end as ``partial`` instead.
+    ``location`` is an optional ``(latitude, longitude)`` of the video,
+    used to only match frame index entries shot nearby. With a
+    ``profiler``, inference threads are attached to it while they run
+    this job's frames.
+    """
+    # Decoding needs cv2; loaded with the first job rather than at import
+    from app.services.video_processor import VideoProcessor
+    
+    storage_service = resources.storage_service
+    loop = asyncio.get_running_loop()
+    frame_errors = ERRORS_TOTAL.labels("frame")
+    lost_before = _lost_detections(storage_service)
+    JOBS_IN_PROGRESS.inc()
+    try:
+        # The registry loads the model once and reuses it across jobs; the
+        # load blocks, so it runs off the event loop
+        model_service = await asyncio.to_thread(resources.model_registry.get)
         video_processor = VideoProcessor(video_path)
         tracker = DetectionTracker(
             window_size=settings.tracking_window_size,
@@ -87,50 +294,188 @@ async def process_video_task(job_id: str, video_path: str, video_filename: str):
         metadata = video_processor.validate_video()
         logger.info(f"Processing video: {metadata.dict()}")
         
-        # Process frames
-        for frame in video_processor.extract_frames():
+        # With raw output kept, every inferred frame's model output and the
+        # detections stored are saved for /reanalyze, keyed by the video's
+        # content and the model version
+        raw_writer = None
+        run_detections = []
+        if keep_raw or settings.raw_outputs_enabled:
+            video_hash = video_hash or await asyncio.to_thread(file_sha256, video_path)
+            input_height, input_width = model_service.input_size()
+            raw_writer = resources.raw_output_store.writer(
+                video_hash,
+                model_service.version,
+                {
+                    "video_filename": video_filename,
+                    "frame_width": metadata.width,
+                    "frame_height": metadata.height,
+                    "input_width": input_width,
+                    "input_height": input_height,
+                    "fps": metadata.fps
+                },
+                min_confidence=settings.raw_outputs_min_confidence
+            )
+        
+        # Near-identical frames seen by earlier jobs reuse their detections.
+        # Entries are only comparable for the same model and threshold, and
+        # with a location, the same GPS cell. Jobs keeping raw output still
+        # run every frame but add them to the index.
+        frame_index = resources.frame_index
+        index_bucket = None
+        if frame_index is not None:
+            cell = None
+            if location is not None:
+                cell = gps_bucket(*location, settings.frame_index_gps_cell_degrees)
+            index_bucket = (model_service.version, settings.confidence_threshold, cell)
+        index_source = None if settings.frame_index_same_job else job_id
+        
+        # Process frames. Encoding and uploads run off the loop, so "submit"
+        # only covers handing detections to the storage service. Every stage
+        # is also exported to /metrics.
+        timer = StageTimer(histogram=STAGE_SECONDS)
+        frames = video_processor.extract_frames(max(1, settings.frame_stride))
+        while True:
+            frame_start = time.perf_counter()
+            with timer.measure("decode"):
+                frame = next(frames, None)
+            if frame is None:
+                break
+            
             try:
-                # Run inference
-                detections = model_service.infer(frame.image)
-                
-                # Filter by confidence threshold
-                filtered_detections = [
-                    d for d in detections
-                    if d.confidence > settings.confidence_threshold
-                ]
+                # Run inference on the inference executor so the event loop
+                # keeps serving requests, dropping boxes at or below the
+                # confidence threshold before any detection objects are built
+                if raw_writer is None:
+                    infer = partial(
+                        model_service.infer,
+                        frame.image,
+                        min_confidence=settings.confidence_threshold,
+                        timer=timer
+                    )
+                else:
+                    infer = partial(
+                        _infer_and_record,
+                        model_service,
+                        frame.image,
+                        settings.confidence_threshold,
+                        timer,
+                        raw_writer,
+                        frame.frame_number
+                    )
+                if frame_index is not None:
+                    infer = partial(
+                        _detect_with_index,
+                        frame_index,
+                        index_bucket,
+                        index_source,
+                        raw_writer is None,
+                        frame.image,
+                        infer,
+                        timer
+                    )
+                if profiler is not None:
+                    infer = partial(profiler.call, infer)
+                with timer.measure("inference"):
+                    filtered_detections = await loop.run_in_executor(resources.inference_executor, infer)
+                if frame_index is not None:
+                    filtered_detections, from_index = filtered_detections
+                    if from_index:
+                        FRAME_INDEX_HITS_TOTAL.inc()
+                        job_status[job_id]["frames_from_index"] += 1
+                DETECTIONS_TOTAL.inc(len(filtered_detections))
                 
                 # Check for duplicates and store unique detections
                 for detection in filtered_detections:
-                    if not tracker.is_duplicate(detection, frame.frame_number):
+                    with timer.measure("tracking"):
+                        duplicate = tracker.is_duplicate(detection, frame.frame_number)
+                    if duplicate:
+                        DUPLICATES_TOTAL.inc()
+                    else:
                         # Store detection
-                        await storage_service.store_detection(
-                            detection,
-                            frame.image,
-                            frame.frame_number,
-                            video_filename
-                        )
+                        with timer.measure("submit"):
+                            detection_id = await storage_service.store_detection(
+                                detection,
+                                frame.image,
+                                frame.frame_number,
+                                video_filename
+                            )
+                        if raw_writer is not None:
+                            run_detections.append(run_detection(detection_id, frame.frame_number, detection))
                         
                         tracker.add_detection(detection, frame.frame_number)
                         job_status[job_id]["detections_found"] += 1
                 
                 job_status[job_id]["processed_frames"] += 1
+                FRAMES_TOTAL.inc()
                 tracker.cleanup_old_frames(frame.frame_number)
-                
+            
             except Exception as e:
                 logger.error(f"Frame {frame.frame_number} processing failed: {e}")
+                frame_errors.inc()
                 continue
+            finally:
+                timer.add("frame", (time.perf_counter() - frame_start) * 1000)
         
         video_processor.close()
-        job_status[job_id]["status"] = "completed"
+        
+        # Write out any detections still held by the write-behind buffer
+        with timer.measure("drain"):
+            await storage_service.flush()
+        logger.info(f"Stage timings: {timer.summary()}")
+        logger.info(f"Image output ({settings.image_output_mode}): {storage_service.image_stats()}")
+        if frame_index is not None:
+            FRAME_INDEX_ENTRIES.set(len(frame_index))
+            logger.info(
+                f"Frame index: {job_status[job_id]['frames_from_index']}/{job_status[job_id]['processed_frames']} "
+                f"frames served from the index; {frame_index.stats()}"
+            )
+        
+        if raw_writer is not None:
+            await asyncio.to_thread(raw_writer.close)
+            await asyncio.to_thread(resources.raw_output_store.save_run, job_id, {
+                "video_hash": video_hash,
+                "model_version": model_service.version,
+                "video_filename": video_filename,
+                "reanalysis_of": None,
+                "settings": _job_settings(),
+                "processed_frames": job_status[job_id]["processed_frames"],
+                "detections": run_detections
+            })
+            job_status[job_id]["raw_outputs"] = True
+        # Storage failures are counted service-wide, so a failure in a
+        # concurrent job also marks this one partial; a partly stored video
+        # is never added to the index, or repeat uploads would skip it
+        lost = _lost_detections(storage_service) - lost_before
+        if lost:
+            job_status[job_id]["status"] = "partial"
+            job_status[job_id]["error_message"] = f"{lost} detections could not be stored"
+            JOBS_TOTAL.labels("partial").inc()
+        else:
+            if video_hash is not None and resources.video_index is not None:
+                await asyncio.to_thread(
+                    resources.video_index.record,
+                    video_hash,
+                    model_service.version,
+                    _dedup_settings(),
+                    job_id,
+                    video_filename,
+                    job_status[job_id]["processed_frames"],
+                    job_status[job_id]["detections_found"]
+                )
+            job_status[job_id]["status"] = "completed"
+            JOBS_TOTAL.labels("completed").inc()
         
         # Cleanup temp file
         if os.path.exists(video_path):
             os.remove(video_path)
-        
+    
     except Exception as e:
         logger.error(f"Video processing task failed: {e}")
         job_status[job_id]["status"] = "failed"
         job_status[job_id]["error_message"] = str(e)
+        JOBS_TOTAL.labels("failed").inc()
+    finally:
+        JOBS_IN_PROGRESS.dec()
 
 
 @router.get("/processing-status/{job_id}", response_model=ProcessingStatusResponse)
@@ -145,16 +490,511 @@ async def get_processing_status(job_id: str):
         status=status["status"],
         processed_frames=status["processed_frames"],
         detections_found=status["detections_found"],
-        error_message=status.get("error_message")
+        error_message=status.get("error_message"),
+        profile_url=status.get("profile_url"),
+        raw_outputs=status.get("raw_outputs", False),
+        reanalysis_of=status.get("reanalysis_of"),
+        frames_from_index=status.get("frames_from_index", 0),
+        frame_index_hit_pct=_index_hit_pct(status)
     )
 
 
+def _index_hit_pct(status: dict) -> float:
+    frames = status["processed_frames"]
+    return round(100 * status.get("frames_from_index", 0) / frames, 1) if frames else 0.0
+
+
+@router.get("/processing-status/{job_id}/profile")
+async def get_job_profile(
+    job_id: str,
+    format: str = Query(default="collapsed", pattern="^(collapsed|summary)$")
+):
+    """Download a profiled job's collapsed stacks (flame graph input) or top-N summary"""
+    if job_status.get(job_id, {}).get("profile_url") is None:
+        raise HTTPException(status_code=404, detail="No profile for this job")
+    
+    path = profile_paths(settings.profile_dir, job_id)[format]
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile file not found")
+    
+    if format == "summary":
+        return FileResponse(path, media_type="application/json")
+    return FileResponse(path, media_type="text/plain", filename=f"{job_id}.collapsed")
+
+
+@router.post("/reanalyze/{job_id}", response_model=ReanalysisResponse)
+async def reanalyze_job(
+    job_id: str,
+    confidence_threshold: Optional[float] = Query(default=None, ge=0.0, le=1.0),
+    iou_threshold: Optional[float] = Query(default=None, ge=0.0, le=1.0),
+    tracking_window_size: Optional[int] = Query(default=None, ge=1),
+    frame_stride: Optional[int] = Query(default=None, ge=1),
+    resources: AppResources = Depends(get_resources)
+):
+    """Re-run filtering, tracking and storage of a job from its kept raw model output.
+    
+    Settings not given default to the server's. Detections the new settings
+    keep that the job did not store are stored, as records without images
+    since the video is gone; detections it would no longer keep are listed
+    as removed but left in storage, and stay in the new run's manifest as
+    superseded so a later re-analysis restores rather than re-stores them.
+    """
+    store = resources.raw_output_store
+    previous = await asyncio.to_thread(store.load_run, job_id)
+    if previous is None:
+        raise HTTPException(status_code=404, detail="No raw output kept for this job; submit it with keep_raw=true")
+    outputs = await asyncio.to_thread(store.open, previous["video_hash"], previous["model_version"])
+    if outputs is None:
+        raise HTTPException(status_code=404, detail="Raw output of this job is no longer available")
+    
+    overrides = {
+        "confidence_threshold": confidence_threshold,
+        "iou_threshold": iou_threshold,
+        "tracking_window_size": tracking_window_size,
+        "frame_stride": frame_stride
+    }
+    run_settings = {**_job_settings(), **{k: v for k, v in overrides.items() if v is not None}}
+    if run_settings["confidence_threshold"] < outputs.meta["min_confidence"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"confidence_threshold must be at least {outputs.meta['min_confidence']}, "
+                   f"the cut applied when the raw output was kept"
+        )
+    
+    new_job_id = str(uuid.uuid4())
+    job_status[new_job_id] = {
+        "status": "processing",
+        "processed_frames": 0,
+        "detections_found": 0,
+        "error_message": None,
+        "reanalysis_of": job_id
+    }
+    start = time.perf_counter()
+    try:
+        current, processed_frames = await asyncio.to_thread(track_raw_outputs, outputs, **run_settings)
+        diff = diff_run(previous["detections"], current)
+        added = []
+        for frame_number, detection in diff.added:
+            detection_id = await resources.storage_service.insert_damage_record(
+                detection, None, frame_number, previous["video_filename"]
+            )
+            added.append(run_detection(detection_id, frame_number, detection))
+        await resources.storage_service.flush()
+        
+        detections, detections_found = run_manifest(diff, added)
+        await asyncio.to_thread(store.save_run, new_job_id, {
+            **{key: previous[key] for key in ("video_hash", "model_version", "video_filename")},
+            "reanalysis_of": job_id,
+            "settings": run_settings,
+            "processed_frames": processed_frames,
+            "detections": detections
+        })
+    except Exception as e:
+        message = e.message if isinstance(e, ProcessingError) else str(e)
+        logger.error(f"Re-analysis of job {job_id} failed: {message}")
+        job_status[new_job_id].update(status="failed", error_message=message)
+        JOBS_TOTAL.labels("failed").inc()
+        raise HTTPException(status_code=500, detail=message)
+    
+    job_status[new_job_id].update(
+        status="completed",
+        processed_frames=processed_frames,
+        detections_found=detections_found,
+        raw_outputs=True
+    )
+    JOBS_TOTAL.labels("completed").inc()
+    logger.info(
+        f"Re-analysed job {job_id} as {new_job_id}: {len(added)} added, {len(diff.restored)} restored, "
+        f"{len(diff.removed)} removed, {len(diff.unchanged)} unchanged"
+    )
+    
+    return ReanalysisResponse(
+        job_id=new_job_id,
+        reanalysis_of=job_id,
+        status="completed",
+        settings=run_settings,
+        processed_frames=processed_frames,
+        detections_found=detections_found,
+        unchanged=len(diff.unchanged),
+        added=added,
+        restored=diff.restored,
+        removed=diff.removed,
+        duration_ms=round((time.perf_counter() - start) * 1000, 1)
+    )
+
+
+@router.post("/process-images", response_model=ImageBatchResponse)
+async def process_images(
+    background_tasks: BackgroundTasks,
+    images: List[UploadFile] = File(..., description="Photos, or zip archives of photos"),
+    resources: AppResources = Depends(get_resources)
+):
+    """Detect damage in a batch of photos.
+    
+    Batches of up to ``IMAGE_BATCH_SYNC_MAX`` images are answered with every
+    image's detections. Larger batches return a job right away; poll
+    ``/process-images/{job_id}`` for its results.
+    """
+    max_bytes = settings.image_batch_max_mb * 1024 * 1024
+    uploads = await _read_image_uploads(images, max_bytes)
+    try:
+        batch = await asyncio.to_thread(expand_archives, uploads, settings.image_batch_max_images, max_bytes)
+    except ImageError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    if not batch:
+        raise HTTPException(status_code=400, detail="No images in request")
+    
+    job_id = str(uuid.uuid4())
+    job_status[job_id] = {
+        "status": "processing",
+        "processed_frames": 0,
+        "detections_found": 0,
+        "error_message": None,
+        "images": len(batch),
+        "results": None,
+        "duration_ms": None
+    }
+    if len(batch) > settings.image_batch_sync_max:
+        background_tasks.add_task(process_images_task, resources, job_id, batch)
+    else:
+        await process_images_task(resources, job_id, batch)
+    return _image_batch_response(job_id)
+
+
+@router.get("/process-images/{job_id}", response_model=ImageBatchResponse)
+async def get_image_batch(job_id: str):
+    """Progress of a photo batch, with per-image results once it completes"""
+    if "images" not in job_status.get(job_id, {}):
+        raise HTTPException(status_code=404, detail="Image batch not found")
+    return _image_batch_response(job_id)
+
+
+def _image_batch_response(job_id: str) -> ImageBatchResponse:
+    status = job_status[job_id]
+    return ImageBatchResponse(
+        job_id=job_id,
+        status=status["status"],
+        images=status["images"],
+        processed_images=status["processed_frames"],
+        detections_found=status["detections_found"],
+        error_message=status["error_message"],
+        duration_ms=status["duration_ms"],
+        results=status["results"]
+    )
+
+
+async def _read_image_uploads(files: List[UploadFile], max_bytes: int) -> List[ImageInput]:
+    uploads = []
+    size = 0
+    chunk_size = settings.upload_chunk_size_kb * 1024
+    for upload in files:
+        chunks = []
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Batch exceeds the maximum size of {settings.image_batch_max_mb}MB"
+                )
+            chunks.append(chunk)
+        uploads.append(ImageInput(upload.filename or f"image_{len(uploads)}", b"".join(chunks)))
+    return uploads
+
+
+def _infer_images(model_service, images: List, min_confidence: float, timer: StageTimer) -> List:
+    raw_outputs = model_service.run_batch([tensor for _, tensor in images], timer)
+    with timer.measure("postprocess"):
+        return [
+            model_service.postprocess_output(raw_output, min_confidence, image.shape)
+            for (image, _), raw_output in zip(images, raw_outputs)
+        ]
+
+
+async def process_images_task(resources: AppResources, job_id: str, batch: List[ImageInput]):
+    """Detect and store damage in a batch of photos.
+    
+    Images are decoded and preprocessed on the decode pool one inference
+    batch ahead of the model, and each batch of ``IMAGE_BATCH_SIZE`` images
+    goes through the model in as few session runs as it allows. Detections
+    are stored like video detections, through the encode pool and bulk
+    inserts. Unreadable images fail on their own; per-image results are
+    kept in ``job_status``.
+    """
+    storage_service = resources.storage_service
+    loop = asyncio.get_running_loop()
+    status = job_status[job_id]
+    results = [None] * len(batch)
+    image_errors = ERRORS_TOTAL.labels("image")
+    start = time.perf_counter()
+    JOBS_IN_PROGRESS.inc()
+    try:
+        model_service = await asyncio.to_thread(resources.model_registry.get)
+        timer = StageTimer(histogram=STAGE_SECONDS)
+        batch_size = max(1, settings.image_batch_size)
+        chunks = [range(i, min(i + batch_size, len(batch))) for i in range(0, len(batch), batch_size)]
+        
+        def decode(indices):
+            return asyncio.gather(*(
+                loop.run_in_executor(resources.decode_executor, decode_for_model, model_service, batch[i].data)
+                for i in indices
+            ), return_exceptions=True)
+        
+        pending = decode(chunks[0])
+        for number, indices in enumerate(chunks):
+            with timer.measure("decode"):
+                decoded = await pending
+            if number + 1 < len(chunks):
+                pending = decode(chunks[number + 1])
+            
+            ready = []
+            for i, item in zip(indices, decoded):
+                if isinstance(item, Exception):
+                    message = item.message if isinstance(item, ProcessingError) else str(item)
+                    logger.error(f"Image {batch[i].filename} failed: {message}")
+                    image_errors.inc()
+                    results[i] = image_result(batch[i].filename, error_message=message)
+                else:
+                    ready.append((i, item))
+            if not ready:
+                continue
+            
+            infer = partial(
+                _infer_images,
+                model_service,
+                [item for _, item in ready],
+                settings.confidence_threshold,
+                timer
+            )
+            with timer.measure("inference"):
+                detections_per_image = await loop.run_in_executor(resources.inference_executor, infer)
+            
+            for (i, (image, _)), detections in zip(ready, detections_per_image):
+                DETECTIONS_TOTAL.inc(len(detections))
+                stored = []
+                for detection in detections:
+                    # Photos are independent, so there is no tracking; the
+                    # frame number is the image's position in the batch
+                    with timer.measure("submit"):
+                        detection_id = await storage_service.store_detection(
+                            detection,
+                            image,
+                            i,
+                            None,
+                            {"image_filename": batch[i].filename, "batch_job_id": job_id}
+                        )
+                    stored.append((detection_id, detection))
+                results[i] = image_result(batch[i].filename, image, stored)
+                status["processed_frames"] += 1
+                status["detections_found"] += len(stored)
+                IMAGES_TOTAL.inc()
+        
+        with timer.measure("drain"):
+            await storage_service.flush()
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Image batch {job_id}: {status['processed_frames']}/{len(batch)} images in {elapsed:.2f}s "
+            f"({status['processed_frames'] / elapsed:.1f} images/s); stage timings: {timer.summary()}"
+        )
+        status.update(status="completed", results=results, duration_ms=round(elapsed * 1000, 1))
+        JOBS_TOTAL.labels("completed").inc()
+    
+    except Exception as e:
+        message = e.message if isinstance(e, ProcessingError) else str(e)
+        logger.error(f"Image batch {job_id} failed: {message}")
+        status.update(status="failed", error_message=message, duration_ms=round((time.perf_counter() - start) * 1000, 1))
+        JOBS_TOTAL.labels("failed").inc()
+    finally:
+        JOBS_IN_PROGRESS.dec()
+
+
 @router.get("/damages/latest", response_model=List[DamageResponse])
-async def get_latest_damages(limit: int = Query(default=10, ge=1, le=100)):
+async def get_latest_damages(
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=100),
+    resources: AppResources = Depends(get_resources)
+):
     """Retrieve latest N damage detection records"""
+    async def load() -> bytes:
+        return dumps(await resources.storage_service.get_latest_damages(limit))
+    
     try:
-        damages = await storage_service.get_latest_damages(limit)
-        return damages
+        cached = await resources.damages_cache.get_or_load(("latest", limit), load)
     except StorageError as e:
         logger.error(f"Failed to retrieve damages: {e.message}")
         raise HTTPException(status_code=500, detail=e.message)
+    
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+        "X-Cache": "HIT" if cached.hit else "MISS"
+    }
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def damage_filters(
+    damage_type: Optional[List[str]] = Query(default=None),
+    severity: Optional[List[str]] = Query(default=None),
+    min_confidence: Optional[float] = Query(default=None, ge=0.0, le=1.0),
+    max_confidence: Optional[float] = Query(default=None, ge=0.0, le=1.0),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    state: Optional[str] = None,
+    district: Optional[str] = None,
+    road_name: Optional[str] = None,
+    min_lat: Optional[float] = Query(default=None, ge=-90.0, le=90.0),
+    min_lon: Optional[float] = Query(default=None, ge=-180.0, le=180.0),
+    max_lat: Optional[float] = Query(default=None, ge=-90.0, le=90.0),
+    max_lon: Optional[float] = Query(default=None, ge=-180.0, le=180.0),
+    fields: Optional[str] = Query(default=None, description="Comma-separated columns to return")
+) -> DamageQuery:
+    """Filters and projection shared by the query and export endpoints"""
+    bounds = (min_lat, min_lon, max_lat, max_lon)
+    if any(b is not None for b in bounds) and any(b is None for b in bounds):
+        raise HTTPException(
+            status_code=400,
+            detail="min_lat, min_lon, max_lat and max_lon must be given together"
+        )
+    
+    try:
+        return DamageQuery(
+            damage_types=tuple(damage_type or ()),
+            severities=tuple(severity or ()),
+            min_confidence=min_confidence,
+            max_confidence=max_confidence,
+            detected_after=since,
+            detected_before=until,
+            state=state,
+            district=district,
+            road_name=road_name,
+            bbox=bounds if min_lat is not None else None,
+            fields=parse_fields(fields) if fields else ()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/damages", response_model=DamagePage)
+async def query_damages(
+    filters: DamageQuery = Depends(damage_filters),
+    limit: int = Query(default=50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    resources: AppResources = Depends(get_resources)
+):
+    """Page through damage records, newest first, using keyset pagination"""
+    try:
+        query = filters._replace(
+            fields=filters.fields or DEFAULT_FIELDS,
+            limit=limit,
+            cursor=decode_cursor(cursor) if cursor else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        items, next_cursor = await resources.storage_service.query_damages(query)
+    except StorageError as e:
+        logger.error(f"Failed to query damages: {e.message}")
+        raise HTTPException(status_code=500, detail=e.message)
+    
+    return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+
+
+@router.get("/damages/export")
+async def export_damages(
+    filters: DamageQuery = Depends(damage_filters),
+    format: str = Query(default="ndjson", description=f"One of {', '.join(EXPORT_FORMATS)}"),
+    resources: AppResources = Depends(get_resources)
+):
+    """Stream every matching damage record as NDJSON, CSV, GeoJSON, Parquet or Arrow.
+    
+    Exports include all columns unless ``fields`` is given.
+    """
+    try:
+        query = filters._replace(
+            fields=filters.fields or ROAD_DAMAGE_COLUMNS,
+            limit=settings.export_page_size
+        )
+        exporter = create_exporter(format, query.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"road_damage_{datetime.utcnow():%Y%m%dT%H%M%SZ}.{exporter.extension}"
+    return StreamingResponse(
+        stream_export(resources.storage_service, exporter, query),
+        media_type=exporter.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/damages/clusters")
+async def get_damage_clusters(
+    min_lat: float = Query(ge=-90.0, le=90.0),
+    min_lon: float = Query(ge=-180.0, le=180.0),
+    max_lat: float = Query(ge=-90.0, le=90.0),
+    max_lon: float = Query(ge=-180.0, le=180.0),
+    zoom: int = Query(ge=0, le=22),
+    damage_type: Optional[List[str]] = Query(default=None),
+    severity: Optional[List[str]] = Query(default=None),
+    resources: AppResources = Depends(get_resources)
+):
+    """Damage in a map viewport: clusters up to the configured zoom, raw points above it"""
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Viewport minimum exceeds its maximum")
+    
+    try:
+        viewport = await resources.cluster_service.get_viewport(
+            (min_lat, min_lon, max_lat, max_lon),
+            zoom,
+            damage_types=tuple(sorted(damage_type or ())),
+            severities=tuple(sorted(severity or ()))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StorageError as e:
+        logger.error(f"Failed to cluster damages: {e.message}")
+        raise HTTPException(status_code=500, detail=e.message)
+    
+    return FastJSONResponse(viewport)
+
+
+@router.get("/statistics")
+async def get_statistics(
+    days: Optional[int] = Query(default=None, ge=0, le=3660),
+    resources: AppResources = Depends(get_resources)
+):
+    """Damage counts by type, severity, state, road category and day, plus a confidence histogram"""
+    async def load() -> bytes:
+        return dumps(await resources.storage_service.get_statistics(days))
+    
+    try:
+        cached = await resources.damages_cache.get_or_load(("statistics", days), load)
+    except StorageError as e:
+        logger.error(f"Failed to retrieve statistics: {e.message}")
+        raise HTTPException(status_code=500, detail=e.message)
+    
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": cached.etag, "X-Cache": "HIT" if cached.hit else "MISS"}
+    )
+
+
+@router.get("/http/pool")
+async def get_http_pool_stats():
+    """Request, connection and TLS handshake counts of the shared HTTP client"""
+    return FastJSONResponse(pool_stats())
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(resources: AppResources = Depends(get_resources)):
+    """Hit and miss counters of the in-process response caches and frame index"""
+    return {
+        "damages_latest": resources.damages_cache.stats(),
+        "cluster_tiles": resources.cluster_service.cache.stats(),
+        "frame_index": resources.frame_index.stats() if resources.frame_index is not None else None
+    }
@@ -1,15 +1,90 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
-    supabase_url: str
-    supabase_key: str
+    storage_backend: str = "supabase"
+    supabase_url: Optional[str] = None
+    supabase_key: Optional[str] = None
+    http2: bool = True
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 60.0
+    http_connect_timeout_seconds: float = 5.0
+    http_read_timeout_seconds: float = 30.0
+    http_write_timeout_seconds: float = 30.0
+    http_pool_timeout_seconds: float = 10.0
+    http_connect_retries: int = 2
+    local_storage_dir: str = "./data"
+    local_image_base_url: str = "/images"
     model_path: str = "./models/road_damage_yolo.onnx"
     confidence_threshold: float = 0.5
     iou_threshold: float = 0.5
     tracking_window_size: int = 30
+    frame_stride: int = 1
+    raw_outputs_enabled: bool = False
+    raw_outputs_dir: str = "./raw_outputs"
+    raw_outputs_min_confidence: float = 0.05
     max_video_size_mb: int = 500
+    upload_chunk_size_kb: int = 1024
+    video_dedup_enabled: bool = True
+    video_index_path: str = "./video_index.db"
+    frame_index_enabled: bool = False
+    frame_index_method: str = "phash"
+    frame_index_max_distance: int = 4
+    frame_index_max_entries: int = 100000
+    frame_index_ttl_seconds: float = 604800.0
+    frame_index_gps_cell_degrees: float = 0.001
+    frame_index_same_job: bool = False
+    image_batch_size: int = 8
+    image_decode_workers: int = 4
+    image_batch_max_images: int = 500
+    image_batch_max_mb: int = 200
+    image_batch_sync_max: int = 32
+    storage_read_workers: int = 4
+    storage_write_workers: int = 8
+    storage_batch_size: int = 50
+    storage_flush_interval_seconds: float = 2.0
+    storage_flush_max_attempts: int = 3
+    storage_max_buffered_records: int = 10000
+    spool_enabled: bool = True
+    spool_dir: str = "./spool"
+    spool_drain_concurrency: int = 4
+    spool_retry_base_seconds: float = 1.0
+    spool_retry_max_seconds: float = 300.0
+    spool_poll_interval_seconds: float = 1.0
+    spool_max_attempts: int = 10
+    damages_cache_ttl_seconds: float = 5.0
+    damages_cache_max_entries: int = 256
+    cluster_grid_size: int = 8
+    cluster_max_zoom: int = 15
+    cluster_max_tiles: int = 64
+    cluster_max_points: int = 5000
+    cluster_max_load_points: int = 200000
+    cluster_page_size: int = 1000
+    cluster_tile_cache_size: int = 2048
+    cluster_tile_ttl_seconds: float = 300.0
+    export_page_size: int = 1000
+    preload_model: bool = False
+    inference_workers: int = 1
+    readiness_timeout_seconds: float = 2.0
+    loop_lag_interval_ms: float = 100.0
+    profiling_enabled: bool = False
+    profile_dir: str = "./profiles"
+    profile_interval_ms: float = 10.0
+    profile_top_n: int = 25
+    compression_min_size: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    encode_workers: int = 2
+    encode_max_pending: int = 16
+    image_output_mode: str = "crop"
+    image_format: str = "jpeg"
+    image_crop_margin: float = 0.15
+    image_crop_quality: int = 90
+    image_thumbnail_max_side: int = 640
+    image_thumbnail_quality: int = 75
+    image_full_quality: int = 95
     cors_origins: str = "http://localhost:5173"
     
     class Config:
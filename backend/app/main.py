@@ -1,17 +1,57 @@
-from fastapi import FastAPI
+import time
+
+# Start of the cold-start measurement: everything below, from the framework
+# imports to the end of lifespan startup, counts towards it
+IMPORT_STARTED = time.perf_counter()
+
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from app.api.compression import CompressionMiddleware
+from app.api.resources import AppResources
 from app.api.routes import router
 from app.config import settings
+from app.services.http_pool import close_http_client
+from app.utils.fast_json import FastJSONResponse
 from app.utils.logging import setup_logging
+from app.utils.metrics import CONTENT_TYPE, REGISTRY
 import logging
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build and start shared resources on startup; close them on shutdown"""
+    started = time.perf_counter()
+    resources = AppResources.create(settings)
+    await resources.start(preload_model=settings.preload_model)
+    app.state.resources = resources
+    
+    ready = time.perf_counter()
+    app.state.cold_start_ms = {
+        "import": round((started - IMPORT_STARTED) * 1000, 1),
+        "startup": round((ready - started) * 1000, 1),
+        "total": round((ready - IMPORT_STARTED) * 1000, 1),
+        **{f"startup_{stage}": round(ms, 1) for stage, ms in resources.startup_ms.items()}
+    }
+    logger.info(f"Cold start: {app.state.cold_start_ms}")
+    
+    try:
+        yield
+    finally:
+        await resources.close()
+        close_http_client()
+
+
 app = FastAPI(
     title="Road Damage Detection API",
     description="Backend service for processing road camera footage and detecting damage",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,9 +63,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON and exports above the size threshold (brotli when the
+# client accepts it, gzip otherwise)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    gzip_level=settings.gzip_level,
+    brotli_quality=settings.brotli_quality
+)
+
 # Include routes
 app.include_router(router)
 
+# The local backend hands out image URLs under this path, so serve them here
+if settings.storage_backend == "local" and settings.local_image_base_url.startswith("/"):
+    app.mount(
+        settings.local_image_base_url,
+        # The backend creates the directory at startup, after this mount
+        StaticFiles(directory=os.path.join(settings.local_storage_dir, "damage-images"), check_dir=False),
+        name="damage-images"
+    )
+
 
 @app.get("/")
 async def root():
@@ -41,6 +99,41 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/live")
+async def liveness():
+    """The process is up and serving requests; no dependencies are checked"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Startup has finished and storage answers; 503 otherwise"""
+    resources: AppResources = getattr(app.state, "resources", None)
+    if resources is None or not resources.started:
+        return FastJSONResponse({"status": "starting"}, status_code=503)
+    
+    checks = {"storage": await resources.check_storage(settings.readiness_timeout_seconds)}
+    if settings.preload_model:
+        checks["model"] = resources.model_registry.is_loaded()
+    
+    ready = all(checks.values())
+    return FastJSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            "checks": checks,
+            "models": resources.model_registry.status(),
+            "cold_start_ms": app.state.cold_start_ms
+        },
+        status_code=200 if ready else 503
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Pipeline stage latencies and counters in the Prometheus text format"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
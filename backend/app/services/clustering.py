@@ -0,0 +1,279 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+import logging
+import numpy as np
+from app.services.damage_query import DamageQuery
+
+logger = logging.getLogger(__name__)
+
+# Web Mercator is undefined at the poles; clamp like slippy map tiles do
+MAX_LATITUDE = 85.05112878
+
+TileKey = Tuple[int, int, int]  # zoom, x, y
+
+
+def _mercator_xy(latitude: np.ndarray, longitude: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Project coordinates to fractional tile coordinates at ``zoom``"""
+    scale = float(1 << zoom)
+    lat = np.radians(np.clip(latitude, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (np.asarray(longitude, dtype=np.float64) + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / math.pi) / 2.0 * scale
+    # Points on the far east/south edge belong to the last tile
+    limit = np.nextafter(scale, 0)
+    return np.clip(x, 0.0, limit), np.clip(y, 0.0, limit)
+
+
+def tile_bounds(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """``(min_lat, min_lon, max_lat, max_lon)`` of a tile"""
+    scale = float(1 << zoom)
+    
+    def latitude(tile_y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * tile_y / scale))))
+    
+    return latitude(y + 1), x / scale * 360.0 - 180.0, latitude(y), (x + 1) / scale * 360.0 - 180.0
+
+
+def tiles_for_bbox(bbox: Tuple[float, float, float, float], zoom: int) -> List[TileKey]:
+    """Tiles at ``zoom`` covering ``(min_lat, min_lon, max_lat, max_lon)``"""
+    min_lat, min_lon, max_lat, max_lon = bbox
+    xs, ys = _mercator_xy(np.array([max_lat, min_lat]), np.array([min_lon, max_lon]), zoom)
+    x0, x1 = int(xs[0]), int(xs[1])
+    y0, y1 = int(ys[0]), int(ys[1])
+    return [(zoom, x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def cluster_points(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    damage_types: np.ndarray,
+    zoom: int,
+    grid_size: int
+) -> Dict[TileKey, List[dict]]:
+    """Grid-cluster points into ``grid_size`` x ``grid_size`` cells per tile.
+    
+    Returns the clusters of every tile that holds at least one point, each
+    with its count, centroid and count per damage type. All grouping is done
+    with numpy over the whole batch; Python only builds the output dicts.
+    """
+    if len(latitude) == 0:
+        return {}
+    
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    tile_x, tile_y = _mercator_xy(latitude, longitude, zoom)
+    
+    # One integer per (tile, cell); cells are numbered row-major
+    cells_per_axis = (1 << zoom) * grid_size
+    cell_x = (tile_x * grid_size).astype(np.int64)
+    cell_y = (tile_y * grid_size).astype(np.int64)
+    cell_ids = cell_y * cells_per_axis + cell_x
+    
+    unique_cells, cluster_index = np.unique(cell_ids, return_inverse=True)
+    counts = np.bincount(cluster_index)
+    centroid_lat = np.bincount(cluster_index, weights=latitude) / counts
+    centroid_lon = np.bincount(cluster_index, weights=longitude) / counts
+    
+    type_names, type_index = np.unique(np.asarray(damage_types, dtype=object).astype(str), return_inverse=True)
+    type_counts = np.zeros((len(unique_cells), len(type_names)), dtype=np.int64)
+    np.add.at(type_counts, (cluster_index, type_index), 1)
+    
+    tiles: Dict[TileKey, List[dict]] = {}
+    cell_rows = unique_cells // cells_per_axis
+    cell_cols = unique_cells % cells_per_axis
+    for i in range(len(unique_cells)):
+        key = (zoom, int(cell_cols[i]) // grid_size, int(cell_rows[i]) // grid_size)
+        nonzero = np.flatnonzero(type_counts[i])
+        tiles.setdefault(key, []).append({
+            "latitude": float(centroid_lat[i]),
+            "longitude": float(centroid_lon[i]),
+            "count": int(counts[i]),
+            "types": {str(type_names[t]): int(type_counts[i, t]) for t in nonzero}
+        })
+    return tiles
+
+
+class TileCache:
+    """LRU cache of clustered tiles keyed by ``(zoom, x, y)`` and filters.
+    
+    ``invalidate_points`` drops every cached tile, at any zoom, that contains
+    one of the given coordinates; other tiles stay warm.
+    """
+    
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[TileKey, Hashable], tuple]" = OrderedDict()
+        self._generation = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+    
+    @property
+    def generation(self) -> int:
+        return self._generation
+    
+    def get(self, tile: TileKey, filters: Hashable) -> Optional[List[dict]]:
+        entry = self._entries.get((tile, filters))
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end((tile, filters))
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, tile: TileKey, filters: Hashable, clusters: List[dict], generation: int):
+        # A load that raced an insert may miss the new points; don't keep it
+        if generation != self._generation:
+            return
+        self._entries[(tile, filters)] = (time.monotonic() + self.ttl_seconds, clusters)
+        self._entries.move_to_end((tile, filters))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def invalidate_points(self, latitude: np.ndarray, longitude: np.ndarray):
+        self._generation += 1
+        if len(latitude) == 0 or not self._entries:
+            return
+        
+        stale = set()
+        for zoom in {tile[0] for tile, _ in self._entries}:
+            tile_x, tile_y = _mercator_xy(latitude, longitude, zoom)
+            stale.update(
+                (zoom, int(x), int(y))
+                for x, y in set(zip(tile_x.astype(np.int64).tolist(), tile_y.astype(np.int64).tolist()))
+            )
+        for key in [key for key in self._entries if key[0] in stale]:
+            del self._entries[key]
+            self.invalidated += 1
+    
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+    
+    def stats(self) -> dict:
+        return {
+            "tiles": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated
+        }
+
+
+class DamageClusterService:
+    """Serves map viewports as clusters (below ``max_zoom``) or raw points.
+    
+    Viewports are split into map tiles; cached tiles are reused and the
+    missing ones are loaded with one bounding-box query, of at most
+    ``max_load_points`` rows, and clustered together off the event loop.
+    Tiles are invalidated as the storage service inserts records.
+    """
+    
+    def __init__(
+        self,
+        storage_service,
+        grid_size: int = 8,
+        max_zoom: int = 15,
+        max_tiles: int = 64,
+        max_points: int = 5000,
+        page_size: int = 1000,
+        cache: Optional[TileCache] = None,
+        max_load_points: int = 200000
+    ):
+        self.storage_service = storage_service
+        self.grid_size = grid_size
+        self.max_zoom = max_zoom
+        self.max_tiles = max_tiles
+        self.max_points = max_points
+        self.max_load_points = max_load_points
+        self.page_size = page_size
+        self.cache = cache or TileCache()
+        storage_service.add_insert_listener(self._on_insert)
+    
+    def _on_insert(self, records: List[dict]):
+        latitude = np.array([r.get("latitude") or 0.0 for r in records], dtype=np.float64)
+        longitude = np.array([r.get("longitude") or 0.0 for r in records], dtype=np.float64)
+        self.cache.invalidate_points(latitude, longitude)
+    
+    async def get_viewport(
+        self,
+        bbox: Tuple[float, float, float, float],
+        zoom: int,
+        damage_types: Tuple[str, ...] = (),
+        severities: Tuple[str, ...] = ()
+    ) -> dict:
+        filters = DamageQuery(damage_types=damage_types, severities=severities)
+        
+        if zoom > self.max_zoom:
+            query = filters._replace(
+                bbox=bbox,
+                fields=("id", "latitude", "longitude", "damage_type", "severity"),
+                limit=self.page_size
+            )
+            points = await self.storage_service.select_points(query, self.max_points + 1)
+            truncated = len(points) > self.max_points
+            points = points[:self.max_points]
+            return {"zoom": zoom, "mode": "points", "points": points, "truncated": truncated}
+        
+        tiles = tiles_for_bbox(bbox, zoom)
+        if len(tiles) > self.max_tiles:
+            raise ValueError(
+                f"Viewport covers {len(tiles)} tiles at zoom {zoom}, more than {self.max_tiles}; "
+                f"use a lower zoom"
+            )
+        
+        cache_key = (damage_types, severities)
+        truncated = False
+        clusters: List[dict] = []
+        missing: List[TileKey] = []
+        for tile in tiles:
+            cached = self.cache.get(tile, cache_key)
+            if cached is None:
+                missing.append(tile)
+            else:
+                clusters.extend(cached)
+        
+        if missing:
+            generation = self.cache.generation
+            bounds = [tile_bounds(*tile) for tile in missing]
+            query = filters._replace(
+                bbox=(
+                    min(b[0] for b in bounds),
+                    min(b[1] for b in bounds),
+                    max(b[2] for b in bounds),
+                    max(b[3] for b in bounds)
+                ),
+                fields=("latitude", "longitude", "damage_type"),
+                limit=self.page_size
+            )
+            rows = await self.storage_service.select_points(query, self.max_load_points + 1)
+            truncated = len(rows) > self.max_load_points
+            loaded = await asyncio.to_thread(self._cluster_rows, rows[:self.max_load_points], zoom)
+            for tile in missing:
+                tile_clusters = loaded.get(tile, [])
+                # Counts of a truncated load are partial; never cache them
+                if not truncated:
+                    self.cache.put(tile, cache_key, tile_clusters, generation)
+                clusters.extend(tile_clusters)
+        
+        return {
+            "zoom": zoom,
+            "mode": "clusters",
+            "clusters": clusters,
+            "total": sum(cluster["count"] for cluster in clusters),
+            "tiles": len(tiles),
+            "tiles_loaded": len(missing),
+            "truncated": truncated
+        }
+    
+    def _cluster_rows(self, rows: List[dict], zoom: int) -> Dict[TileKey, List[dict]]:
+        return cluster_points(
+            np.array([row["latitude"] for row in rows], dtype=np.float64),
+            np.array([row["longitude"] for row in rows], dtype=np.float64),
+            np.array([row["damage_type"] for row in rows], dtype=object),
+            zoom,
+            self.grid_size
+        )
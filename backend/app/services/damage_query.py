@@ -0,0 +1,102 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional, Tuple
+
+# Columns of public.road_damage after all migrations in supabase/migrations
+ROAD_DAMAGE_COLUMNS = (
+    "id", "damage_type", "severity", "latitude", "longitude", "confidence_score",
+    "detected_at", "road_name", "city", "metadata", "road_category", "state",
+    "district", "municipality", "autobahn_region", "image_url",
+)
+
+# Returned when the caller does not pick fields; leaves out the metadata JSON
+DEFAULT_FIELDS = (
+    "id", "damage_type", "severity", "latitude", "longitude",
+    "confidence_score", "detected_at", "image_url",
+)
+
+# Keyset columns, always selected so the next cursor can be built
+CURSOR_FIELDS = ("detected_at", "id")
+
+
+class DamageQuery(NamedTuple):
+    """Filters, projection and page position for a ``road_damage`` query.
+    
+    Results are ordered by ``detected_at DESC, id DESC``; ``cursor`` is the
+    ``(detected_at, id)`` of the last row of the previous page.
+    """
+    damage_types: Tuple[str, ...] = ()
+    severities: Tuple[str, ...] = ()
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+    detected_after: Optional[datetime] = None
+    detected_before: Optional[datetime] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    road_name: Optional[str] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None  # min_lat, min_lon, max_lat, max_lon
+    fields: Tuple[str, ...] = DEFAULT_FIELDS
+    limit: int = 50
+    cursor: Optional[Tuple[str, str]] = None
+    
+    def select_columns(self) -> Tuple[str, ...]:
+        return self.fields + tuple(f for f in CURSOR_FIELDS if f not in self.fields)
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated field list, rejecting unknown columns"""
+    if not fields:
+        return DEFAULT_FIELDS
+    
+    requested = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in ROAD_DAMAGE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields {unknown}, expected any of {list(ROAD_DAMAGE_COLUMNS)}")
+    return requested or DEFAULT_FIELDS
+
+
+def encode_cursor(detected_at: str, record_id: str) -> str:
+    payload = json.dumps([detected_at, record_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, str]:
+    """Decode a page cursor to a UTC timestamp and a record id.
+    
+    Both values are parsed and re-serialized, since backends put them into
+    filter strings; anything that is not a timestamp and a UUID is rejected.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        detected_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        parsed = datetime.fromisoformat(detected_at.replace("Z", "+00:00"))
+        record_id = str(uuid.UUID(record_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    # Same form as stored timestamps, so string comparisons in SQLite hold
+    return parsed.astimezone(timezone.utc).isoformat(timespec="microseconds"), record_id
+
+
+def paginate(rows: List[dict], query: DamageQuery) -> Tuple[List[dict], Optional[str]]:
+    """Trim the ``limit + 1`` rows fetched by a backend into one page.
+    
+    Returns the projected items and the cursor of the next page, which is
+    ``None`` on the last page.
+    """
+    has_more = len(rows) > query.limit
+    rows = rows[:query.limit]
+    
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(str(last["detected_at"]), str(last["id"]))
+    
+    if len(query.select_columns()) == len(query.fields):
+        # Rows already hold exactly the requested fields
+        return rows, next_cursor
+    items = [{field: row.get(field) for field in query.fields} for row in rows]
+    return items, next_cursor
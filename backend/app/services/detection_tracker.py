@@ -1,14 +1,15 @@
-import numpy as np
 from typing import List, Dict
 from collections import deque
 import logging
-from app.api.models import Detection, BoundingBox
+from app.services.detection_types import FrameDetection, BBox
 
 logger = logging.getLogger(__name__)
 
 
 class TrackedDetection:
-    def __init__(self, detection: Detection, frame_number: int):
+    __slots__ = ("detection", "frame_number")
+    
+    def __init__(self, detection: FrameDetection, frame_number: int):
         self.detection = detection
         self.frame_number = frame_number
 
@@ -18,9 +19,9 @@ class DetectionTracker:
         self.window_size = window_size
         self.iou_threshold = iou_threshold
         self.detections_window: deque = deque(maxlen=window_size)
-        self.frame_detections: Dict[int, List[Detection]] = {}
+        self.frame_detections: Dict[int, List[FrameDetection]] = {}
     
-    def calculate_iou(self, bbox1: BoundingBox, bbox2: BoundingBox) -> float:
+    def calculate_iou(self, bbox1: BBox, bbox2: BBox) -> float:
         # Calculate intersection
         x_left = max(bbox1.x1, bbox2.x1)
         y_top = max(bbox1.y1, bbox2.y1)
@@ -43,10 +44,11 @@ class DetectionTracker:
         iou = intersection_area / union_area
         return iou
     
-    def is_duplicate(self, detection: Detection, frame_number: int) -> bool:
+    def is_duplicate(self, detection: FrameDetection, frame_number: int) -> bool:
         # Check against all detections in the sliding window
+        bbox = detection.bbox
         for tracked in self.detections_window:
-            iou = self.calculate_iou(detection.bbox, tracked.detection.bbox)
+            iou = self.calculate_iou(bbox, tracked.detection.bbox)
             
             if iou > self.iou_threshold:
                 logger.debug(
@@ -56,7 +58,7 @@ class DetectionTracker:
         
         return False
     
-    def add_detection(self, detection: Detection, frame_number: int):
+    def add_detection(self, detection: FrameDetection, frame_number: int):
         tracked = TrackedDetection(detection, frame_number)
         self.detections_window.append(tracked)
         
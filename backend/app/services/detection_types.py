@@ -0,0 +1,73 @@
+import numpy as np
+from typing import List, NamedTuple, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BBox(NamedTuple):
+    """Internal bounding box used on the inference hot path."""
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
+
+class FrameDetection(NamedTuple):
+    """Lightweight detection passed from the model service to storage.
+    
+    Mirrors the attribute layout of the pydantic ``Detection`` model so the
+    tracker and storage code work with either, but costs a tuple allocation
+    instead of a validated model per box.
+    """
+    bbox: BBox
+    class_id: int
+    confidence: float
+    
+    def to_dict(self) -> dict:
+        return {
+            "bbox": self.bbox._asdict(),
+            "class_id": self.class_id,
+            "confidence": self.confidence
+        }
+
+
+def detections_from_array(
+    raw_output: np.ndarray,
+    min_confidence: Optional[float] = None,
+    scale: Optional[Tuple[float, float]] = None,
+    frame_size: Optional[Tuple[int, int]] = None
+) -> List[FrameDetection]:
+    """Convert a ``[num_detections, 6]`` model output into detections.
+    
+    Rows are ``[x1, y1, x2, y2, class_id, confidence]``. Conversion and the
+    optional confidence cut are vectorized; Python objects are only built for
+    the rows that survive. ``scale`` maps model-input coordinates back to the
+    frame as ``(sx, sy)`` and ``frame_size`` ``(width, height)`` clips boxes
+    to the frame.
+    """
+    if raw_output.ndim != 2 or raw_output.shape[1] != 6:
+        logger.warning(f"Invalid detection format: expected [N, 6], got {list(raw_output.shape)}")
+        return []
+    
+    if min_confidence is not None:
+        raw_output = raw_output[raw_output[:, 5] > min_confidence]
+    
+    if raw_output.shape[0] == 0:
+        return []
+    
+    coords = raw_output[:, :4]
+    if scale is not None:
+        coords = coords * np.array([scale[0], scale[1], scale[0], scale[1]], dtype=np.float32)
+    if frame_size is not None:
+        coords = np.clip(coords, 0, [frame_size[0], frame_size[1], frame_size[0], frame_size[1]])
+    
+    # astype truncates toward zero, matching int() on each coordinate
+    boxes = coords.astype(np.int64).tolist()
+    class_ids = raw_output[:, 4].astype(np.int64).tolist()
+    confidences = raw_output[:, 5].astype(np.float64).tolist()
+    
+    return [
+        FrameDetection(BBox(*box), class_id, confidence)
+        for box, class_id, confidence in zip(boxes, class_ids, confidences)
+    ]
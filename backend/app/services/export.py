@@ -0,0 +1,290 @@
+import asyncio
+import csv
+import io
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple
+import logging
+from app.services.damage_query import DamageQuery, decode_cursor, paginate
+from app.utils.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv", "geojson", "parquet", "arrow")
+
+_FLOAT_COLUMNS = ("latitude", "longitude", "confidence_score")
+
+
+class DamageExporter(ABC):
+    """Encodes pages of ``road_damage`` rows into one export stream.
+    
+    ``header()``, ``encode_page()`` per page and ``footer()`` produce the
+    bytes in order; nothing is held between pages beyond encoder state, so
+    memory stays bounded by the page size.
+    """
+    
+    media_type = "application/octet-stream"
+    extension = "bin"
+    
+    def __init__(self, fields: Tuple[str, ...]):
+        self.fields = fields
+    
+    def header(self) -> bytes:
+        return b""
+    
+    @abstractmethod
+    def encode_page(self, rows: List[dict]) -> bytes:
+        """Encode one page of rows"""
+    
+    def footer(self) -> bytes:
+        return b""
+
+
+class NdjsonExporter(DamageExporter):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+    
+    def encode_page(self, rows: List[dict]) -> bytes:
+        return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+class CsvExporter(DamageExporter):
+    media_type = "text/csv"
+    extension = "csv"
+    
+    def header(self) -> bytes:
+        return self._write([self.fields])
+    
+    def encode_page(self, rows: List[dict]) -> bytes:
+        return self._write(
+            [
+                dumps(row.get(field)).decode()
+                if isinstance(row.get(field), (dict, list)) else row.get(field)
+                for field in self.fields
+            ]
+            for row in rows
+        )
+    
+    def _write(self, rows: Iterable) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+
+class GeoJsonExporter(DamageExporter):
+    """FeatureCollection with one Point feature per row.
+    
+    ``latitude`` and ``longitude`` become the geometry; the remaining fields
+    are the feature properties.
+    """
+    
+    media_type = "application/geo+json"
+    extension = "geojson"
+    
+    def __init__(self, fields: Tuple[str, ...]):
+        super().__init__(fields)
+        self._first = True
+        self._properties = tuple(f for f in fields if f not in ("latitude", "longitude"))
+    
+    def header(self) -> bytes:
+        return b'{"type":"FeatureCollection","features":['
+    
+    def encode_page(self, rows: List[dict]) -> bytes:
+        if not rows:
+            return b""
+        features = b",".join(
+            dumps(
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [float(row["longitude"]), float(row["latitude"])]
+                    },
+                    "properties": {field: row.get(field) for field in self._properties}
+                }
+            )
+            for row in rows
+        )
+        prefix = b"" if self._first else b","
+        self._first = False
+        return prefix + features
+    
+    def footer(self) -> bytes:
+        return b"]}"
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every page"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class _ArrowExporter(DamageExporter):
+    """Base for the columnar formats; each page becomes one record batch"""
+    
+    def __init__(self, fields: Tuple[str, ...]):
+        super().__init__(fields)
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ValueError("Parquet and Arrow exports require pyarrow; install it with `pip install pyarrow`")
+        
+        self._pa = pa
+        types = {
+            "detected_at": pa.timestamp("us", tz="UTC"),
+            **{column: pa.float64() for column in _FLOAT_COLUMNS}
+        }
+        self.schema = pa.schema([(field, types.get(field, pa.string())) for field in fields])
+        self._sink = _ChunkSink()
+        self._writer = None
+    
+    def _batch(self, rows: List[dict]):
+        pa = self._pa
+        columns = []
+        for field in self.schema:
+            values = [row.get(field.name) for row in rows]
+            if field.name == "metadata":
+                values = [dumps(v).decode() if v is not None else None for v in values]
+            if field.type == pa.string():
+                values = [str(v) if v is not None and not isinstance(v, str) else v for v in values]
+                columns.append(pa.array(values, type=pa.string()))
+            elif field.name == "detected_at":
+                columns.append(pa.array([str(v) if v is not None else None for v in values]).cast(field.type))
+            else:
+                columns.append(pa.array([float(v) if v is not None else None for v in values], type=field.type))
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
+    
+    @abstractmethod
+    def _open_writer(self):
+        """Open the pyarrow writer over ``self._sink``"""
+    
+    def header(self) -> bytes:
+        self._writer = self._open_writer()
+        return self._sink.drain()
+    
+    def encode_page(self, rows: List[dict]) -> bytes:
+        if rows:
+            self._write_batch(self._batch(rows))
+        return self._sink.drain()
+    
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+    
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+class ArrowExporter(_ArrowExporter):
+    media_type = "application/vnd.apache.arrow.stream"
+    extension = "arrow"
+    
+    def _open_writer(self):
+        return self._pa.ipc.new_stream(self._sink, self.schema)
+
+
+class ParquetExporter(_ArrowExporter):
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+    
+    # Pages are collected into row groups of about this many rows; memory is
+    # bounded by one row group rather than by the export
+    row_group_rows = 65536
+    
+    def __init__(self, fields: Tuple[str, ...]):
+        super().__init__(fields)
+        self._pending: list = []
+        self._pending_rows = 0
+    
+    def _open_writer(self):
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+    
+    def _write_batch(self, batch):
+        self._pending.append(batch)
+        self._pending_rows += batch.num_rows
+        if self._pending_rows >= self.row_group_rows:
+            self._flush_row_group()
+    
+    def _flush_row_group(self):
+        if self._pending:
+            self._writer.write_table(self._pa.Table.from_batches(self._pending))
+            self._pending, self._pending_rows = [], 0
+    
+    def footer(self) -> bytes:
+        self._flush_row_group()
+        return super().footer()
+
+
+_EXPORTERS = {
+    "ndjson": NdjsonExporter,
+    "csv": CsvExporter,
+    "geojson": GeoJsonExporter,
+    "parquet": ParquetExporter,
+    "arrow": ArrowExporter,
+}
+
+
+def create_exporter(export_format: str, fields: Tuple[str, ...]) -> DamageExporter:
+    if export_format not in _EXPORTERS:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}")
+    if export_format == "geojson" and not {"latitude", "longitude"} <= set(fields):
+        raise ValueError("GeoJSON export needs the latitude and longitude fields")
+    
+    return _EXPORTERS[export_format](fields)
+
+
+def iter_pages(backend, query: DamageQuery) -> Iterator[List[dict]]:
+    """Keyset-page through ``backend`` synchronously, one list of rows per page"""
+    cursor = query.cursor
+    while True:
+        rows, next_cursor = paginate(backend.query_damages(query._replace(cursor=cursor)), query)
+        if rows:
+            yield rows
+        if next_cursor is None:
+            return
+        cursor = decode_cursor(next_cursor)
+
+
+async def stream_export(storage_service, exporter: DamageExporter, query: DamageQuery) -> AsyncIterator[bytes]:
+    """Yield the encoded export while reading ``query.limit`` rows at a time.
+    
+    The next page is fetched only after the previous chunk has been handed
+    to the client, so a slow reader throttles the storage reads. Encoding
+    is CPU-bound and runs on the default executor, one call at a time, so
+    large exports do not block other requests.
+    """
+    loop = asyncio.get_running_loop()
+    yield await loop.run_in_executor(None, exporter.header)
+    
+    cursor: Optional[Tuple[str, str]] = query.cursor
+    exported = 0
+    while True:
+        rows, next_cursor = await storage_service.query_damages(query._replace(cursor=cursor))
+        chunk = await loop.run_in_executor(None, exporter.encode_page, rows)
+        exported += len(rows)
+        if chunk:
+            yield chunk
+        if next_cursor is None:
+            break
+        cursor = decode_cursor(next_cursor)
+    
+    yield await loop.run_in_executor(None, exporter.footer)
+    logger.info(f"Exported {exported} damage records")
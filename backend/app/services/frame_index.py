@@ -0,0 +1,213 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+import logging
+import numpy as np
+from app.services.detection_types import FrameDetection, detections_from_array
+
+logger = logging.getLogger(__name__)
+
+HASH_METHODS = ("phash", "dhash")
+
+
+def _downscale(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    import cv2
+    
+    height, width = image.shape[:2]
+    # An exact 8x area reduction takes OpenCV's fast path; what is left to
+    # shrink afterwards is tiny
+    if width >= 8 * size[0] and height >= 8 * size[1]:
+        image = cv2.resize(image, (width // 8, height // 8), interpolation=cv2.INTER_AREA)
+    small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small.astype(np.float32)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash(image: np.ndarray, hash_size: int = 8) -> int:
+    """DCT hash: signs of the lowest frequencies of a 32x32 greyscale thumbnail"""
+    import cv2
+    
+    pixels = _downscale(image, (hash_size * 4, hash_size * 4))
+    coefficients = cv2.dct(pixels)[:hash_size, :hash_size].flatten()
+    return _bits_to_int(coefficients > np.median(coefficients[1:]))
+
+
+def dhash(image: np.ndarray, hash_size: int = 8) -> int:
+    """Gradient hash: whether each pixel of a tiny thumbnail is darker than its right neighbour"""
+    pixels = _downscale(image, (hash_size + 1, hash_size))
+    return _bits_to_int((pixels[:, 1:] > pixels[:, :-1]).flatten())
+
+
+def gps_bucket(latitude: float, longitude: float, cell_degrees: float) -> Tuple[int, int]:
+    """Grid cell of a position, so only frames shot nearby are compared"""
+    return math.floor(latitude / cell_degrees), math.floor(longitude / cell_degrees)
+
+
+class FrameMatch(NamedTuple):
+    distance: int
+    source: str
+    detections: List[FrameDetection]
+
+
+class _Entry:
+    __slots__ = ("id", "hash", "bucket", "bands", "rows", "source", "expires_at")
+
+
+class PerceptualFrameIndex:
+    """Detections of analysed frames, looked up by perceptual hash.
+    
+    A frame whose hash is within ``max_distance`` bits of an indexed frame in
+    the same ``bucket`` can reuse that frame's detections instead of running
+    inference. Buckets keep frames comparable: callers put the model
+    version, confidence threshold and, when known, a GPS cell in them.
+    
+    Lookups use multi-index hashing: the hash is cut into
+    ``max_distance + 1`` bands, and two hashes within ``max_distance`` bits
+    must agree exactly on at least one band. Only frames sharing a band are
+    compared, so lookups stay fast as the index grows. Entries are evicted
+    least recently used beyond ``max_entries`` and expire after
+    ``ttl_seconds``. Safe to share between inference threads.
+    """
+    
+    def __init__(
+        self,
+        method: str = "phash",
+        hash_size: int = 8,
+        max_distance: int = 4,
+        max_entries: int = 100_000,
+        ttl_seconds: float = 7 * 24 * 3600
+    ):
+        if method not in HASH_METHODS:
+            raise ValueError(f"Unknown frame hash {method!r}; expected one of {HASH_METHODS}")
+        self.method = method
+        self.hash_size = hash_size
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        
+        bits = hash_size * hash_size
+        bands = max_distance + 1
+        edges = [round(i * bits / bands) for i in range(bands + 1)]
+        self._bands = [(low, (1 << (high - low)) - 1) for low, high in zip(edges, edges[1:])]
+        self._tables: List[Dict[tuple, Set[int]]] = [{} for _ in self._bands]
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_id = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def hash_frame(self, image: np.ndarray) -> int:
+        if self.method == "phash":
+            return phash(image, self.hash_size)
+        return dhash(image, self.hash_size)
+    
+    def _band_keys(self, frame_hash: int, bucket: Hashable) -> List[tuple]:
+        return [(bucket, (frame_hash >> shift) & mask) for shift, mask in self._bands]
+    
+    def _remove(self, entry: _Entry):
+        del self._entries[entry.id]
+        for table, key in zip(self._tables, entry.bands):
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(entry.id)
+                if not ids:
+                    del table[key]
+    
+    def lookup(
+        self,
+        frame_hash: int,
+        frame_shape: Tuple[int, ...],
+        bucket: Hashable = None,
+        exclude_source: Optional[str] = None
+    ) -> Optional[FrameMatch]:
+        """Detections of the closest indexed frame, scaled to ``frame_shape``, or ``None``"""
+        now = time.monotonic()
+        with self._lock:
+            candidates: Set[int] = set()
+            for table, key in zip(self._tables, self._band_keys(frame_hash, bucket)):
+                candidates.update(table.get(key, ()))
+            
+            best: Optional[_Entry] = None
+            best_distance = self.max_distance + 1
+            for entry_id in candidates:
+                entry = self._entries.get(entry_id)
+                if entry is None:
+                    continue
+                if entry.expires_at <= now:
+                    self._remove(entry)
+                    self.expirations += 1
+                    continue
+                if exclude_source is not None and entry.source == exclude_source:
+                    continue
+                distance = (entry.hash ^ frame_hash).bit_count()
+                if distance < best_distance:
+                    best, best_distance = entry, distance
+            
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best.id)
+            self.hits += 1
+            rows, source = best.rows, best.source
+        
+        height, width = frame_shape[:2]
+        detections = detections_from_array(rows, None, (width, height), (width, height))
+        return FrameMatch(best_distance, source, detections)
+    
+    def add(
+        self,
+        frame_hash: int,
+        frame_shape: Tuple[int, ...],
+        detections: List[FrameDetection],
+        bucket: Hashable = None,
+        source: str = ""
+    ):
+        """Index a frame's detections, kept in frame-relative coordinates"""
+        height, width = frame_shape[:2]
+        rows = np.array(
+            [(*d.bbox, d.class_id, d.confidence) for d in detections], dtype=np.float32
+        ).reshape(-1, 6)
+        rows[:, [0, 2]] /= width
+        rows[:, [1, 3]] /= height
+        
+        entry = _Entry()
+        entry.hash = frame_hash
+        entry.bucket = bucket
+        entry.bands = self._band_keys(frame_hash, bucket)
+        entry.rows = rows
+        entry.source = source
+        entry.expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            entry.id = self._next_id
+            self._next_id += 1
+            self._entries[entry.id] = entry
+            for table, key in zip(self._tables, entry.bands):
+                table.setdefault(key, set()).add(entry.id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries.values())))
+                self.evictions += 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1,145 @@
+import threading
+from typing import Optional
+import logging
+import httpx
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Counts requests and the connections and TLS handshakes they needed.
+    
+    Fed by httpcore's ``trace`` request extension, so a request that did not
+    open a connection is one that reused a pooled one.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.errors = 0
+        self.in_flight = 0
+    
+    def _add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_ratio": round(reused / self.requests, 4) if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "errors": self.errors,
+                "in_flight": self.in_flight
+            }
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """``HTTPTransport`` that records pool activity in ``PoolMetrics``"""
+    
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        metrics = self.metrics
+        outer_trace = request.extensions.get("trace")
+        
+        def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                metrics._add(connections_opened=1)
+            elif event_name == "connection.start_tls.complete":
+                metrics._add(tls_handshakes=1)
+            if outer_trace is not None:
+                outer_trace(event_name, info)
+        
+        request.extensions = {**request.extensions, "trace": trace}
+        metrics._add(requests=1, in_flight=1)
+        try:
+            return super().handle_request(request)
+        except Exception:
+            metrics._add(errors=1)
+            raise
+        finally:
+            metrics._add(in_flight=-1)
+    
+    def open_connections(self) -> int:
+        return len(getattr(self._pool, "connections", ()))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client(metrics: Optional[PoolMetrics] = None) -> httpx.Client:
+    """Build a pooled client from the ``HTTP_*`` settings.
+    
+    HTTP/2 is used when enabled and the ``h2`` package is installed; it
+    multiplexes concurrent requests over one connection per host.
+    """
+    http2 = settings.http2 and _http2_available()
+    if settings.http2 and not http2:
+        logger.warning("HTTP2 is enabled but the h2 package is missing; using HTTP/1.1")
+    
+    transport = InstrumentedTransport(
+        metrics or PoolMetrics(),
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds
+        ),
+        retries=settings.http_connect_retries
+    )
+    return httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(
+            connect=settings.http_connect_timeout_seconds,
+            read=settings.http_read_timeout_seconds,
+            write=settings.http_write_timeout_seconds,
+            pool=settings.http_pool_timeout_seconds
+        ),
+        follow_redirects=True
+    )
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """The process-wide pooled client, created on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_http_client()
+    return _client
+
+
+def pool_stats() -> dict:
+    """Metrics of the shared client; empty until it has been created"""
+    client = _client
+    if client is None:
+        return {}
+    transport = client._transport
+    return {**transport.metrics.snapshot(), "open_connections": transport.open_connections()}
+
+
+def close_http_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,119 @@
+import io
+import os
+import zipfile
+import zlib
+from typing import List, NamedTuple, Optional, Tuple
+import logging
+import numpy as np
+from app.services.detection_types import FrameDetection
+from app.services.storage_service import DAMAGE_TYPE_MAPPING
+from app.utils.errors import ImageError
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+class ImageInput(NamedTuple):
+    filename: str
+    data: bytes
+
+
+def _is_zip(upload: ImageInput) -> bool:
+    return upload.filename.lower().endswith(".zip") or upload.data[:4] == b"PK\x03\x04"
+
+
+def _is_image_name(name: str) -> bool:
+    base = os.path.basename(name)
+    return (
+        not base.startswith(".")
+        and not name.startswith("__MACOSX/")
+        and os.path.splitext(base)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def expand_archives(uploads: List[ImageInput], max_images: int, max_bytes: int) -> List[ImageInput]:
+    """Replace zip uploads with the images inside them, enforcing the batch limits.
+    
+    Archive members are checked against ``max_bytes`` by their recorded size
+    before they are inflated; a member that cannot be read raises
+    ``ImageError``. Other files in an archive are skipped; other uploads are
+    passed on as images.
+    """
+    images = []
+    total = 0
+    for upload in uploads:
+        if not _is_zip(upload):
+            members = [(upload.filename, len(upload.data), None)]
+            archive = None
+        else:
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(upload.data))
+            except zipfile.BadZipFile:
+                raise ImageError("Not a valid zip archive", {"filename": upload.filename})
+            members = [
+                (f"{upload.filename}/{info.filename}", info.file_size, info)
+                for info in archive.infolist()
+                if not info.is_dir() and _is_image_name(info.filename)
+            ]
+        
+        for filename, size, info in members:
+            total += size
+            if len(images) >= max_images:
+                raise ImageError(f"Batch exceeds the maximum of {max_images} images", {"filename": filename})
+            if total > max_bytes:
+                raise ImageError(
+                    f"Batch exceeds the maximum size of {max_bytes // (1024 * 1024)}MB", {"filename": filename}
+                )
+            if info is None:
+                data = upload.data
+            else:
+                try:
+                    data = archive.read(info)
+                except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError, RuntimeError) as e:
+                    # Corrupt, truncated, encrypted or unsupported members
+                    raise ImageError(f"Could not read archive member: {e}", {"filename": filename})
+            images.append(ImageInput(filename, data))
+    return images
+
+
+def decode_image(data: bytes) -> np.ndarray:
+    """Decode an encoded image to BGR, applying its EXIF orientation"""
+    import cv2
+    
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ImageError("Could not decode image", {"bytes": len(data)})
+    return image
+
+
+def decode_for_model(model_service, data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode an image and build its model input; both release the GIL, so this runs on a pool"""
+    image = decode_image(data)
+    return image, model_service.preprocess_input(image)
+
+
+def image_result(
+    filename: str,
+    image: Optional[np.ndarray] = None,
+    detections: Optional[List[Tuple[str, FrameDetection]]] = None,
+    error_message: Optional[str] = None
+) -> dict:
+    """Per-image entry of a batch response; ``detections`` pairs stored ids with detections"""
+    return {
+        "filename": filename,
+        "status": "failed" if error_message else "completed",
+        "width": image.shape[1] if image is not None else None,
+        "height": image.shape[0] if image is not None else None,
+        "detections": [
+            {
+                "id": detection_id,
+                "damage_type": DAMAGE_TYPE_MAPPING.get(detection.class_id, "unknown"),
+                "class_id": detection.class_id,
+                "confidence": round(detection.confidence, 6),
+                "bbox": list(detection.bbox)
+            }
+            for detection_id, detection in detections or []
+        ],
+        "error_message": error_message
+    }
@@ -0,0 +1,148 @@
+import numpy as np
+import time
+from typing import Dict, List, NamedTuple, Optional
+import logging
+from app.services.detection_types import BBox
+
+logger = logging.getLogger(__name__)
+
+IMAGE_OUTPUT_MODES = ("full", "crop", "thumbnail", "both")
+
+# Which image becomes the record's image_url when several are produced
+PRIMARY_IMAGE_ORDER = ("crop", "thumbnail", "full")
+
+# cv2 quality flags are looked up by name so cv2 loads on first encode
+_FORMATS = {
+    "jpeg": (".jpg", "image/jpeg", "IMWRITE_JPEG_QUALITY"),
+    "webp": (".webp", "image/webp", "IMWRITE_WEBP_QUALITY"),
+}
+
+
+class EncodedImage(NamedTuple):
+    kind: str
+    data: bytes
+    content_type: str
+    extension: str
+    encode_ms: float
+    region: Optional[BBox] = None
+
+
+class ImageOutputConfig:
+    def __init__(
+        self,
+        mode: str = "crop",
+        image_format: str = "jpeg",
+        crop_margin: float = 0.15,
+        crop_quality: int = 90,
+        thumbnail_max_side: int = 640,
+        thumbnail_quality: int = 75,
+        full_quality: int = 95
+    ):
+        if mode not in IMAGE_OUTPUT_MODES:
+            raise ValueError(f"Unknown image output mode '{mode}', expected one of {IMAGE_OUTPUT_MODES}")
+        if image_format not in _FORMATS:
+            raise ValueError(f"Unknown image format '{image_format}', expected one of {tuple(_FORMATS)}")
+        self.mode = mode
+        self.image_format = image_format
+        self.crop_margin = crop_margin
+        self.crop_quality = crop_quality
+        self.thumbnail_max_side = thumbnail_max_side
+        self.thumbnail_quality = thumbnail_quality
+        self.full_quality = full_quality
+    
+    @classmethod
+    def from_settings(cls, settings) -> "ImageOutputConfig":
+        return cls(
+            mode=settings.image_output_mode,
+            image_format=settings.image_format,
+            crop_margin=settings.image_crop_margin,
+            crop_quality=settings.image_crop_quality,
+            thumbnail_max_side=settings.image_thumbnail_max_side,
+            thumbnail_quality=settings.image_thumbnail_quality,
+            full_quality=settings.image_full_quality
+        )
+
+
+def crop_region(bbox: BBox, frame_shape, margin: float) -> BBox:
+    """Expand a bbox by ``margin`` of its size on each side, clipped to the frame"""
+    height, width = frame_shape[:2]
+    pad_x = int((bbox.x2 - bbox.x1) * margin)
+    pad_y = int((bbox.y2 - bbox.y1) * margin)
+    x1 = max(0, bbox.x1 - pad_x)
+    y1 = max(0, bbox.y1 - pad_y)
+    x2 = min(width, bbox.x2 + pad_x)
+    y2 = min(height, bbox.y2 + pad_y)
+    
+    # Degenerate boxes still produce a 1x1 crop rather than an empty image
+    return BBox(x1, y1, max(x2, x1 + 1), max(y2, y1 + 1))
+
+
+def _encode(
+    kind: str,
+    image: np.ndarray,
+    image_format: str,
+    quality: int,
+    region: Optional[BBox] = None,
+    start: Optional[float] = None
+) -> EncodedImage:
+    # ``start`` lets callers include resizing and drawing in the encode time
+    import cv2
+    extension, content_type, quality_flag = _FORMATS[image_format]
+    start = start if start is not None else time.perf_counter()
+    ok, buffer = cv2.imencode(extension, image, [getattr(cv2, quality_flag), quality])
+    encode_ms = (time.perf_counter() - start) * 1000
+    if not ok:
+        raise ValueError(f"Failed to encode {kind} image as {image_format}")
+    return EncodedImage(kind, buffer.tobytes(), content_type, extension, encode_ms, region)
+
+
+def encode_detection_images(frame: np.ndarray, bbox: BBox, config: ImageOutputConfig) -> List[EncodedImage]:
+    """Encode the images stored for one detection according to ``config.mode``"""
+    images = []
+    
+    if config.mode == "full":
+        images.append(_encode("full", frame, config.image_format, config.full_quality))
+    
+    if config.mode in ("crop", "both"):
+        region = crop_region(bbox, frame.shape, config.crop_margin)
+        # Slicing is a view; no copy of the frame is made before encoding
+        crop = frame[region.y1:region.y2, region.x1:region.x2]
+        images.append(_encode("crop", crop, config.image_format, config.crop_quality, region))
+    
+    if config.mode in ("thumbnail", "both"):
+        import cv2
+        start = time.perf_counter()
+        height, width = frame.shape[:2]
+        scale = min(1.0, config.thumbnail_max_side / max(height, width))
+        if scale < 1.0:
+            thumbnail = cv2.resize(
+                frame,
+                (max(1, int(width * scale)), max(1, int(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        else:
+            thumbnail = frame.copy()
+        cv2.rectangle(
+            thumbnail,
+            (int(bbox.x1 * scale), int(bbox.y1 * scale)),
+            (int(bbox.x2 * scale), int(bbox.y2 * scale)),
+            (0, 255, 0),
+            2
+        )
+        images.append(_encode(
+            "thumbnail",
+            thumbnail,
+            config.image_format,
+            config.thumbnail_quality,
+            start=start
+        ))
+    
+    return images
+
+
+def attach_image_urls(record: dict, urls: Dict[str, str]) -> dict:
+    """Set ``image_url`` to the primary image and list every uploaded image in metadata"""
+    record = dict(record)
+    record["image_url"] = next(urls[kind] for kind in PRIMARY_IMAGE_ORDER if kind in urls)
+    record["metadata"] = dict(record.get("metadata") or {}, images=urls)
+    return record
@@ -0,0 +1,269 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+import logging
+from app.services.damage_query import ROAD_DAMAGE_COLUMNS, DamageQuery
+from app.services.rollups import (
+    ROLLUP_BATCH_TABLE,
+    ROLLUPS_TABLE,
+    batch_rollup_statement,
+    rebuild_statements,
+    rollup_trigger_statements
+)
+from app.services.storage_backend import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+# Mirrors public.road_damage after all migrations in supabase/migrations.
+# DECIMAL columns become REAL, JSONB becomes JSON text and timestamps are
+# stored as UTC ISO-8601 strings so they sort lexicographically.
+ROAD_DAMAGE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS road_damage (
+        id TEXT NOT NULL PRIMARY KEY,
+        damage_type TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        confidence_score REAL,
+        detected_at TEXT NOT NULL,
+        road_name TEXT,
+        city TEXT,
+        metadata TEXT,
+        road_category TEXT NOT NULL DEFAULT 'municipal',
+        state TEXT,
+        district TEXT,
+        municipality TEXT,
+        autobahn_region TEXT,
+        image_url TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_road_damage_location ON road_damage (latitude, longitude)",
+    "CREATE INDEX IF NOT EXISTS idx_road_damage_detected_at ON road_damage (detected_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_road_damage_type ON road_damage (damage_type)",
+)
+
+
+def normalize_timestamp(value) -> str:
+    """Return ``value`` as a UTC ISO-8601 string; naive times are taken as UTC"""
+    if value is None:
+        parsed = datetime.now(timezone.utc)
+    elif isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def row_to_record(row: sqlite3.Row) -> dict:
+    record = dict(row)
+    if record.get("metadata") is not None:
+        record["metadata"] = json.loads(record["metadata"])
+    return record
+
+
+class LocalStorageBackend(StorageBackend):
+    """Embedded backend: images in a directory, rows in a SQLite database.
+    
+    Lets edge boxes run without network access and gives benchmarks a
+    storage layer free of network noise. Image URLs are ``image_base_url``
+    joined with the filename; the app serves that path from ``images_dir``.
+    """
+    
+    def __init__(self, data_dir: str, image_base_url: str = "/images"):
+        self.data_dir = data_dir
+        self.images_dir = os.path.join(data_dir, "damage-images")
+        self.db_path = os.path.join(data_dir, "road_damage.db")
+        self.image_base_url = image_base_url.rstrip("/")
+        os.makedirs(self.images_dir, exist_ok=True)
+        
+        # One writer connection behind a lock; readers get a connection per
+        # thread so WAL lets them run alongside inserts
+        self._write_lock = threading.Lock()
+        self._write_conn = self._connect()
+        self._local = threading.local()
+        self._read_conns: List[sqlite3.Connection] = []
+        self._read_conns_lock = threading.Lock()
+        
+        with self._write_lock:
+            self._write_conn.execute("PRAGMA journal_mode=WAL")
+            has_rollups = self._write_conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'road_damage_rollups'"
+            ).fetchone() is not None
+            for statement in ROAD_DAMAGE_SCHEMA:
+                self._write_conn.execute(statement)
+            # Statistics rollups are kept current by insert_records for
+            # inserts and by triggers on road_damage for updates and deletes
+            self._write_conn.execute(ROLLUPS_TABLE)
+            for statement in rollup_trigger_statements():
+                self._write_conn.execute(statement)
+            self._write_conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {ROLLUP_BATCH_TABLE} AS SELECT * FROM road_damage WHERE false"
+            )
+        
+        if not has_rollups:
+            # Databases created before the rollups existed need one backfill
+            self.rebuild_rollups()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._read_conns_lock:
+                self._read_conns.append(conn)
+        return conn
+    
+    def upload_image(self, image_bytes: bytes, filename: str, content_type: str) -> str:
+        image_path = os.path.join(self.images_dir, os.path.basename(filename))
+        temp_path = f"{image_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(image_bytes)
+        os.replace(temp_path, image_path)
+        return f"{self.image_base_url}/{os.path.basename(filename)}"
+    
+    def _row_values(self, record: dict) -> tuple:
+        unknown = set(record) - set(ROAD_DAMAGE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown road_damage columns: {sorted(unknown)}")
+        
+        values = dict(record)
+        values["detected_at"] = normalize_timestamp(record.get("detected_at"))
+        values["road_category"] = record.get("road_category") or "municipal"
+        if record.get("metadata") is not None:
+            values["metadata"] = json.dumps(record["metadata"])
+        return tuple(values.get(column) for column in ROAD_DAMAGE_COLUMNS)
+    
+    def insert_records(self, records: List[dict]):
+        """Insert a batch, skipping existing ids, and add it to the rollups in one grouped upsert"""
+        rows = [self._row_values(record) for record in records]
+        columns = ", ".join(ROAD_DAMAGE_COLUMNS)
+        placeholders = ", ".join("?" for _ in ROAD_DAMAGE_COLUMNS)
+        with self._write_lock:
+            self._write_conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_conn.executemany(
+                    f"INSERT INTO {ROLLUP_BATCH_TABLE} ({columns}) VALUES ({placeholders})", rows
+                )
+                # Only rows that are new, once per id, count towards the rollups
+                self._write_conn.execute(
+                    f"DELETE FROM {ROLLUP_BATCH_TABLE} WHERE id IN (SELECT id FROM main.road_damage) "
+                    f"OR rowid NOT IN (SELECT MIN(rowid) FROM {ROLLUP_BATCH_TABLE} GROUP BY id)"
+                )
+                self._write_conn.execute(
+                    f"INSERT INTO road_damage ({columns}) SELECT {columns} FROM {ROLLUP_BATCH_TABLE}"
+                )
+                self._write_conn.execute(batch_rollup_statement())
+                self._write_conn.execute(f"DELETE FROM {ROLLUP_BATCH_TABLE}")
+            except Exception:
+                self._write_conn.execute("ROLLBACK")
+                raise
+            self._write_conn.execute("COMMIT")
+    
+    def select_latest(self, limit: int, columns: Tuple[str, ...] = ROAD_DAMAGE_COLUMNS) -> List[dict]:
+        rows = self._reader().execute(
+            f"SELECT {', '.join(columns)} FROM road_damage ORDER BY detected_at DESC, id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [row_to_record(row) for row in rows]
+    
+    def _query_conditions(self, query: DamageQuery) -> Tuple[List[str], list]:
+        conditions, params = [], []
+        
+        if query.detected_after is not None:
+            conditions.append("detected_at >= ?")
+            params.append(normalize_timestamp(query.detected_after))
+        if query.detected_before is not None:
+            conditions.append("detected_at < ?")
+            params.append(normalize_timestamp(query.detected_before))
+        if query.damage_types:
+            conditions.append(f"damage_type IN ({', '.join('?' for _ in query.damage_types)})")
+            params += list(query.damage_types)
+        if query.severities:
+            conditions.append(f"severity IN ({', '.join('?' for _ in query.severities)})")
+            params += list(query.severities)
+        if query.min_confidence is not None:
+            conditions.append("confidence_score >= ?")
+            params.append(query.min_confidence)
+        if query.max_confidence is not None:
+            conditions.append("confidence_score <= ?")
+            params.append(query.max_confidence)
+        for column in ("state", "district", "road_name"):
+            value = getattr(query, column)
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if query.bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = query.bbox
+            conditions.append("latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?")
+            params += [min_lat, max_lat, min_lon, max_lon]
+        
+        return conditions, params
+    
+    def query_damages(self, query: DamageQuery) -> List[dict]:
+        conditions, params = self._query_conditions(query)
+        if query.cursor is not None:
+            # The leading range on detected_at keeps the scan on
+            # idx_road_damage_detected_at; the OR settles ties on id
+            detected_at, record_id = query.cursor
+            conditions.insert(0, "detected_at <= ? AND (detected_at < ? OR id < ?)")
+            params = [detected_at, detected_at, record_id] + params
+        sql = f"SELECT {', '.join(query.select_columns())} FROM road_damage"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY detected_at DESC, id DESC LIMIT ?"
+        rows = self._reader().execute(sql, params + [query.limit + 1]).fetchall()
+        return [row_to_record(row) for row in rows]
+    
+    def select_points(self, query: DamageQuery, max_rows: Optional[int] = None) -> List[dict]:
+        conditions, params = self._query_conditions(query)
+        sql = f"SELECT {', '.join(query.fields)} FROM road_damage"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " LIMIT ?"
+        rows = self._reader().execute(sql, params + [max_rows if max_rows is not None else -1]).fetchall()
+        return [dict(row) for row in rows]
+    
+    def select_rollups(self) -> List[dict]:
+        rows = self._reader().execute(
+            "SELECT dimension, bucket, count FROM road_damage_rollups WHERE count > 0"
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def rebuild_rollups(self):
+        with self._write_lock:
+            self._write_conn.execute("BEGIN")
+            try:
+                for statement in rebuild_statements():
+                    self._write_conn.execute(statement)
+            except Exception:
+                self._write_conn.execute("ROLLBACK")
+                raise
+            self._write_conn.execute("COMMIT")
+    
+    def test_connection(self) -> bool:
+        try:
+            self._reader().execute("SELECT id FROM road_damage LIMIT 1").fetchall()
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Local storage connection test failed: {e}")
+            return False
+    
+    def close(self):
+        with self._read_conns_lock:
+            for conn in self._read_conns:
+                conn.close()
+            self._read_conns = []
+        with self._write_lock:
+            self._write_conn.close()
@@ -0,0 +1,62 @@
+import threading
+import time
+from typing import Dict, Optional
+import logging
+from app.utils.errors import ModelError
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """Loads each ONNX model once per process and hands out the shared session.
+    
+    Models load on first use (or on ``preload``) rather than per job;
+    ``onnxruntime`` is only imported by the first load.
+    """
+    
+    def __init__(self, default_path: str):
+        self.default_path = default_path
+        self._models: Dict[str, object] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, model_path: Optional[str] = None):
+        """Return the loaded ``ONNXModelService`` for ``model_path`` (default model if omitted)"""
+        model_path = model_path or self.default_path
+        model = self._models.get(model_path)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            model = self._models.get(model_path)
+            if model is None:
+                from app.services.onnx_service import ONNXModelService
+                start = time.perf_counter()
+                try:
+                    model = ONNXModelService(model_path)
+                except ModelError as e:
+                    self._errors[model_path] = e.message
+                    raise
+                self._load_ms[model_path] = (time.perf_counter() - start) * 1000
+                self._errors.pop(model_path, None)
+                self._models[model_path] = model
+                logger.info(f"Loaded model {model_path} in {self._load_ms[model_path]:.0f} ms")
+        return model
+    
+    def preload(self, model_path: Optional[str] = None):
+        self.get(model_path)
+    
+    def is_loaded(self, model_path: Optional[str] = None) -> bool:
+        return (model_path or self.default_path) in self._models
+    
+    def status(self) -> dict:
+        return {
+            "default": self.default_path,
+            "loaded": {path: {"load_ms": round(ms, 1)} for path, ms in self._load_ms.items()},
+            "errors": dict(self._errors)
+        }
+    
+    def close(self):
+        with self._lock:
+            self._models.clear()
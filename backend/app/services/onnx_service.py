@@ -1,9 +1,11 @@
-import onnxruntime as ort
 import numpy as np
-from typing import List
+from typing import List, Optional, Tuple
 import logging
-from app.api.models import Detection, BoundingBox, ModelMetadata
+from app.api.models import ModelMetadata
+from app.services.detection_types import FrameDetection, detections_from_array
 from app.utils.errors import ModelError
+from app.utils.hashing import file_sha256
+from app.utils.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +16,13 @@ class ONNXModelService:
         self.session = None
         self.input_name = None
         self.output_names = None
+        self._version = None
         self._load_model()
     
     def _load_model(self):
         try:
+            # Imported here so processes that never run inference don't pay for it
+            import onnxruntime as ort
             self.session = ort.InferenceSession(self.model_path)
             self.input_name = self.session.get_inputs()[0].name
             self.output_names = [output.name for output in self.session.get_outputs()]
@@ -39,10 +44,26 @@ class ONNXModelService:
             output_names=self.output_names
         )
     
+    @property
+    def version(self) -> str:
+        """Short content hash of the model file, stable across renames"""
+        if self._version is None:
+            self._version = file_sha256(self.model_path)[:16]
+        return self._version
+    
+    def input_size(self) -> Tuple[int, int]:
+        # Model input (height, width) from the NCHW input shape
+        input_shape = self.session.get_inputs()[0].shape
+        return input_shape[2], input_shape[3]
+    
+    def batch_limit(self) -> Optional[int]:
+        """Images per session run: the model's fixed batch size, or ``None`` when it is dynamic"""
+        batch = self.session.get_inputs()[0].shape[0]
+        return batch if isinstance(batch, int) else None
+    
     def preprocess_input(self, frame: np.ndarray) -> np.ndarray:
         # Resize to model input size (typically 640x640 for YOLO)
-        input_shape = self.session.get_inputs()[0].shape
-        target_size = (input_shape[2], input_shape[3])
+        target_size = self.input_size()
         
         # Resize frame
         resized = np.array(frame)
@@ -63,43 +84,99 @@ class ONNXModelService:
         
         return input_tensor
     
-    def postprocess_output(self, raw_output: np.ndarray) -> List[Detection]:
-        detections = []
-        
+    def postprocess_output(
+        self,
+        raw_output: np.ndarray,
+        min_confidence: Optional[float] = None,
+        frame_shape: Optional[Tuple[int, ...]] = None
+    ) -> List[FrameDetection]:
         # YOLO output format: [batch, num_detections, 6]
         # Each detection: [x1, y1, x2, y2, class_id, confidence]
         if len(raw_output.shape) == 3:
             raw_output = raw_output[0]  # Remove batch dimension
         
-        for detection_data in raw_output:
-            if len(detection_data) != 6:
-                logger.warning(f"Invalid detection format: expected 6 values, got {len(detection_data)}")
-                continue
-            
-            x1, y1, x2, y2, class_id, confidence = detection_data
-            
-            bbox = BoundingBox(
-                x1=int(x1),
-                y1=int(y1),
-                x2=int(x2),
-                y2=int(y2)
-            )
-            
-            detection = Detection(
-                bbox=bbox,
-                class_id=int(class_id),
-                confidence=float(confidence)
-            )
-            detections.append(detection)
+        # Boxes come back in model input coordinates; map them onto the frame
+        scale = None
+        frame_size = None
+        if frame_shape is not None:
+            input_height, input_width = self.input_size()
+            frame_height, frame_width = frame_shape[:2]
+            scale = (frame_width / input_width, frame_height / input_height)
+            frame_size = (frame_width, frame_height)
+        
+        return detections_from_array(raw_output, min_confidence, scale, frame_size)
+    
+    def infer_raw(self, frame: np.ndarray, timer: Optional[StageTimer] = None) -> np.ndarray:
+        """Run the model on ``frame`` and return its ``[N, 6]`` rows in model input coordinates"""
+        timer = timer or StageTimer()
+        try:
+            with timer.measure("preprocess"):
+                input_tensor = self.preprocess_input(frame)
+            with timer.measure("session_run"):
+                outputs = self.session.run(self.output_names, {self.input_name: input_tensor})
+            raw_output = outputs[0]
+            return raw_output[0] if raw_output.ndim == 3 else raw_output
+        except Exception as e:
+            logger.error(f"Inference failed: {e}")
+            raise ModelError(f"Inference failed: {str(e)}", {})
+    
+    def run_batch(self, input_tensors: List[np.ndarray], timer: Optional[StageTimer] = None) -> List[np.ndarray]:
+        """Run preprocessed ``[1, C, H, W]`` tensors and return each one's ``[N, 6]`` rows.
         
-        return detections
+        Tensors are stacked into one session run when the model's batch
+        dimension is dynamic; a fixed batch size is filled and padded, so a
+        batch-1 model runs them one by one.
+        """
+        timer = timer or StageTimer()
+        fixed = self.batch_limit()
+        limit = fixed or max(len(input_tensors), 1)
+        results = []
+        try:
+            for start in range(0, len(input_tensors), limit):
+                chunk = input_tensors[start:start + limit]
+                batch = np.concatenate(chunk)
+                if fixed is not None and len(chunk) < fixed:
+                    padding = np.zeros((fixed - len(chunk), *batch.shape[1:]), dtype=batch.dtype)
+                    batch = np.concatenate([batch, padding])
+                with timer.measure("session_run"):
+                    output = self.session.run(self.output_names, {self.input_name: batch})[0]
+                if output.ndim == 2:
+                    output = output[None]
+                results.extend(output[:len(chunk)])
+            return results
+        except Exception as e:
+            logger.error(f"Batch inference failed: {e}")
+            raise ModelError(f"Inference failed: {str(e)}", {"batch_size": len(input_tensors)})
+    
+    def infer_batch(
+        self,
+        frames: List[np.ndarray],
+        min_confidence: Optional[float] = None,
+        timer: Optional[StageTimer] = None
+    ) -> List[List[FrameDetection]]:
+        """Detect damage in several images with as few session runs as the model allows"""
+        timer = timer or StageTimer()
+        with timer.measure("preprocess"):
+            input_tensors = [self.preprocess_input(frame) for frame in frames]
+        raw_outputs = self.run_batch(input_tensors, timer)
+        with timer.measure("postprocess"):
+            return [
+                self.postprocess_output(raw_output, min_confidence, frame.shape)
+                for raw_output, frame in zip(raw_outputs, frames)
+            ]
     
-    def infer(self, frame: np.ndarray) -> List[Detection]:
+    def infer(
+        self,
+        frame: np.ndarray,
+        min_confidence: Optional[float] = None,
+        timer: Optional[StageTimer] = None
+    ) -> List[FrameDetection]:
+        """Detect damage in ``frame``, timing each step into ``timer`` if given"""
+        timer = timer or StageTimer()
+        raw_output = self.infer_raw(frame, timer)
         try:
-            input_tensor = self.preprocess_input(frame)
-            outputs = self.session.run(self.output_names, {self.input_name: input_tensor})
-            detections = self.postprocess_output(outputs[0])
-            return detections
+            with timer.measure("postprocess"):
+                return self.postprocess_output(raw_output, min_confidence, frame.shape)
         except Exception as e:
             logger.error(f"Inference failed: {e}")
             raise ModelError(f"Inference failed: {str(e)}", {})
@@ -0,0 +1,171 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Leaf frames of threads parked waiting for work; sampling them would bury
+# the job under idle pool workers and the event loop's select()
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker")
+}
+
+
+def _frame_label(code) -> Tuple[str, str]:
+    return os.path.basename(code.co_filename), getattr(code, "co_qualname", code.co_name)
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of attached threads on a background thread.
+    
+    Only threads attached with ``attach`` or running a callable through
+    ``call`` are sampled, so a job's profile leaves out other jobs and
+    request handlers on other threads, and their stacks are never walked.
+    Nothing is hooked into the profiled code; the cost is one stack walk per
+    attached thread per interval, and only while running. Stacks are kept
+    root-first with the thread name as the root frame, ready for flame
+    graph tools.
+    """
+    
+    def __init__(self, interval: float = 0.01, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Thread ident -> nesting depth of attachments
+        self._attached: Counter = Counter()
+        self._lock = threading.Lock()
+    
+    def attach(self, ident: Optional[int] = None):
+        """Sample ``ident`` (default: the calling thread) until detached"""
+        with self._lock:
+            self._attached[ident or threading.get_ident()] += 1
+    
+    def detach(self, ident: Optional[int] = None):
+        ident = ident or threading.get_ident()
+        with self._lock:
+            self._attached[ident] -= 1
+            if self._attached[ident] <= 0:
+                del self._attached[ident]
+    
+    def call(self, fn: Callable, *args, **kwargs):
+        """Run ``fn`` with the calling thread attached, e.g. on a shared pool"""
+        self.attach()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.detach()
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="job-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                attached = [ident for ident in self._attached if ident != own_id]
+            if not attached:
+                continue
+            frames = sys._current_frames()
+            if any(ident not in names for ident in attached):
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self.samples += 1
+            for ident in attached:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                leaf = frame.f_code
+                if not self.include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append((names.get(ident, f"thread-{ident}"), ""))
+                self.stacks[tuple(reversed(stack))] += 1
+    
+    def collapsed(self) -> str:
+        """One ``root;...;leaf count`` line per distinct stack"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = [stack[0][0]] + [f"{name}:{function}" for name, function in stack[1:]]
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n"
+    
+    def top(self, limit: int = 25) -> List[dict]:
+        """Functions by samples spent in them (self) and under them (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        
+        sampled = sum(self.stacks.values()) or 1
+        return [
+            {
+                "function": f"{name}:{function}",
+                "self_samples": own[(name, function)],
+                "total_samples": total[(name, function)],
+                "self_pct": round(100 * own[(name, function)] / sampled, 2),
+                "total_pct": round(100 * total[(name, function)] / sampled, 2)
+            }
+            for (name, function), _ in sorted(total.items(), key=lambda item: (-own[item[0]], -item[1]))[:limit]
+        ]
+    
+    def summary(self, limit: int = 25) -> dict:
+        return {
+            "mode": "sampling",
+            "interval_ms": round(self.interval * 1000, 3),
+            "duration_seconds": round(self.duration, 3),
+            "samples": self.samples,
+            "stacks": len(self.stacks),
+            "top": self.top(limit)
+        }
+
+
+def profile_paths(profile_dir: str, job_id: str) -> Dict[str, str]:
+    return {
+        "collapsed": os.path.join(profile_dir, f"{job_id}.collapsed"),
+        "summary": os.path.join(profile_dir, f"{job_id}.json")
+    }
+
+
+def save_profile(profiler: SamplingProfiler, profile_dir: str, job_id: str, limit: int = 25) -> dict:
+    """Write the collapsed stacks and summary of a job and return the summary"""
+    os.makedirs(profile_dir, exist_ok=True)
+    paths = profile_paths(profile_dir, job_id)
+    summary = {"job_id": job_id, **profiler.summary(limit)}
+    with open(paths["collapsed"], "w") as f:
+        f.write(profiler.collapsed())
+    with open(paths["summary"], "w") as f:
+        json.dump(summary, f, indent=2)
+    logger.info(f"Saved profile of job {job_id}: {profiler.samples} samples, {len(profiler.stacks)} stacks")
+    return summary
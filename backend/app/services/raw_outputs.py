@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ROW_WIDTH = 6
+
+
+class RawOutputs:
+    """Per-frame raw model output of one video, memory-mapped from disk.
+    
+    All rows live in one ``[R, 6]`` float32 array in model input
+    coordinates; ``offsets`` marks where each frame's rows start, so a
+    frame's output is a slice and nothing is read until it is used.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.outputs = np.load(os.path.join(path, "outputs.npy"), mmap_mode="r")
+        self.frame_numbers = np.load(os.path.join(path, "frames.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+    
+    def __len__(self) -> int:
+        return len(self.frame_numbers)
+    
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        return self.meta["frame_width"], self.meta["frame_height"]
+    
+    @property
+    def scale(self) -> Tuple[float, float]:
+        """``(sx, sy)`` from model input to frame coordinates"""
+        return (
+            self.meta["frame_width"] / self.meta["input_width"],
+            self.meta["frame_height"] / self.meta["input_height"]
+        )
+    
+    def rows(self, index: int) -> np.ndarray:
+        return self.outputs[self.offsets[index]:self.offsets[index + 1]]
+    
+    def column(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f"column_{name}.npy"), mmap_mode="r")
+    
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        for index in range(len(self)):
+            yield int(self.frame_numbers[index]), self.rows(index)
+
+
+class RawOutputWriter:
+    """Collects raw model output frame by frame and writes it as ``RawOutputs``.
+    
+    Rows at or below ``min_confidence`` are dropped to keep the file small;
+    re-filtering can then use any threshold above it. Extra per-frame
+    values (e.g. timings) can be passed to ``append`` as keyword columns.
+    The files are written to a temporary directory and moved into place on
+    ``close``, so readers never see a partial result.
+    """
+    
+    def __init__(self, path: str, meta: dict, min_confidence: float = 0.0):
+        self.path = path
+        self.meta = dict(meta)
+        self.min_confidence = min_confidence
+        self._chunks: List[np.ndarray] = []
+        self._frame_numbers: List[int] = []
+        self._counts: List[int] = []
+        self._columns: Dict[str, List[float]] = {}
+    
+    def append(self, frame_number: int, raw_output: np.ndarray, **columns: float):
+        if raw_output.ndim == 3:
+            raw_output = raw_output[0]
+        if raw_output.size:
+            raw_output = raw_output[raw_output[:, 5] > self.min_confidence]
+        rows = np.ascontiguousarray(raw_output, dtype=np.float32).reshape(-1, ROW_WIDTH)
+        self._chunks.append(rows)
+        self._frame_numbers.append(frame_number)
+        self._counts.append(len(rows))
+        for name, value in columns.items():
+            self._columns.setdefault(name, []).append(value)
+    
+    def close(self) -> RawOutputs:
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(prefix=".raw-", dir=parent)
+        try:
+            outputs = np.concatenate(self._chunks) if self._chunks else np.empty((0, ROW_WIDTH), np.float32)
+            offsets = np.zeros(len(self._counts) + 1, dtype=np.int64)
+            np.cumsum(self._counts, out=offsets[1:])
+            np.save(os.path.join(temp_dir, "outputs.npy"), outputs)
+            np.save(os.path.join(temp_dir, "frames.npy"), np.array(self._frame_numbers, dtype=np.int64))
+            np.save(os.path.join(temp_dir, "offsets.npy"), offsets)
+            for name, values in self._columns.items():
+                np.save(os.path.join(temp_dir, f"column_{name}.npy"), np.array(values, dtype=np.float32))
+            
+            meta = {
+                **self.meta,
+                "min_confidence": self.min_confidence,
+                "frames": len(self._frame_numbers),
+                "rows": int(outputs.shape[0]),
+                "columns": sorted(self._columns),
+                "created_at": time.time()
+            }
+            with open(os.path.join(temp_dir, "meta.json"), "w") as f:
+                json.dump(meta, f, indent=2)
+            
+            if os.path.exists(self.path):
+                shutil.rmtree(self.path)
+            os.replace(temp_dir, self.path)
+        except BaseException:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        logger.info(f"Saved raw output of {meta['frames']} frames ({meta['rows']} rows) to {self.path}")
+        return RawOutputs(self.path)
+
+
+class RawOutputStore:
+    """Raw model outputs on disk, keyed by video content hash and model version.
+    
+    ``variant`` separates outputs of the same model and video that were
+    produced differently, e.g. at another input size. Next to them the
+    store keeps a small JSON manifest per job run (settings and stored
+    detections), which re-analysis diffs against.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+    
+    def path(self, video_hash: str, model_version: str, variant: str = "") -> str:
+        name = f"{model_version}-{variant}" if variant else model_version
+        return os.path.join(self.root, video_hash, name)
+    
+    def open(self, video_hash: str, model_version: str, variant: str = "") -> Optional[RawOutputs]:
+        path = self.path(video_hash, model_version, variant)
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        return RawOutputs(path)
+    
+    def writer(
+        self,
+        video_hash: str,
+        model_version: str,
+        meta: dict,
+        variant: str = "",
+        min_confidence: float = 0.0
+    ) -> RawOutputWriter:
+        meta = {**meta, "video_hash": video_hash, "model_version": model_version, "variant": variant}
+        return RawOutputWriter(self.path(video_hash, model_version, variant), meta, min_confidence)
+    
+    def _run_path(self, job_id: str) -> str:
+        return os.path.join(self.root, "runs", f"{job_id}.json")
+    
+    def save_run(self, job_id: str, run: dict):
+        path = self._run_path(job_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({**run, "job_id": job_id}, f)
+        os.replace(temp_path, path)
+    
+    def load_run(self, job_id: str) -> Optional[dict]:
+        try:
+            with open(self._run_path(job_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,98 @@
+from typing import Dict, List, NamedTuple, Tuple
+import logging
+from app.services.detection_tracker import DetectionTracker
+from app.services.detection_types import FrameDetection, detections_from_array
+from app.services.raw_outputs import RawOutputs
+
+logger = logging.getLogger(__name__)
+
+
+class RunDiff(NamedTuple):
+    added: List[Tuple[int, FrameDetection]]
+    removed: List[dict]
+    unchanged: List[dict]
+    # Superseded by an earlier re-analysis and kept again by this one
+    restored: List[dict] = []
+    # Superseded earlier and still not kept
+    superseded: List[dict] = []
+
+
+def run_detection(detection_id: str, frame_number: int, detection: FrameDetection) -> dict:
+    """A stored detection as kept in a run manifest"""
+    return {
+        "id": detection_id,
+        "frame_number": frame_number,
+        "class_id": detection.class_id,
+        "confidence": round(detection.confidence, 6),
+        "bbox": list(detection.bbox)
+    }
+
+
+def _key(frame_number: int, class_id: int, bbox) -> tuple:
+    return (frame_number, class_id, *bbox)
+
+
+def track_raw_outputs(
+    outputs: RawOutputs,
+    confidence_threshold: float,
+    iou_threshold: float,
+    tracking_window_size: int,
+    frame_stride: int = 1
+) -> Tuple[List[Tuple[int, FrameDetection]], int]:
+    """Filter and de-duplicate cached model output as ``process_video_task`` does.
+    
+    Returns the ``(frame_number, detection)`` pairs a job with these
+    settings would store, and the number of frames replayed. Only frames
+    that were inferred originally are available, so a stride applies to the
+    recorded frame numbers.
+    """
+    tracker = DetectionTracker(window_size=tracking_window_size, iou_threshold=iou_threshold)
+    scale, frame_size = outputs.scale, outputs.frame_size
+    unique = []
+    frames = 0
+    for frame_number, rows in outputs:
+        if frame_number % frame_stride:
+            continue
+        frames += 1
+        for detection in detections_from_array(rows, confidence_threshold, scale, frame_size):
+            if not tracker.is_duplicate(detection, frame_number):
+                tracker.add_detection(detection, frame_number)
+                unique.append((frame_number, detection))
+        tracker.cleanup_old_frames(frame_number)
+    return unique, frames
+
+
+def diff_run(previous: List[dict], current: List[Tuple[int, FrameDetection]]) -> RunDiff:
+    """Compare a run's stored detections with a replay of the same raw output.
+    
+    The same raw rows map to the same boxes, so detections match exactly on
+    frame, class and box; confidence is carried along but not compared.
+    Entries marked ``superseded`` are still in storage, so a replay that
+    keeps them again restores them instead of adding duplicates.
+    """
+    previous_by_key: Dict[tuple, dict] = {
+        _key(entry["frame_number"], entry["class_id"], entry["bbox"]): entry for entry in previous
+    }
+    added, unchanged, restored = [], [], []
+    for frame_number, detection in current:
+        entry = previous_by_key.pop(_key(frame_number, detection.class_id, detection.bbox), None)
+        if entry is None:
+            added.append((frame_number, detection))
+        elif entry.get("superseded"):
+            restored.append({key: value for key, value in entry.items() if key != "superseded"})
+        else:
+            unchanged.append(entry)
+    removed = [entry for entry in previous_by_key.values() if not entry.get("superseded")]
+    superseded = [entry for entry in previous_by_key.values() if entry.get("superseded")]
+    return RunDiff(added, removed, unchanged, restored, superseded)
+
+
+def run_manifest(diff: RunDiff, added: List[dict]) -> Tuple[List[dict], int]:
+    """Detections of a re-analysed run's manifest and how many are active.
+    
+    ``added`` are the manifest entries of the newly stored detections.
+    Removed detections stay in storage, so they are kept as superseded.
+    """
+    active = diff.unchanged + diff.restored + added
+    superseded = [{**entry, "superseded": True} for entry in diff.removed] + diff.superseded
+    return active + superseded, len(active)
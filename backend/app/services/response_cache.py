@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    hit: bool
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """In-process read-through cache of serialized responses.
+    
+    Entries expire after ``ttl_seconds`` and are all dropped by
+    ``invalidate()``, which the storage service calls after every insert.
+    Concurrent misses for the same key share one load, and a load that
+    started before an invalidation is returned but not cached.
+    """
+    
+    def __init__(self, ttl_seconds: float = 5.0, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def invalidate(self):
+        self._generation += 1
+        self._entries.clear()
+        self.invalidations += 1
+    
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[bytes]]
+    ) -> CachedResponse:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return CachedResponse(entry[1], entry[2], True)
+        
+        # Another request is already loading this key; wait for its result
+        pending = self._loading.get(key)
+        if pending is not None:
+            body, etag = await asyncio.shield(pending)
+            self.hits += 1
+            return CachedResponse(body, etag, True)
+        
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            body = await loader()
+            etag = make_etag(body)
+            future.set_result((body, etag))
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as lost
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+            if not future.done():
+                # The loading request was cancelled
+                future.cancel()
+        
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return CachedResponse(body, etag, False)
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl_seconds
+        }
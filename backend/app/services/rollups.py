@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional
+
+# (dimension, SQLite bucket expression over a road_damage row). The Supabase
+# migration 20251201090000_88b6e204 defines the same buckets for Postgres
+# (applied per statement since 20251202090000_0fa8164e); keep both in step.
+# Timestamps are stored as UTC ISO-8601, so the day is a prefix of
+# detected_at.
+ROLLUP_DIMENSIONS = (
+    ("total", "'all'"),
+    ("damage_type", "{row}.damage_type"),
+    ("severity", "{row}.severity"),
+    ("state", "COALESCE({row}.state, 'unknown')"),
+    ("road_category", "{row}.road_category"),
+    ("day", "substr({row}.detected_at, 1, 10)"),
+    (
+        "confidence",
+        "CASE WHEN {row}.confidence_score IS NULL THEN 'unknown' "
+        "ELSE printf('%.1f', MIN(MAX(CAST({row}.confidence_score * 10 AS INTEGER), 0), 9) / 10.0) END"
+    ),
+)
+
+ROLLUPS_TABLE = """
+    CREATE TABLE IF NOT EXISTS road_damage_rollups (
+        dimension TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, bucket)
+    )
+"""
+
+
+# Staging table for insert batches, on the writer connection only. Rows
+# land here first so the rollups can be applied once per batch
+ROLLUP_BATCH_TABLE = "temp.road_damage_batch"
+
+
+def _bucket_values(row: str, delta: int) -> str:
+    return ", ".join(
+        f"('{dimension}', {expression.format(row=row)}, {delta})"
+        for dimension, expression in ROLLUP_DIMENSIONS
+    )
+
+
+def _apply_statement(row: str, delta: int) -> str:
+    return (
+        f"INSERT INTO road_damage_rollups (dimension, bucket, count) VALUES {_bucket_values(row, delta)} "
+        f"ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count;"
+    )
+
+
+def _grouped_buckets(source: str) -> str:
+    selects = " UNION ALL ".join(
+        f"SELECT '{dimension}' AS dimension, {expression.format(row='r')} AS bucket FROM {source} r"
+        for dimension, expression in ROLLUP_DIMENSIONS
+    )
+    # WHERE true keeps SQLite from reading ON CONFLICT as part of the SELECT
+    return f"SELECT dimension, bucket, COUNT(*) FROM ({selects}) WHERE true GROUP BY dimension, bucket"
+
+
+def rollup_trigger_statements() -> List[str]:
+    """SQLite triggers that keep ``road_damage_rollups`` in step with updates and deletes.
+    
+    Inserts are not covered: a row trigger would upsert the same hot
+    buckets (the total, today) once per row, so ``batch_rollup_statement``
+    applies each insert batch with one grouped upsert instead.
+    """
+    return [
+        "DROP TRIGGER IF EXISTS road_damage_rollups_insert",
+        "CREATE TRIGGER IF NOT EXISTS road_damage_rollups_delete AFTER DELETE ON road_damage "
+        f"BEGIN {_apply_statement('OLD', -1)} END",
+        "CREATE TRIGGER IF NOT EXISTS road_damage_rollups_update AFTER UPDATE ON road_damage "
+        f"BEGIN {_apply_statement('OLD', -1)} {_apply_statement('NEW', 1)} END",
+    ]
+
+
+def batch_rollup_statement(source: str = ROLLUP_BATCH_TABLE) -> str:
+    """Add the rows of ``source`` to the rollups, one upsert per bucket"""
+    return (
+        f"INSERT INTO road_damage_rollups (dimension, bucket, count) {_grouped_buckets(source)} "
+        f"ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count"
+    )
+
+
+def rebuild_statements() -> List[str]:
+    """Recompute every rollup from ``road_damage`` in one grouped scan"""
+    return [
+        "DELETE FROM road_damage_rollups",
+        f"INSERT INTO road_damage_rollups (dimension, bucket, count) {_grouped_buckets('road_damage')}",
+    ]
+
+
+def summarize_rollups(rows: Iterable[dict], days: Optional[int] = None) -> Dict[str, object]:
+    """Shape ``(dimension, bucket, count)`` rows into the statistics response.
+    
+    Cost is linear in the number of buckets, independent of the row count.
+    ``days`` keeps only the most recent days of the per-day series.
+    """
+    grouped: Dict[str, Dict[str, int]] = {dimension: {} for dimension, _ in ROLLUP_DIMENSIONS}
+    for row in rows:
+        if row["count"] > 0 and row["dimension"] in grouped:
+            grouped[row["dimension"]][row["bucket"]] = int(row["count"])
+    
+    by_day = dict(sorted(grouped["day"].items()))
+    if days is not None:
+        by_day = dict(list(by_day.items())[-days:]) if days > 0 else {}
+    
+    return {
+        "total": grouped["total"].get("all", 0),
+        "by_damage_type": grouped["damage_type"],
+        "by_severity": grouped["severity"],
+        "by_state": grouped["state"],
+        "by_road_category": grouped["road_category"],
+        "by_day": by_day,
+        "confidence_histogram": dict(sorted(grouped["confidence"].items()))
+    }
@@ -0,0 +1,350 @@
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+import logging
+from app.services.image_encoder import EncodedImage, attach_image_urls
+
+logger = logging.getLogger(__name__)
+
+
+class SpoolEntry(NamedTuple):
+    id: str
+    record: dict
+    images: List[dict]
+    attempts: int
+
+
+class DetectionSpool:
+    """Durable local queue of detections waiting to be uploaded.
+    
+    Rows live in a SQLite database and encoded images next to it on disk, so
+    detections survive remote storage outages and process restarts. The
+    record id doubles as the idempotency key for the upload and the insert.
+    """
+    
+    def __init__(self, spool_dir: str, claim_lease_seconds: float = 120.0):
+        self.spool_dir = spool_dir
+        self.images_dir = os.path.join(spool_dir, "images")
+        self.claim_lease_seconds = claim_lease_seconds
+        os.makedirs(self.images_dir, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(spool_dir, "spool.db"),
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS spooled_detections (
+                id TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                images TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_spooled_detections_next_attempt "
+            "ON spooled_detections (next_attempt_at)"
+        )
+        # Entries that ran out of attempts; kept with their images for
+        # inspection instead of being retried forever
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS failed_detections (
+                id TEXT PRIMARY KEY,
+                record TEXT NOT NULL,
+                images TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                failed_at REAL NOT NULL
+            )
+            """
+        )
+    
+    def put(self, record_id: str, record: dict, images: List[EncodedImage]):
+        spooled_images = []
+        for image in images:
+            image_path = os.path.join(self.images_dir, f"{record_id}_{image.kind}{image.extension}")
+            temp_path = f"{image_path}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(image.data)
+            os.replace(temp_path, image_path)
+            spooled_images.append({
+                "kind": image.kind,
+                "path": image_path,
+                "content_type": image.content_type
+            })
+        
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO spooled_detections "
+                "(id, record, images, attempts, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, 0, ?, ?)",
+                (record_id, json.dumps(record), json.dumps(spooled_images), now, now)
+            )
+    
+    def claim_due(self, limit: int) -> List[SpoolEntry]:
+        """Return up to ``limit`` due entries and lease them to the caller"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, record, images, attempts FROM spooled_detections "
+                "WHERE next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE spooled_detections SET next_attempt_at = ? WHERE id = ?",
+                    [(now + self.claim_lease_seconds, row[0]) for row in rows]
+                )
+        
+        return [
+            SpoolEntry(row[0], json.loads(row[1]), json.loads(row[2]), row[3])
+            for row in rows
+        ]
+    
+    def read_image(self, image_path: str) -> bytes:
+        with open(image_path, "rb") as f:
+            return f.read()
+    
+    def complete(self, entries: List[SpoolEntry]):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM spooled_detections WHERE id = ?",
+                [(entry.id,) for entry in entries]
+            )
+        for entry in entries:
+            for image in entry.images:
+                try:
+                    os.remove(image["path"])
+                except FileNotFoundError:
+                    pass
+    
+    def fail(self, entry: SpoolEntry, error: str, retry_in: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE spooled_detections "
+                "SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (time.time() + retry_in, error[:500], entry.id)
+            )
+    
+    def dead_letter(self, entry: SpoolEntry, error: str):
+        """Move an entry that keeps failing out of the queue into ``failed_detections``"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO failed_detections "
+                    "(id, record, images, attempts, last_error, created_at, failed_at) "
+                    "SELECT id, record, images, attempts + 1, ?, created_at, ? "
+                    "FROM spooled_detections WHERE id = ?",
+                    (error[:500], time.time(), entry.id)
+                )
+                self._conn.execute("DELETE FROM spooled_detections WHERE id = ?", (entry.id,))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def failed_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM failed_detections").fetchone()[0]
+    
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM spooled_detections").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SpoolDrainer:
+    """Background task that uploads spooled detections to remote storage.
+    
+    Images are uploaded with bounded concurrency, then the batch's records
+    are written in one bulk insert; if that fails, records are inserted one
+    by one so a bad record does not hold back the rest. Failed entries are
+    rescheduled with exponential backoff and jitter, and after
+    ``max_attempts`` moved to the spool's failed table.
+    """
+    
+    def __init__(
+        self,
+        spool: DetectionSpool,
+        storage_service,
+        batch_size: int = 50,
+        max_concurrency: int = 4,
+        retry_base_seconds: float = 1.0,
+        retry_max_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        max_attempts: int = 10
+    ):
+        self.spool = spool
+        self.storage_service = storage_service
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        
+        self.uploaded = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self._failed_batches = 0
+    
+    def backoff_delay(self, attempts: int) -> float:
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempts))
+        return delay * random.uniform(0.5, 1.0)
+    
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+    
+    async def stop(self):
+        if self._task is not None:
+            # On Python 3.11 wait_for() can swallow a cancellation that lands
+            # as the wake event fires; the flag ends the loop either way
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        while not self._stopping:
+            try:
+                drained = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Spool drain failed: {e}")
+                drained = 0
+            
+            if self._failed_batches:
+                # Remote storage looks unhealthy; back off before the next batch
+                await asyncio.sleep(self.backoff_delay(self._failed_batches - 1))
+            elif drained == 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _upload_entry(self, entry: SpoolEntry, semaphore: asyncio.Semaphore) -> Optional[dict]:
+        async with semaphore:
+            try:
+                urls = {}
+                for image in entry.images:
+                    image_bytes = await asyncio.to_thread(self.spool.read_image, image["path"])
+                    urls[image["kind"]] = await self.storage_service.upload_image_bytes(
+                        image_bytes, os.path.basename(image["path"]), image["content_type"]
+                    )
+            except Exception as e:
+                await self._reschedule(entry, e)
+                return None
+        
+        return attach_image_urls(entry.record, urls)
+    
+    async def _reschedule(self, entry: SpoolEntry, error: Exception):
+        self.failures += 1
+        if entry.attempts + 1 >= self.max_attempts:
+            self.dead_lettered += 1
+            logger.error(
+                f"Spooled detection {entry.id} failed {entry.attempts + 1} times, "
+                f"moved to failed_detections: {error}"
+            )
+            await asyncio.to_thread(self.spool.dead_letter, entry, str(error))
+            return
+        delay = self.backoff_delay(entry.attempts)
+        logger.warning(
+            f"Spooled detection {entry.id} failed (attempt {entry.attempts + 1}), "
+            f"retrying in {delay:.1f}s: {error}"
+        )
+        await asyncio.to_thread(self.spool.fail, entry, str(error), delay)
+    
+    async def drain_once(self) -> int:
+        entries = await asyncio.to_thread(self.spool.claim_due, self.batch_size)
+        if not entries:
+            return 0
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        records = await asyncio.gather(*[
+            self._upload_entry(entry, semaphore) for entry in entries
+        ])
+        
+        uploaded = [(entry, record) for entry, record in zip(entries, records) if record is not None]
+        if not uploaded:
+            self._failed_batches += 1
+            return len(entries)
+        
+        try:
+            await self.storage_service.insert_records([record for _, record in uploaded])
+            inserted, failed = [entry for entry, _ in uploaded], []
+        except Exception as e:
+            inserted, failed = await self._insert_each(uploaded, e)
+        
+        for entry, error in failed:
+            await self._reschedule(entry, error)
+        if not inserted:
+            self._failed_batches += 1
+            return len(entries)
+        
+        self._failed_batches = 0
+        await asyncio.to_thread(self.spool.complete, inserted)
+        self.uploaded += len(inserted)
+        return len(entries)
+    
+    async def _insert_each(
+        self,
+        uploaded: List[Tuple[SpoolEntry, dict]],
+        batch_error: Exception
+    ) -> Tuple[List[SpoolEntry], List[Tuple[SpoolEntry, Exception]]]:
+        """Insert a failed batch record by record, isolating the records that fail.
+        
+        Stops after a few failures with nothing inserted: storage is down
+        rather than a record bad, and the rest fail with the batch's error.
+        """
+        inserted, failed = [], []
+        for index, (entry, record) in enumerate(uploaded):
+            if not inserted and len(failed) >= 3:
+                failed += [(entry, batch_error) for entry, _ in uploaded[index:]]
+                break
+            try:
+                await self.storage_service.insert_records([record])
+                inserted.append(entry)
+            except Exception as e:
+                failed.append((entry, e))
+        return inserted, failed
+    
+    def stats(self) -> dict:
+        return {
+            "pending": self.spool.pending_count(),
+            "uploaded": self.uploaded,
+            "failures": self.failures,
+            "dead_lettered": self.spool.failed_count()
+        }
@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+import logging
+from app.services.damage_query import ROAD_DAMAGE_COLUMNS, DamageQuery
+from app.services.supabase_client import SupabaseClientService
+
+logger = logging.getLogger(__name__)
+
+STORAGE_BACKENDS = ("supabase", "local")
+
+
+class StorageBackend(ABC):
+    """Where detection images and ``road_damage`` rows are persisted.
+    
+    Implementations are synchronous; ``DamageStorageService`` runs every call
+    on its read or write thread pool.
+    """
+    
+    @abstractmethod
+    def upload_image(self, image_bytes: bytes, filename: str, content_type: str) -> str:
+        """Store an image and return its public URL. Re-uploading overwrites."""
+    
+    @abstractmethod
+    def insert_records(self, records: List[dict]):
+        """Insert ``road_damage`` rows, ignoring ids that already exist"""
+    
+    @abstractmethod
+    def select_latest(self, limit: int, columns: Tuple[str, ...] = ROAD_DAMAGE_COLUMNS) -> List[dict]:
+        """Return ``columns`` of the newest ``limit`` rows by ``detected_at``"""
+    
+    @abstractmethod
+    def query_damages(self, query: DamageQuery) -> List[dict]:
+        """Return up to ``query.limit + 1`` matching rows after ``query.cursor``,
+        ordered by ``detected_at DESC, id DESC``, with ``query.select_columns()``"""
+    
+    @abstractmethod
+    def select_points(self, query: DamageQuery, max_rows: Optional[int] = None) -> List[dict]:
+        """Return every row matching ``query``'s filters, up to ``max_rows``, in no
+        particular order and with only ``query.fields``. ``query.limit`` is the
+        page size for backends that have to page."""
+    
+    @abstractmethod
+    def select_rollups(self) -> List[dict]:
+        """Return the non-empty ``(dimension, bucket, count)`` statistics rollups"""
+    
+    @abstractmethod
+    def rebuild_rollups(self):
+        """Recompute the statistics rollups from every ``road_damage`` row"""
+    
+    def test_connection(self) -> bool:
+        return True
+    
+    def close(self):
+        pass
+
+
+class SupabaseStorageBackend(StorageBackend):
+    def __init__(self, supabase_service: SupabaseClientService, bucket: str = "damage-images"):
+        self.supabase_service = supabase_service
+        self.bucket = bucket
+    
+    @property
+    def client(self):
+        # Created on first use so the app can start without credentials
+        return self.supabase_service.get_client()
+    
+    def upload_image(self, image_bytes: bytes, filename: str, content_type: str) -> str:
+        # Upload to Supabase storage; upsert keeps retried uploads idempotent
+        self.client.storage.from_(self.bucket).upload(
+            filename,
+            image_bytes,
+            file_options={"content-type": content_type, "upsert": "true"}
+        )
+        
+        # Get public URL
+        public_url = self.client.storage.from_(self.bucket).get_public_url(filename)
+        
+        logger.info(f"Image uploaded successfully: {filename}")
+        return public_url
+    
+    def insert_records(self, records: List[dict]):
+        # Ids are assigned client-side, so ignoring duplicates makes a retried
+        # batch idempotent
+        self.client.table('road_damage') \
+            .upsert(records, on_conflict='id', ignore_duplicates=True) \
+            .execute()
+    
+    def select_latest(self, limit: int, columns: Tuple[str, ...] = ROAD_DAMAGE_COLUMNS) -> List[dict]:
+        result = self.client.table('road_damage') \
+            .select(','.join(columns)) \
+            .order('detected_at', desc=True) \
+            .limit(limit) \
+            .execute()
+        return result.data
+    
+    def _filtered(self, columns, query: DamageQuery):
+        request = self.client.table('road_damage').select(','.join(columns))
+        if query.detected_after is not None:
+            request = request.gte('detected_at', query.detected_after.isoformat())
+        if query.detected_before is not None:
+            request = request.lt('detected_at', query.detected_before.isoformat())
+        if query.damage_types:
+            request = request.in_('damage_type', list(query.damage_types))
+        if query.severities:
+            request = request.in_('severity', list(query.severities))
+        if query.min_confidence is not None:
+            request = request.gte('confidence_score', query.min_confidence)
+        if query.max_confidence is not None:
+            request = request.lte('confidence_score', query.max_confidence)
+        for column in ('state', 'district', 'road_name'):
+            value = getattr(query, column)
+            if value is not None:
+                request = request.eq(column, value)
+        if query.bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = query.bbox
+            request = request.gte('latitude', min_lat).lte('latitude', max_lat) \
+                .gte('longitude', min_lon).lte('longitude', max_lon)
+        return request
+    
+    def query_damages(self, query: DamageQuery) -> List[dict]:
+        request = self._filtered(query.select_columns(), query)
+        
+        if query.cursor is not None:
+            # Keyset condition; the plain lte lets Postgres range-scan
+            # idx_road_damage_detected_at before the OR settles ties on id.
+            # decode_cursor has re-serialized both values, so they are safe
+            # to put into the filter string
+            detected_at, record_id = query.cursor
+            request = request.lte('detected_at', detected_at).or_(
+                f'detected_at.lt."{detected_at}",'
+                f'and(detected_at.eq."{detected_at}",id.lt.{record_id})'
+            )
+        
+        result = request \
+            .order('detected_at', desc=True) \
+            .order('id', desc=True) \
+            .limit(query.limit + 1) \
+            .execute()
+        return result.data
+    
+    def select_points(self, query: DamageQuery, max_rows: Optional[int] = None) -> List[dict]:
+        # PostgREST caps rows per response, so page on the primary key, which
+        # needs no sort beyond the index
+        columns = query.fields if 'id' in query.fields else query.fields + ('id',)
+        rows, last_id = [], None
+        while True:
+            request = self._filtered(columns, query)
+            if last_id is not None:
+                request = request.gt('id', last_id)
+            page = request.order('id').limit(query.limit).execute().data
+            rows.extend(page)
+            if len(page) < query.limit or (max_rows is not None and len(rows) >= max_rows):
+                return rows[:max_rows] if max_rows is not None else rows
+            last_id = page[-1]['id']
+    
+    def select_rollups(self) -> List[dict]:
+        # Maintained by triggers on road_damage; see the rollups migration
+        result = self.client.table('road_damage_rollups') \
+            .select('dimension,bucket,count') \
+            .gt('count', 0) \
+            .execute()
+        return result.data
+    
+    def rebuild_rollups(self):
+        self.client.rpc('rebuild_road_damage_rollups').execute()
+    
+    def test_connection(self) -> bool:
+        return self.supabase_service.test_connection()
+
+
+def create_storage_backend(settings) -> StorageBackend:
+    if settings.storage_backend == "supabase":
+        return SupabaseStorageBackend(SupabaseClientService())
+    if settings.storage_backend == "local":
+        from app.services.local_backend import LocalStorageBackend
+        return LocalStorageBackend(settings.local_storage_dir, settings.local_image_base_url)
+    raise ValueError(
+        f"Unknown storage backend '{settings.storage_backend}', expected one of {STORAGE_BACKENDS}"
+    )
@@ -1,15 +1,36 @@
 import numpy as np
-import cv2
-from typing import List
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
 import logging
+import time
 from datetime import datetime
 import uuid
-from app.api.models import Detection, DamageResponse
-from app.services.supabase_client import SupabaseClientService
+from app.services.damage_query import DEFAULT_FIELDS, DamageQuery, paginate
+from app.services.rollups import summarize_rollups
+from app.services.detection_types import FrameDetection
+from app.services.image_encoder import (
+    EncodedImage,
+    ImageOutputConfig,
+    attach_image_urls,
+    encode_detection_images
+)
+from app.services.storage_backend import StorageBackend
+from app.services.write_buffer import DamageWriteBuffer
+from app.services.spool import DetectionSpool, SpoolDrainer
+from app.config import settings
 from app.utils.errors import StorageError
+from app.utils.metrics import ERRORS_TOTAL, RECORDS_INSERTED_TOTAL, STAGE_SECONDS, UPLOAD_BYTES_TOTAL
 
 logger = logging.getLogger(__name__)
 
+_ENCODE_SECONDS = STAGE_SECONDS.labels("encode")
+_SPOOL_WRITE_SECONDS = STAGE_SECONDS.labels("spool_write")
+_UPLOAD_SECONDS = STAGE_SECONDS.labels("upload")
+_INSERT_SECONDS = STAGE_SECONDS.labels("insert")
+
 # Damage type mapping
 DAMAGE_TYPE_MAPPING = {
     0: "crack",
@@ -20,133 +41,432 @@ DAMAGE_TYPE_MAPPING = {
 
 
 class DamageStorageService:
-    def __init__(self, supabase_service: SupabaseClientService):
-        self.supabase_service = supabase_service
-        self.client = supabase_service.get_client()
+    def __init__(
+        self,
+        backend: StorageBackend,
+        read_workers: Optional[int] = None,
+        write_workers: Optional[int] = None,
+        spool: Optional[DetectionSpool] = None
+    ):
+        self.backend = backend
+        
+        # Backends are synchronous, so every call runs on a bounded
+        # pool instead of the event loop. Reads get their own pool so dashboard
+        # queries never queue behind a burst of uploads.
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=read_workers or settings.storage_read_workers,
+            thread_name_prefix="storage-read"
+        )
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=write_workers or settings.storage_write_workers,
+            thread_name_prefix="storage-write"
+        )
+        
+        # Detection records are collected and written as bulk inserts
+        self.write_buffer = DamageWriteBuffer(
+            self._insert_records,
+            max_batch_size=settings.storage_batch_size,
+            flush_interval=settings.storage_flush_interval_seconds,
+            max_attempts=settings.storage_flush_max_attempts,
+            max_pending=settings.storage_max_buffered_records,
+            on_dead_letter=lambda record, error: ERRORS_TOTAL.labels("dead_letter").inc()
+        )
+        
+        # Called with each batch of records once it is in the database
+        self._insert_listeners: List[Callable[[List[dict]], None]] = []
+        
+        # Which images are stored per detection, and what they cost to encode
+        self.image_config = ImageOutputConfig.from_settings(settings)
+        self._image_stats: Dict[str, dict] = {}
+        self._image_stats_lock = threading.Lock()
+        
+        # Encoding runs on its own pool, off the frame loop. cv2.imencode
+        # releases the GIL, so threads encode in parallel and receive the frame
+        # by reference instead of pickling it into another process. The slots
+        # bound how many frames can wait for encoding at once.
+        self._encode_executor = ThreadPoolExecutor(
+            max_workers=settings.encode_workers,
+            thread_name_prefix="storage-encode"
+        )
+        self._encode_slots = asyncio.Semaphore(settings.encode_max_pending)
+        self._pending: Set[asyncio.Task] = set()
+        self.failed_detections = 0
+        
+        # With a spool, detections are written locally first and uploaded by
+        # the drainer, so the frame loop never waits on remote storage
+        self.spool = spool
+        self.drainer = None
+        if spool is not None:
+            self.drainer = SpoolDrainer(
+                spool,
+                self,
+                batch_size=settings.storage_batch_size,
+                max_concurrency=settings.spool_drain_concurrency,
+                retry_base_seconds=settings.spool_retry_base_seconds,
+                retry_max_seconds=settings.spool_retry_max_seconds,
+                poll_interval=settings.spool_poll_interval_seconds,
+                max_attempts=settings.spool_max_attempts
+            )
+    
+    async def _run_read(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, partial(func, *args))
+    
+    async def _run_write(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, partial(func, *args))
+    
+    async def _run_encode(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._encode_executor, partial(func, *args))
+    
+    def start(self):
+        if self.drainer is not None:
+            self.drainer.start()
+    
+    @property
+    def pending_detections(self) -> int:
+        return len(self._pending)
     
-    async def upload_image(self, image: np.ndarray, detection_id: str) -> str:
+    async def wait_for_pending(self):
+        """Wait until every submitted detection has been encoded and queued"""
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+    
+    async def flush(self) -> int:
+        await self.wait_for_pending()
+        if self.drainer is not None:
+            # Spooled detections are durable already; just nudge the drainer
+            self.drainer.wake()
         try:
-            # Convert numpy array to JPEG bytes
-            _, buffer = cv2.imencode('.jpg', image)
-            image_bytes = buffer.tobytes()
-            
-            # Generate unique filename
-            filename = f"{detection_id}.jpg"
-            
-            # Upload to Supabase storage
-            result = self.client.storage.from_('damage-images').upload(
-                filename,
-                image_bytes,
-                file_options={"content-type": "image/jpeg"}
+            return await self.write_buffer.flush()
+        except Exception as e:
+            raise StorageError(
+                f"Database insertion failed: {str(e)}",
+                {"pending_records": self.write_buffer.pending}
             )
-            
-            # Get public URL
-            public_url = self.client.storage.from_('damage-images').get_public_url(filename)
-            
-            logger.info(f"Image uploaded successfully: {filename}")
-            return public_url
-            
+    
+    async def close(self):
+        await self.wait_for_pending()
+        if self.drainer is not None:
+            await self.drainer.stop()
+        try:
+            await self.write_buffer.close()
+        except Exception as e:
+            logger.error(f"Failed to flush pending damage records on shutdown: {e}")
+        self.shutdown()
+    
+    def shutdown(self, wait: bool = True):
+        self._read_executor.shutdown(wait=wait)
+        self._write_executor.shutdown(wait=wait)
+        self._encode_executor.shutdown(wait=wait)
+        if self.spool is not None:
+            self.spool.close()
+        self.backend.close()
+    
+    async def upload_image_bytes(self, image_bytes: bytes, filename: str, content_type: str) -> str:
+        start = time.perf_counter()
+        try:
+            url = await self._run_write(self.backend.upload_image, image_bytes, filename, content_type)
+            _UPLOAD_SECONDS.observe(time.perf_counter() - start)
+            UPLOAD_BYTES_TOTAL.inc(len(image_bytes))
+            return url
         except Exception as e:
+            ERRORS_TOTAL.labels("upload").inc()
             raise StorageError(
                 f"Image upload failed: {str(e)}",
-                {"detection_id": detection_id}
+                {"filename": filename}
+            )
+    
+    def add_insert_listener(self, listener: Callable[[List[dict]], None]):
+        """Register a callback run on the event loop after each successful insert"""
+        self._insert_listeners.append(listener)
+    
+    async def _insert_records(self, records: List[dict]):
+        start = time.perf_counter()
+        try:
+            await self._run_write(self.backend.insert_records, records)
+        except Exception:
+            ERRORS_TOTAL.labels("insert").inc()
+            raise
+        _INSERT_SECONDS.observe(time.perf_counter() - start)
+        RECORDS_INSERTED_TOTAL.inc(len(records))
+        for listener in self._insert_listeners:
+            try:
+                listener(records)
+            except Exception as e:
+                logger.error(f"Insert listener failed: {e}")
+    
+    async def insert_records(self, records: List[dict]):
+        try:
+            await self._insert_records(records)
+        except Exception as e:
+            raise StorageError(
+                f"Database insertion failed: {str(e)}",
+                {"records": len(records)}
             )
     
+    def build_damage_record(
+        self,
+        detection: FrameDetection,
+        image_url: Optional[str],
+        frame_number: int,
+        video_filename: str,
+        record_id: str,
+        images: Optional[List[EncodedImage]] = None,
+        metadata: Optional[dict] = None
+    ) -> dict:
+        damage_type = DAMAGE_TYPE_MAPPING.get(detection.class_id, "unknown")
+        
+        record = {
+            "id": record_id,
+            "damage_type": damage_type,
+            "severity": "medium",  # Placeholder
+            "latitude": 0.0,  # Placeholder
+            "longitude": 0.0,  # Placeholder
+            "confidence_score": detection.confidence,
+            "detected_at": datetime.utcnow().isoformat(),
+            "image_url": image_url,
+            "metadata": {
+                "frame_number": frame_number,
+                "video_filename": video_filename,
+                "bbox": detection.bbox._asdict(),
+                **(metadata or {})
+            }
+        }
+        
+        for image in images or []:
+            if image.region is not None:
+                record["metadata"]["crop"] = image.region._asdict()
+        if images:
+            record["metadata"]["image_bytes"] = {image.kind: len(image.data) for image in images}
+        
+        return record
+    
     async def insert_damage_record(
         self,
-        detection: Detection,
+        detection: FrameDetection,
         image_url: str,
         frame_number: int,
-        video_filename: str
+        video_filename: str,
+        record_id: Optional[str] = None
     ) -> str:
         try:
-            damage_type = DAMAGE_TYPE_MAPPING.get(detection.class_id, "unknown")
-            
-            record = {
-                "damage_type": damage_type,
-                "severity": "medium",  # Placeholder
-                "latitude": 0.0,  # Placeholder
-                "longitude": 0.0,  # Placeholder
-                "confidence_score": detection.confidence,
-                "detected_at": datetime.utcnow().isoformat(),
-                "image_url": image_url,
-                "metadata": {
-                    "frame_number": frame_number,
-                    "video_filename": video_filename,
-                    "bbox": {
-                        "x1": detection.bbox.x1,
-                        "y1": detection.bbox.y1,
-                        "x2": detection.bbox.x2,
-                        "y2": detection.bbox.y2
-                    }
-                }
-            }
-            
-            result = self.client.table('road_damage').insert(record).execute()
+            # Ids are assigned client-side so the record can be referenced
+            # before the buffered insert reaches the database
+            record_id = record_id or str(uuid.uuid4())
+            record = self.build_damage_record(
+                detection,
+                image_url,
+                frame_number,
+                video_filename,
+                record_id
+            )
             
-            record_id = result.data[0]['id']
-            logger.info(f"Damage record inserted: {record_id}")
+            await self.write_buffer.add(record)
             return record_id
-            
+        
         except Exception as e:
             raise StorageError(
                 f"Database insertion failed: {str(e)}",
-                {"detection": detection.dict()}
+                {"detection": detection.to_dict()}
             )
     
-    async def store_detection(
+    def _record_image_stats(self, images: List[EncodedImage]):
+        with self._image_stats_lock:
+            for image in images:
+                stats = self._image_stats.setdefault(
+                    image.kind, {"images": 0, "bytes": 0, "encode_ms": 0.0}
+                )
+                stats["images"] += 1
+                stats["bytes"] += len(image.data)
+                stats["encode_ms"] += image.encode_ms
+    
+    def image_stats(self) -> Dict[str, dict]:
+        """Average bytes and encode time per detection for each image kind"""
+        with self._image_stats_lock:
+            return {
+                kind: {
+                    "images": stats["images"],
+                    "avg_bytes": stats["bytes"] / stats["images"],
+                    "avg_encode_ms": stats["encode_ms"] / stats["images"]
+                }
+                for kind, stats in self._image_stats.items()
+            }
+    
+    def _prepare_detection_sync(
         self,
-        detection: Detection,
+        detection: FrameDetection,
         frame_image: np.ndarray,
         frame_number: int,
-        video_filename: str
-    ) -> str:
-        detection_id = str(uuid.uuid4())
+        video_filename: str,
+        detection_id: str,
+        metadata: Optional[dict] = None
+    ):
+        images = encode_detection_images(frame_image, detection.bbox, self.image_config)
+        self._record_image_stats(images)
+        _ENCODE_SECONDS.observe(sum(image.encode_ms for image in images) / 1000)
         
+        record = self.build_damage_record(
+            detection,
+            None,
+            frame_number,
+            video_filename,
+            detection_id,
+            images,
+            metadata
+        )
+        return record, images
+    
+    def _spool_detection_sync(
+        self,
+        detection: FrameDetection,
+        frame_image: np.ndarray,
+        frame_number: int,
+        video_filename: str,
+        detection_id: str,
+        metadata: Optional[dict] = None
+    ):
+        record, images = self._prepare_detection_sync(
+            detection,
+            frame_image,
+            frame_number,
+            video_filename,
+            detection_id,
+            metadata
+        )
+        start = time.perf_counter()
+        self.spool.put(detection_id, record, images)
+        _SPOOL_WRITE_SECONDS.observe(time.perf_counter() - start)
+    
+    async def _store_detection_task(
+        self,
+        detection: FrameDetection,
+        frame_image: np.ndarray,
+        frame_number: int,
+        video_filename: str,
+        detection_id: str,
+        metadata: Optional[dict] = None
+    ):
         try:
-            # Upload image first
-            image_url = await self.upload_image(frame_image, detection_id)
+            if self.spool is not None:
+                await self._run_encode(
+                    self._spool_detection_sync,
+                    detection,
+                    frame_image,
+                    frame_number,
+                    video_filename,
+                    detection_id,
+                    metadata
+                )
+                if self.drainer is not None:
+                    self.drainer.wake()
+                return
             
-            # Insert database record
-            record_id = await self.insert_damage_record(
+            record, images = await self._run_encode(
+                self._prepare_detection_sync,
                 detection,
-                image_url,
+                frame_image,
                 frame_number,
-                video_filename
+                video_filename,
+                detection_id,
+                metadata
             )
             
-            return record_id
+            # Upload images first
+            urls = {}
+            for image in images:
+                urls[image.kind] = await self.upload_image_bytes(
+                    image.data,
+                    f"{detection_id}_{image.kind}{image.extension}",
+                    image.content_type
+                )
             
-        except StorageError as e:
-            logger.error(f"Storage failed: {e.message}", extra=e.context)
-            raise
+            # Queue the database record for the next bulk insert
+            await self.write_buffer.add(attach_image_urls(record, urls))
+        
+        except Exception as e:
+            self.failed_detections += 1
+            ERRORS_TOTAL.labels("storage").inc()
+            message = e.message if isinstance(e, StorageError) else str(e)
+            logger.error(f"Storage failed for detection {detection_id}: {message}")
+    
+    def _detection_done(self, task: asyncio.Task):
+        self._pending.discard(task)
+        self._encode_slots.release()
+    
+    async def store_detection(
+        self,
+        detection: FrameDetection,
+        frame_image: np.ndarray,
+        frame_number: int,
+        video_filename: Optional[str],
+        metadata: Optional[dict] = None
+    ) -> str:
+        """Submit a detection for encoding and storage and return its id.
+        
+        Returns once the frame is handed to the encode pool; waits only when
+        ``encode_max_pending`` detections are already in flight. The frame is
+        passed by reference, so callers must not write into it afterwards.
+        ``metadata`` is merged into the record's metadata.
+        """
+        detection_id = str(uuid.uuid4())
+        
+        await self._encode_slots.acquire()
+        task = asyncio.create_task(self._store_detection_task(
+            detection,
+            frame_image,
+            frame_number,
+            video_filename,
+            detection_id,
+            metadata
+        ))
+        self._pending.add(task)
+        task.add_done_callback(self._detection_done)
+        return detection_id
     
-    async def get_latest_damages(self, limit: int = 10) -> List[DamageResponse]:
+    async def get_latest_damages(self, limit: int = 10) -> List[dict]:
+        """Newest records with the ``DamageResponse`` fields, as plain dicts"""
         try:
-            result = self.client.table('road_damage') \
-                .select('*') \
-                .order('detected_at', desc=True) \
-                .limit(limit) \
-                .execute()
-            
-            damages = []
-            for record in result.data:
-                damage = DamageResponse(
-                    id=record['id'],
-                    damage_type=record['damage_type'],
-                    severity=record['severity'],
-                    latitude=record['latitude'],
-                    longitude=record['longitude'],
-                    confidence_score=record['confidence_score'],
-                    detected_at=record['detected_at'],
-                    image_url=record['image_url']
-                )
-                damages.append(damage)
-            
-            return damages
-            
+            return await self._run_read(self.backend.select_latest, limit, DEFAULT_FIELDS)
+        
         except Exception as e:
             raise StorageError(
                 f"Failed to retrieve damages: {str(e)}",
                 {"limit": limit}
             )
+    
+    async def query_damages(self, query: DamageQuery) -> Tuple[List[dict], Optional[str]]:
+        """Return one page of matching damage records and the next page's cursor"""
+        try:
+            rows = await self._run_read(self.backend.query_damages, query)
+            return paginate(rows, query)
+        
+        except Exception as e:
+            raise StorageError(
+                f"Failed to query damages: {str(e)}",
+                {"limit": query.limit, "cursor": query.cursor}
+            )
+    
+    async def select_points(self, query: DamageQuery, max_rows: Optional[int] = None) -> List[dict]:
+        """Return every record matching ``query`` with only ``query.fields``, unordered"""
+        try:
+            return await self._run_read(self.backend.select_points, query, max_rows)
+        
+        except Exception as e:
+            raise StorageError(
+                f"Failed to select damage points: {str(e)}",
+                {"bbox": query.bbox}
+            )
+    
+    async def get_statistics(self, days: Optional[int] = None) -> dict:
+        """Damage counts per dimension, read from the incrementally kept rollups"""
+        try:
+            rows = await self._run_read(self.backend.select_rollups)
+            return summarize_rollups(rows, days)
+        
+        except Exception as e:
+            raise StorageError(
+                f"Failed to retrieve statistics: {str(e)}",
+                {"days": days}
+            )
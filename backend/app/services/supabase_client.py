@@ -1,9 +1,39 @@
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
 from app.config import settings
+from app.services.http_pool import get_http_client
+from app.utils.errors import StorageError
 import logging
 
+if TYPE_CHECKING:
+    from supabase import Client
+
 logger = logging.getLogger(__name__)
 
+# One client per project and key, all sending through the pooled HTTP client
+_clients: Dict[Tuple[str, str], "Client"] = {}
+_clients_lock = threading.Lock()
+
+
+def get_shared_client(url: str, key: str) -> "Client":
+    """Process-wide Supabase client for ``url`` and ``key``.
+    
+    PostgREST, storage and auth requests all go through the shared
+    ``http_pool`` client, so connections and TLS sessions are reused.
+    """
+    # supabase pulls in several HTTP and auth packages; load it on first use
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+    
+    http_client = get_http_client()
+    with _clients_lock:
+        client = _clients.get((url, key))
+        # Rebuilt if the pooled client was closed and replaced since
+        if client is None or client.options.httpx_client is not http_client:
+            client = create_client(url, key, options=SyncClientOptions(httpx_client=http_client))
+            _clients[(url, key)] = client
+        return client
+
 
 class SupabaseClientService:
     def __init__(self, url: str = None, key: str = None):
@@ -11,9 +41,15 @@ class SupabaseClientService:
         self.key = key or settings.supabase_key
         self._client = None
     
-    def get_client(self) -> Client:
+    def get_client(self) -> "Client":
         if self._client is None:
-            self._client = create_client(self.url, self.key)
+            if not self.url or not self.key:
+                raise StorageError(
+                    "Supabase credentials are not configured; set SUPABASE_URL and "
+                    "SUPABASE_KEY or use STORAGE_BACKEND=local",
+                    {"url": self.url}
+                )
+            self._client = get_shared_client(self.url, self.key)
         return self._client
     
     def test_connection(self) -> bool:
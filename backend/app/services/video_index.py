@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessedVideo(NamedTuple):
+    video_hash: str
+    model_version: str
+    settings: dict
+    job_id: str
+    video_filename: str
+    processed_frames: int
+    detections_found: int
+    created_at: float
+
+
+def settings_key(job_settings: dict) -> str:
+    """Stable short hash of the settings that decide what a job stores"""
+    encoded = json.dumps(job_settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()[:16]
+
+
+class ProcessedVideoIndex:
+    """Videos already processed, by content hash, model version and settings.
+    
+    An upload whose SHA-256 is here with the same model and settings would
+    only store the same damage again, so its earlier job is returned
+    instead. Kept in SQLite so it survives restarts.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS processed_videos (
+                video_hash TEXT NOT NULL,
+                model_version TEXT NOT NULL,
+                settings_key TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                video_filename TEXT,
+                processed_frames INTEGER NOT NULL,
+                detections_found INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (video_hash, model_version, settings_key)
+            )
+            """
+        )
+    
+    def lookup(self, video_hash: str, model_version: str, job_settings: dict) -> Optional[ProcessedVideo]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT settings, job_id, video_filename, processed_frames, detections_found, created_at "
+                "FROM processed_videos WHERE video_hash = ? AND model_version = ? AND settings_key = ?",
+                (video_hash, model_version, settings_key(job_settings))
+            ).fetchone()
+        if row is None:
+            return None
+        return ProcessedVideo(video_hash, model_version, json.loads(row[0]), *row[1:])
+    
+    def record(
+        self,
+        video_hash: str,
+        model_version: str,
+        job_settings: dict,
+        job_id: str,
+        video_filename: str,
+        processed_frames: int,
+        detections_found: int
+    ):
+        """Remember a completed job; a forced reprocess replaces the earlier one"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO processed_videos "
+                "(video_hash, model_version, settings_key, settings, job_id, video_filename, "
+                "processed_frames, detections_found, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    video_hash,
+                    model_version,
+                    settings_key(job_settings),
+                    json.dumps(job_settings, sort_keys=True),
+                    job_id,
+                    video_filename,
+                    processed_frames,
+                    detections_found,
+                    time.time()
+                )
+            )
+    
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM processed_videos").fetchone()[0]
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
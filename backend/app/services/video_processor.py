@@ -47,20 +47,31 @@ class VideoProcessor:
             
             logger.info(f"Video validated: {width}x{height}, {fps} fps, {frame_count} frames")
             return self.metadata
-            
+        
         except Exception as e:
             raise VideoError(
                 f"Video validation failed: {str(e)}",
                 {"video_path": self.video_path}
             )
     
-    def extract_frames(self) -> Iterator[Frame]:
+    def extract_frames(self, stride: int = 1) -> Iterator[Frame]:
+        """Yield every ``stride``-th frame, numbered by its position in the video.
+        
+        Skipped frames are only grabbed, not retrieved, which saves their
+        colour conversion and copy.
+        """
         if self.cap is None or not self.cap.isOpened():
             raise VideoError("Video not opened. Call validate_video() first.", {})
         
         frame_number = 0
         
         while True:
+            if frame_number % stride:
+                if not self.cap.grab():
+                    break
+                frame_number += 1
+                continue
+            
             ret, frame = self.cap.read()
             
             if not ret:
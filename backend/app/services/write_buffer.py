@@ -0,0 +1,184 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Awaitable, Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DamageWriteBuffer:
+    """Write-behind buffer that turns per-detection inserts into bulk inserts.
+    
+    Records are flushed through ``flush_func`` once ``max_batch_size`` records
+    are pending or ``flush_interval`` seconds after the first pending record,
+    whichever comes first. A failed batch is put back at the front of the
+    buffer and retried on the next flush. Once records have failed
+    ``max_attempts`` times the batch is bisected: the parts that go through
+    are written and records that fail on their own are dead-lettered, so one
+    bad record cannot block the rest. At most ``max_pending`` records are
+    buffered; ``add`` waits for room beyond that.
+    """
+    
+    def __init__(
+        self,
+        flush_func: Callable[[List[dict]], Awaitable[None]],
+        max_batch_size: int = 50,
+        flush_interval: float = 2.0,
+        max_attempts: int = 3,
+        max_pending: int = 10000,
+        on_dead_letter: Optional[Callable[[dict, Exception], None]] = None
+    ):
+        self.flush_func = flush_func
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.max_pending = max(max_pending, max_batch_size)
+        self.on_dead_letter = on_dead_letter
+        # Buffered records with the number of failed flushes they were in
+        self._records: List[Tuple[dict, int]] = []
+        self._lock = asyncio.Lock()
+        self._room = asyncio.Condition()
+        self._timer: Optional[asyncio.Task] = None
+        
+        self.batches_flushed = 0
+        self.records_flushed = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+        self.backpressure_waits = 0
+        self.dead_letters: deque = deque(maxlen=100)
+        self.batch_latencies_ms: deque = deque(maxlen=256)
+    
+    @property
+    def pending(self) -> int:
+        return len(self._records)
+    
+    async def add(self, record: dict):
+        if len(self._records) >= self.max_pending:
+            # Storage is not keeping up or is down; hold the producer until
+            # a flush makes room instead of growing without bound
+            self.backpressure_waits += 1
+            self._schedule_flush()
+            async with self._room:
+                await self._room.wait_for(lambda: len(self._records) < self.max_pending)
+        
+        self._records.append((record, 0))
+        
+        if len(self._records) >= self.max_batch_size:
+            try:
+                await self.flush()
+            except Exception as e:
+                # Records stay buffered; the timer retries them
+                logger.error(f"Write-behind flush failed, {self.pending} records pending: {e}")
+                self._schedule_flush()
+        else:
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Timed write-behind flush failed, {self.pending} records pending: {e}")
+            if self._records:
+                self._timer = None
+                self._schedule_flush()
+    
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._records:
+                return 0
+            
+            batch, self._records = self._records, []
+            records = [record for record, _ in batch]
+            start = time.perf_counter()
+            try:
+                await self.flush_func(records)
+                written = len(records)
+            except Exception:
+                self.failed_batches += 1
+                if max(attempts for _, attempts in batch) + 1 < self.max_attempts:
+                    self._records = [(record, attempts + 1) for record, attempts in batch] + self._records
+                    raise
+                written, failed = await self._isolate(records)
+                if not written:
+                    # Nothing went through, so storage is failing rather than
+                    # a record; keep everything and count attempts afresh
+                    self._records = [(record, 0) for record, _ in batch] + self._records
+                    raise
+                for record, error in failed:
+                    self._dead_letter(record, error)
+            
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.batches_flushed += 1
+            self.records_flushed += written
+            self.batch_latencies_ms.append(latency_ms)
+            logger.info(f"Flushed {written} damage records in {latency_ms:.1f} ms")
+        
+        async with self._room:
+            self._room.notify_all()
+        return written
+    
+    async def _isolate(self, records: List[dict]) -> Tuple[int, List[Tuple[dict, Exception]]]:
+        """Bisect a failing batch, writing every part that goes through.
+        
+        Returns the number of records written and the records that failed
+        alone, with their errors. One bad record costs about two flushes per
+        halving; when failures pile up with nothing written, storage is
+        failing rather than a record, and bisection stops early.
+        """
+        written, failed, failures = 0, [], 0
+        give_up_after = 2 * len(records).bit_length()
+        parts = [records[len(records) // 2:], records[:len(records) // 2]]
+        while parts:
+            part = parts.pop()
+            if not part:
+                continue
+            try:
+                await self.flush_func(part)
+                written += len(part)
+            except Exception as e:
+                failures += 1
+                if not written and failures > give_up_after:
+                    return 0, []
+                if len(part) == 1:
+                    failed.append((part[0], e))
+                else:
+                    parts += [part[len(part) // 2:], part[:len(part) // 2]]
+        if not written:
+            return 0, []
+        return written, failed
+    
+    def _dead_letter(self, record: dict, error: Exception):
+        self.dead_lettered += 1
+        self.dead_letters.append({"record": record, "error": str(error)})
+        logger.error(f"Dead-lettered damage record {record.get('id')} after {self.max_attempts} failed flushes: "
+                     f"{error}; record: {json.dumps(record, default=str)}")
+        if self.on_dead_letter is not None:
+            try:
+                self.on_dead_letter(record, error)
+            except Exception as e:
+                logger.error(f"Dead-letter callback failed: {e}")
+    
+    async def close(self):
+        if self._timer is not None and not self._timer.done():
+            self._timer.cancel()
+        await self.flush()
+    
+    def stats(self) -> dict:
+        latencies = list(self.batch_latencies_ms)
+        return {
+            "pending": self.pending,
+            "batches_flushed": self.batches_flushed,
+            "records_flushed": self.records_flushed,
+            "failed_batches": self.failed_batches,
+            "dead_lettered": self.dead_lettered,
+            "backpressure_waits": self.backpressure_waits,
+            "last_batch_ms": latencies[-1] if latencies else None,
+            "avg_batch_ms": sum(latencies) / len(latencies) if latencies else None
+        }
@@ -19,3 +19,8 @@ class VideoError(ProcessingError):
 class StorageError(ProcessingError):
     """Supabase storage or database errors"""
     pass
+
+
+class ImageError(ProcessingError):
+    """Image file or archive errors"""
+    pass
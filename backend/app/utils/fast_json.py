@@ -0,0 +1,48 @@
+import json
+from decimal import Decimal
+from typing import Any
+import numpy as np
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(value: Any):
+    # Storage can hand back Decimal (numeric columns) or numpy scalars
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(value: Any) -> bytes:
+        """Serialize ``value`` to compact JSON bytes"""
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(",", ":"))
+    
+    def dumps(value: Any) -> bytes:
+        """Serialize ``value`` to compact JSON bytes"""
+        return _encoder.encode(value).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with ``dumps``.
+    
+    Returning one from a route skips FastAPI's ``response_model`` validation
+    and ``jsonable_encoder`` pass; ``response_model`` then only documents the
+    schema, so the content must already match it.
+    """
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
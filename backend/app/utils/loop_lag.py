@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+import logging
+from app.utils.metrics import LOOP_LAG_MAX_SECONDS, LOOP_LAG_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a timer due every ``interval``.
+    
+    The lag is how long the loop was busy with something else, which every
+    request waiting on the loop pays as well. Samples go to the
+    ``/metrics`` lag histogram.
+    """
+    
+    def __init__(self, interval: float = 0.1, warn_after: float = 0.5):
+        self.interval = interval
+        self.warn_after = warn_after
+        self.samples = 0
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def record(self, lag: float):
+        self.samples += 1
+        LOOP_LAG_SECONDS.observe(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+            LOOP_LAG_MAX_SECONDS.set(lag)
+        if lag >= self.warn_after:
+            logger.warning(f"Event loop was blocked for {lag * 1000:.0f} ms")
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - start - self.interval))
@@ -0,0 +1,61 @@
+import time
+from typing import Dict
+
+
+class _Measurement:
+    # A plain context manager; @contextmanager costs several times more,
+    # which adds up when stages are timed per detection
+    __slots__ = ("timer", "stage", "start")
+    
+    def __init__(self, timer: "StageTimer", stage: str):
+        self.timer = timer
+        self.stage = stage
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.timer.add(self.stage, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class StageTimer:
+    """Accumulates wall-clock time per named processing stage.
+    
+    With a ``histogram`` (labelled by stage, in seconds), every measurement
+    is also exported to it.
+    """
+    
+    def __init__(self, histogram=None):
+        self.totals_ms: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.max_ms: Dict[str, float] = {}
+        self.histogram = histogram
+        self._series: Dict[str, object] = {}
+    
+    def add(self, stage: str, elapsed_ms: float):
+        if self.histogram is not None:
+            series = self._series.get(stage)
+            if series is None:
+                series = self._series[stage] = self.histogram.labels(stage)
+            series.observe(elapsed_ms / 1000)
+        self.totals_ms[stage] = self.totals_ms.get(stage, 0.0) + elapsed_ms
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        if elapsed_ms > self.max_ms.get(stage, 0.0):
+            self.max_ms[stage] = elapsed_ms
+    
+    def measure(self, stage: str) -> _Measurement:
+        """Time a ``with`` block, recorded even when the block raises"""
+        return _Measurement(self, stage)
+    
+    def summary(self) -> Dict[str, dict]:
+        return {
+            stage: {
+                "count": self.counts[stage],
+                "total_ms": round(total, 2),
+                "avg_ms": round(total / self.counts[stage], 3),
+                "max_ms": round(self.max_ms[stage], 3)
+            }
+            for stage, total in self.totals_ms.items()
+        }
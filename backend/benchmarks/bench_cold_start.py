@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark API cold start: import time and time until the health checks pass
+
+Each run starts a fresh interpreter, so nothing is warm. Two measurements:
+  
+  import   time to ``import app.main`` and which heavy modules it pulled in
+  serve    time from launching uvicorn until /health/live and /health/ready
+           answer 200 (local storage backend, optional model preload)
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start --runs 5
+    python -m benchmarks.bench_cold_start --preload-model
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+
+HEAVY_MODULES = ("cv2", "onnxruntime", "supabase", "pyarrow", "pandas")
+
+IMPORT_SNIPPET = f"""
+import sys, time, json
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"import_ms": elapsed, "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env(preload_model: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": tempfile.mkdtemp(prefix="cold-start-"),
+        "SPOOL_ENABLED": "false",
+        "PRELOAD_MODEL": "true" if preload_model else "false"
+    })
+    return env
+
+
+def measure_import(env: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def wait_for(url: str, deadline: float) -> float:
+    while time.perf_counter() < deadline:
+        try:
+            if httpx.get(url, timeout=0.5).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer 200 in time")
+
+
+def measure_serve(env: dict, timeout: float) -> dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        live = wait_for(f"{base_url}/health/live", deadline)
+        ready = wait_for(f"{base_url}/health/ready", deadline)
+        report = httpx.get(f"{base_url}/health/ready").json()["cold_start_ms"]
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        "live_ms": (live - start) * 1000,
+        "ready_ms": (ready - start) * 1000,
+        "reported": report
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API cold start")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement (default: 5)")
+    parser.add_argument("--preload-model", action="store_true", help="Load the ONNX model during startup")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for readiness (default: 60)")
+    args = parser.parse_args()
+    
+    env = server_env(args.preload_model)
+    imports = [measure_import(env) for _ in range(args.runs)]
+    print(f"import app.main: median {statistics.median(r['import_ms'] for r in imports):.0f} ms")
+    print(f"  heavy modules loaded: {', '.join(imports[-1]['heavy']) or 'none'}")
+    
+    serves = [measure_serve(env, args.timeout) for _ in range(args.runs)]
+    print(f"\nuvicorn launch -> /health/live:  median {statistics.median(r['live_ms'] for r in serves):.0f} ms")
+    print(f"uvicorn launch -> /health/ready: median {statistics.median(r['ready_ms'] for r in serves):.0f} ms")
+    print(f"  app-reported cold start (last run): {serves[-1]['reported']}")
+
+
+if __name__ == "__main__":
+    main()
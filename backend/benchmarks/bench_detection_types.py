@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-frame overhead of the inference-to-tracker hot path
+
+Compares building pydantic Detection models for every box (the previous
+behaviour) against the NamedTuple FrameDetection path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_detection_types --boxes 100 --frames 500
+"""
+import argparse
+import time
+import numpy as np
+from app.api.models import Detection, BoundingBox
+from app.services.detection_tracker import DetectionTracker
+from app.services.detection_types import detections_from_array
+
+
+def make_raw_outputs(frames: int, boxes: int, seed: int = 0) -> list:
+    """Generate random YOLO-style outputs of shape [1, boxes, 6]"""
+    rng = np.random.default_rng(seed)
+    outputs = []
+    for _ in range(frames):
+        xy = rng.uniform(0, 600, (boxes, 2))
+        wh = rng.uniform(10, 80, (boxes, 2))
+        raw = np.empty((1, boxes, 6), dtype=np.float32)
+        raw[0, :, 0:2] = xy
+        raw[0, :, 2:4] = xy + wh
+        raw[0, :, 4] = rng.integers(0, 4, boxes)
+        raw[0, :, 5] = rng.uniform(0, 1, boxes)
+        outputs.append(raw)
+    return outputs
+
+
+def pydantic_postprocess(raw_output: np.ndarray) -> list:
+    """Previous postprocess: one validated pydantic model per box"""
+    detections = []
+    for x1, y1, x2, y2, class_id, confidence in raw_output[0]:
+        detections.append(Detection(
+            bbox=BoundingBox(x1=int(x1), y1=int(y1), x2=int(x2), y2=int(y2)),
+            class_id=int(class_id),
+            confidence=float(confidence)
+        ))
+    return detections
+
+
+def run_pipeline(outputs: list, postprocess, threshold: float, window: int) -> float:
+    """Run postprocess + filtering + tracking; return mean microseconds per frame"""
+    tracker = DetectionTracker(window_size=window, iou_threshold=0.5)
+    start = time.perf_counter()
+    for frame_number, raw in enumerate(outputs):
+        detections = postprocess(raw, threshold)
+        for detection in detections:
+            if not tracker.is_duplicate(detection, frame_number):
+                tracker.add_detection(detection, frame_number)
+        tracker.cleanup_old_frames(frame_number)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(outputs) * 1e6
+
+
+def run_postprocess(outputs: list, postprocess, threshold: float) -> float:
+    """Run postprocess + filtering only; return mean microseconds per frame"""
+    start = time.perf_counter()
+    for raw in outputs:
+        postprocess(raw, threshold)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(outputs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detection hot path overhead")
+    parser.add_argument("--boxes", type=int, default=100, help="Boxes per frame (default: 100)")
+    parser.add_argument("--frames", type=int, default=500, help="Frames to simulate (default: 500)")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Confidence threshold (default: 0.5)")
+    parser.add_argument("--window", type=int, default=30, help="Tracking window size (default: 30)")
+    args = parser.parse_args()
+
+    outputs = make_raw_outputs(args.frames, args.boxes)
+
+    def legacy(raw, threshold):
+        return [d for d in pydantic_postprocess(raw) if d.confidence > threshold]
+
+    def compact(raw, threshold):
+        return detections_from_array(raw[0], threshold)
+
+    # Warm up both paths before timing
+    run_pipeline(outputs[:10], legacy, args.threshold, args.window)
+    run_pipeline(outputs[:10], compact, args.threshold, args.window)
+
+    print(f"Boxes per frame: {args.boxes}, frames: {args.frames}")
+    for label, runner in (
+        ("postprocess", lambda fn: run_postprocess(outputs, fn, args.threshold)),
+        ("postprocess + tracker", lambda fn: run_pipeline(outputs, fn, args.threshold, args.window)),
+    ):
+        legacy_us = runner(legacy)
+        compact_us = runner(compact)
+        print(f"\n  {label}:")
+        print(f"    pydantic models:   {legacy_us:9.1f} us/frame")
+        print(f"    FrameDetection:    {compact_us:9.1f} us/frame")
+        print(f"    speedup:           {legacy_us / compact_us:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark streaming exports: rows/s, output size and memory per format
+
+Builds (or reuses) a local SQLite store of synthetic detections, then runs
+each export format through the same streaming path as
+GET /api/v1/damages/export and discards the output. Resident memory is
+sampled while exporting; with streaming it should stay flat as --rows grows.
+
+Usage (from backend/):
+    python -m benchmarks.bench_export --rows 2000000 --data-dir /tmp/export-bench
+    python -m benchmarks.bench_export --rows 200000 --formats ndjson,parquet
+"""
+import argparse
+import asyncio
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.services.damage_query import ROAD_DAMAGE_COLUMNS, DamageQuery
+from app.services.export import EXPORT_FORMATS, create_exporter, stream_export
+from app.services.local_backend import LocalStorageBackend
+from app.services.storage_service import DamageStorageService
+
+DAMAGE_TYPES = np.array(["pothole", "longitudinal_crack", "transverse_crack", "alligator_crack"])
+SEVERITIES = np.array(["low", "medium", "high"])
+STATES = np.array(["Berlin", "Bayern", "Hessen", "Sachsen"])
+
+
+def populate(backend: LocalStorageBackend, rows: int, chunk: int = 50_000, seed: int = 7):
+    """Insert ``rows`` synthetic detections in chunks, vectorized per chunk"""
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        seconds = rng.integers(0, 365 * 86400, n)
+        latitude = rng.uniform(47.3, 55.0, n)
+        longitude = rng.uniform(5.9, 15.0, n)
+        confidence = rng.uniform(0.3, 1.0, n)
+        types = rng.choice(DAMAGE_TYPES, n)
+        severities = rng.choice(SEVERITIES, n)
+        states = rng.choice(STATES, n)
+        backend.insert_records([
+            {
+                "id": str(uuid.UUID(int=int(rng.integers(0, 2**63)) << 64 | offset + i)),
+                "damage_type": str(types[i]),
+                "severity": str(severities[i]),
+                "latitude": float(latitude[i]),
+                "longitude": float(longitude[i]),
+                "confidence_score": float(confidence[i]),
+                "detected_at": (start + timedelta(seconds=int(seconds[i]))).isoformat(),
+                "state": str(states[i]),
+                "road_name": f"Road {i % 500}",
+                "metadata": {"frame_number": int(i), "seed_data": True}
+            }
+            for i in range(n)
+        ])
+        print(f"\r  inserted {offset + n:,}/{rows:,}", end="", flush=True)
+    print()
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return float("nan")
+
+
+class RssSampler:
+    """Tracks peak resident memory in a background thread"""
+    
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_mb())
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def run_export(service: DamageStorageService, export_format: str, page_size: int) -> dict:
+    query = DamageQuery(fields=ROAD_DAMAGE_COLUMNS, limit=page_size)
+    exporter = create_exporter(export_format, query.fields)
+    baseline = rss_mb()
+    total_bytes = 0
+    start = time.perf_counter()
+    with RssSampler() as sampler:
+        async for chunk in stream_export(service, exporter, query):
+            total_bytes += len(chunk)
+    elapsed = time.perf_counter() - start
+    return {"elapsed": elapsed, "bytes": total_bytes, "rss_growth_mb": sampler.peak - baseline}
+
+
+async def run(args):
+    backend = LocalStorageBackend(args.data_dir)
+    existing = backend._reader().execute("SELECT COUNT(*) FROM road_damage").fetchone()[0]
+    if existing < args.rows:
+        print(f"Populating {args.data_dir} with {args.rows - existing:,} rows...")
+        populate(backend, args.rows - existing, seed=existing + 7)
+        existing = args.rows
+    
+    service = DamageStorageService(backend)
+    print(f"\nExporting {existing:,} rows, page size {args.page_size}\n")
+    print(f"{'format':<10}{'seconds':>10}{'rows/s':>12}{'MB out':>10}{'RSS +MB':>10}")
+    for export_format in args.formats.split(","):
+        result = await run_export(service, export_format, args.page_size)
+        print(
+            f"{export_format:<10}{result['elapsed']:>10.2f}{existing / result['elapsed']:>12,.0f}"
+            f"{result['bytes'] / 1e6:>10.1f}{result['rss_growth_mb']:>10.1f}"
+        )
+    await service.close()
+    backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming exports")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Rows in the store (default: 2000000)")
+    parser.add_argument("--data-dir", default="./data/export-bench", help="Local store, reused between runs")
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per storage query (default: 1000)")
+    parser.add_argument("--formats", default=",".join(EXPORT_FORMATS), help="Comma-separated formats")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
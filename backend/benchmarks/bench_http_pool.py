@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request latency of Supabase calls with and without connection pooling
+
+Starts a local HTTP stand-in for the Supabase REST API. It adds a fixed
+delay to the first request on every new connection, standing in for the
+TCP and TLS setup a remote project costs, and a smaller delay to every
+request for server time. The same PostgREST query is then issued through:
+  
+  new-client   a new Supabase client per call (what the seed scripts did)
+  shared-pool  the process-wide client from app.services.supabase_client
+
+Usage (from backend/):
+    python -m benchmarks.bench_http_pool --requests 200 --threads 8 --handshake-ms 40
+"""
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from supabase import create_client
+from app.services.http_pool import pool_stats
+from app.services.supabase_client import get_shared_client
+
+API_KEY = "eyJhbGciOiJIUzI1NiJ9.e30.benchmark"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+    handshake_s = 0.0
+    server_s = 0.0
+    connections = 0
+    lock = threading.Lock()
+    
+    def setup(self):
+        super().setup()
+        self.first_request = True
+        with StandInHandler.lock:
+            StandInHandler.connections += 1
+    
+    def do_GET(self):
+        delay = self.server_s + (self.handshake_s if self.first_request else 0.0)
+        self.first_request = False
+        time.sleep(delay)
+        body = b'[{"id":"00000000-0000-0000-0000-000000000001"}]'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in(handshake_ms: float, server_ms: float) -> ThreadingHTTPServer:
+    StandInHandler.handshake_s = handshake_ms / 1000
+    StandInHandler.server_s = server_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def new_client_call(url: str):
+    create_client(url, API_KEY).table("road_damage").select("id").limit(1).execute()
+
+
+def shared_pool_call(url: str):
+    get_shared_client(url, API_KEY).table("road_damage").select("id").limit(1).execute()
+
+
+def run_mode(call, url: str, requests: int, threads: int) -> dict:
+    def timed(_):
+        start = time.perf_counter()
+        call(url)
+        return (time.perf_counter() - start) * 1000
+    
+    connections_before = StandInHandler.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "rps": requests / elapsed,
+        "connections": StandInHandler.connections - connections_before
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTTP connection pooling")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode (default: 200)")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent callers (default: 8)")
+    parser.add_argument("--handshake-ms", type=float, default=40.0, help="Setup delay per new connection (default: 40)")
+    parser.add_argument("--server-ms", type=float, default=5.0, help="Delay per request (default: 5)")
+    args = parser.parse_args()
+    
+    server = start_stand_in(args.handshake_ms, args.server_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(
+        f"{args.requests} requests, {args.threads} threads, "
+        f"{args.handshake_ms:.0f} ms per new connection, {args.server_ms:.0f} ms per request\n"
+    )
+    print(f"{'mode':<14}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>9}{'conns':>7}")
+    for name, call in (("new-client", new_client_call), ("shared-pool", shared_pool_call)):
+        result = run_mode(call, url, args.requests, args.threads)
+        print(
+            f"{name:<14}{result['mean']:>9.1f}{result['p50']:>9.1f}{result['p95']:>9.1f}"
+            f"{result['rps']:>9.0f}{result['connections']:>7}"
+        )
+    
+    print(f"\nShared pool metrics: {pool_stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
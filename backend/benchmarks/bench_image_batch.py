@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Photo throughput of /process-images: one request per image against batches
+
+Renders synthetic road photos (see ``benchmarks.synthetic``), builds the
+stub ONNX model with a dynamic batch axis and drives the API in process
+against the local storage backend. Each mode sends the same photos:
+  
+  single   one request per photo, one after another
+  batch    every photo in one multipart request, once per --batch-sizes
+           value of IMAGE_BATCH_SIZE (images per session run)
+  zip      every photo in one zip archive
+
+Reports images/s per mode and the speedup over ``single``; with --output
+the results are written as JSON.
+
+Usage (from backend/):
+    python -m benchmarks.bench_image_batch --images 200 --batch-sizes 1 8 16
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="image-batch-bench-")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["LOCAL_STORAGE_DIR"] = os.path.join(WORK_DIR, "data")
+os.environ["SPOOL_ENABLED"] = "false"
+os.environ["MODEL_PATH"] = os.path.join(WORK_DIR, "stub.onnx")
+os.environ["VIDEO_INDEX_PATH"] = os.path.join(WORK_DIR, "video_index.db")
+
+import cv2
+import httpx
+from app.api.resources import AppResources
+from app.config import settings
+from app.main import app
+from benchmarks.synthetic import build_stub_model, render_frames
+
+ENDPOINT = "/api/v1/process-images"
+
+
+def make_photos(count: int, width: int, height: int, quality: int, seed: int):
+    """JPEG photos of the synthetic road, spread over several clips so they differ"""
+    photos = []
+    clips = max(1, count // 30)
+    per_clip = -(-count // clips)
+    for clip in range(clips):
+        for number, (frame, _) in enumerate(render_frames(per_clip, width, height, damages=10, seed=seed + clip)):
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            photos.append((f"clip{clip}_{number:04d}.jpg", encoded.tobytes()))
+    return photos[:count]
+
+
+def zip_photos(photos) -> bytes:
+    buffer = io.BytesIO()
+    # JPEGs do not compress further; stored keeps zipping out of the timing
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for name, data in photos:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+async def timed(client: httpx.AsyncClient, requests) -> dict:
+    images = detections = 0
+    start = time.perf_counter()
+    for files in requests:
+        response = await client.post(ENDPOINT, files=files)
+        response.raise_for_status()
+        body = response.json()
+        if body["status"] != "completed":
+            raise RuntimeError(f"Batch failed: {body.get('error_message')}")
+        images += body["processed_images"]
+        detections += body["detections_found"]
+    seconds = time.perf_counter() - start
+    return {
+        "requests": len(requests),
+        "images": images,
+        "detections": detections,
+        "seconds": round(seconds, 3),
+        "images_per_second": round(images / seconds, 2)
+    }
+
+
+async def run(args, photos) -> dict:
+    resources = AppResources.create(settings)
+    await resources.start()
+    resources.model_registry.preload()
+    app.state.resources = resources
+    archive = zip_photos(photos)
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+            # Warm-up: first session run and pool threads
+            await timed(client, [[("images", photos[0])]])
+            
+            settings.image_batch_size = 1
+            results["single"] = await timed(client, [[("images", photo)] for photo in photos])
+            for batch_size in args.batch_sizes:
+                settings.image_batch_size = batch_size
+                results[f"batch_{batch_size}"] = await timed(
+                    client, [[("images", photo) for photo in photos]]
+                )
+            results["zip"] = await timed(client, [[("images", ("photos.zip", archive, "application/zip"))]])
+    finally:
+        await resources.close()
+    
+    single = results["single"]["images_per_second"]
+    for stats in results.values():
+        stats["speedup"] = round(stats["images_per_second"] / single, 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch photo endpoint throughput")
+    parser.add_argument("--images", type=int, default=120, help="Photos per mode (default: 120)")
+    parser.add_argument("--width", type=int, default=1920, help="Photo width (default: 1920)")
+    parser.add_argument("--height", type=int, default=1080, help="Photo height (default: 1080)")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality (default: 90)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the photos (default: 0)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8],
+                        help="IMAGE_BATCH_SIZE values to run the batch mode with (default: 1 8)")
+    parser.add_argument("--decode-workers", type=int, default=settings.image_decode_workers,
+                        help=f"IMAGE_DECODE_WORKERS (default: {settings.image_decode_workers})")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    settings.image_decode_workers = args.decode_workers
+    settings.image_batch_sync_max = args.images
+    settings.image_batch_max_images = args.images
+    
+    photos = make_photos(args.images, args.width, args.height, args.quality, args.seed)
+    build_stub_model(settings.model_path, dynamic_batch=True)
+    try:
+        results = asyncio.run(run(args, photos))
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    
+    print(f"{len(photos)} photos {args.width}x{args.height}, "
+          f"{sum(len(data) for _, data in photos) / len(photos) / 1024:.0f} KB each, {os.cpu_count()} CPUs\n")
+    print(f"{'mode':<12}{'requests':>9}{'seconds':>10}{'images/s':>10}{'speedup':>9}")
+    for mode, stats in results.items():
+        print(f"{mode:<12}{stats['requests']:>9}{stats['seconds']:>10.2f}"
+              f"{stats['images_per_second']:>10.1f}{stats['speedup']:>8.2f}x")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "benchmark": "image_batch",
+                "python": sys.version.split()[0],
+                "cpus": os.cpu_count(),
+                "config": {
+                    "images": len(photos),
+                    "resolution": f"{args.width}x{args.height}",
+                    "quality": args.quality,
+                    "decode_workers": args.decode_workers
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
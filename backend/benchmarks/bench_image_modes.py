@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark bytes stored and encode time per detection for each image output mode
+
+Frames are synthetic road-like images (gradient plus noise) so encoded
+sizes are in a realistic range rather than the worst case of pure noise.
+
+Usage (from backend/):
+    python -m benchmarks.bench_image_modes --resolution 3840x2160 --detections 50
+"""
+import argparse
+import numpy as np
+from app.services.detection_types import BBox
+from app.services.image_encoder import IMAGE_OUTPUT_MODES, ImageOutputConfig, encode_detection_images
+
+
+def make_frame(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Grey asphalt-like gradient with texture noise"""
+    gradient = np.linspace(70, 130, height, dtype=np.float32)[:, None, None]
+    noise = rng.normal(0, 12, (height, width, 1)).astype(np.float32)
+    frame = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    return np.repeat(frame, 3, axis=2)
+
+
+def make_bboxes(width: int, height: int, count: int, rng: np.random.Generator) -> list:
+    boxes = []
+    for _ in range(count):
+        w = int(rng.uniform(0.05, 0.25) * width)
+        h = int(rng.uniform(0.05, 0.2) * height)
+        x1 = int(rng.uniform(0, width - w))
+        y1 = int(rng.uniform(0, height - h))
+        boxes.append(BBox(x1, y1, x1 + w, y1 + h))
+    return boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image output modes")
+    parser.add_argument("--resolution", default="3840x2160", help="Frame size WxH (default: 3840x2160)")
+    parser.add_argument("--detections", type=int, default=50, help="Detections to encode (default: 50)")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.resolution.lower().split("x"))
+    rng = np.random.default_rng(0)
+    frame = make_frame(width, height, rng)
+    boxes = make_bboxes(width, height, args.detections, rng)
+
+    print(f"Frame {width}x{height}, {args.detections} detections")
+    print(f"{'mode':<10} {'format':<6} {'KiB/detection':>14} {'encode ms/detection':>20}")
+    for image_format in ("jpeg", "webp"):
+        for mode in IMAGE_OUTPUT_MODES:
+            config = ImageOutputConfig(mode=mode, image_format=image_format)
+            total_bytes = 0
+            total_ms = 0.0
+            for bbox in boxes:
+                for image in encode_detection_images(frame, bbox, config):
+                    total_bytes += len(image.data)
+                    total_ms += image.encode_ms
+            print(
+                f"{mode:<10} {image_format:<6} "
+                f"{total_bytes / len(boxes) / 1024:>14.1f} "
+                f"{total_ms / len(boxes):>20.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark requests per second of GET /api/v1/damages for 100- and 1000-row pages
+
+Runs the app in-process on a local SQLite store and drives it with several
+concurrent clients, once without compression and once per supported
+Content-Encoding. Also times the serialization step alone: the previous
+path (a pydantic DamageResponse per row, then jsonable_encoder and
+json.dumps) against the fast path (rows straight to ``dumps``).
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_responses --duration 5 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ.setdefault("LOCAL_STORAGE_DIR", tempfile.mkdtemp(prefix="json-bench-"))
+os.environ["SPOOL_ENABLED"] = "false"
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from app.api.compression import brotli
+from app.api.models import DamageResponse
+from app.main import app
+from app.services.damage_query import DEFAULT_FIELDS
+from app.utils.fast_json import dumps
+from benchmarks.bench_export import populate
+
+PAGE_SIZES = (100, 1000)
+
+# One log line per request would dominate the measurement
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def client_loop(client, url: str, headers: dict, stop: asyncio.Event, counts: list):
+    while not stop.is_set():
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        counts[0] += 1
+        counts[1] += int(response.headers.get("content-length", len(response.content)))
+        # ASGITransport never yields to the loop on its own
+        await asyncio.sleep(0)
+
+
+async def measure_rps(client, url: str, headers: dict, duration: float, concurrency: int) -> tuple:
+    stop = asyncio.Event()
+    counts = [0, 0]
+    tasks = [
+        asyncio.create_task(client_loop(client, url, headers, stop, counts))
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return counts[0] / elapsed, counts[1] / max(counts[0], 1)
+
+
+def time_serialization(rows: list, repeat: int = 20) -> tuple:
+    # DamageResponse requires an image URL; the synthetic rows have none
+    rows = [{**row, "image_url": row["image_url"] or ""} for row in rows]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.dumps(jsonable_encoder([DamageResponse(**row) for row in rows])).encode()
+    pydantic_ms = (time.perf_counter() - start) * 1000 / repeat
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dumps(rows)
+    fast_ms = (time.perf_counter() - start) * 1000 / repeat
+    return pydantic_ms, fast_ms
+
+
+async def run(args):
+    # ASGITransport does not run the lifespan, so enter it here
+    async with app.router.lifespan_context(app):
+        await measure(args, app.state.resources.storage_service.backend)
+
+
+async def measure(args, backend):
+    if backend._reader().execute("SELECT COUNT(*) FROM road_damage").fetchone()[0] < args.rows:
+        populate(backend, args.rows)
+    
+    encodings = [("identity", "identity"), ("gzip", "gzip")]
+    if brotli is not None:
+        encodings.append(("br", "br"))
+    
+    print(f"{args.concurrency} concurrent clients, {args.duration:.0f}s per run\n")
+    print(f"{'rows':>6}{'encoding':>10}{'req/s':>10}{'KB/resp':>10}")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for page_size in PAGE_SIZES:
+            url = f"/api/v1/damages?limit={page_size}"
+            for label, encoding in encodings:
+                rps, size = await measure_rps(
+                    client, url, {"Accept-Encoding": encoding}, args.duration, args.concurrency
+                )
+                print(f"{page_size:>6}{label:>10}{rps:>10.0f}{size / 1024:>10.1f}")
+    
+    print(f"\n{'rows':>6}{'pydantic ms':>14}{'fast ms':>10}{'speedup':>10}")
+    for page_size in PAGE_SIZES:
+        rows = backend.select_latest(page_size, DEFAULT_FIELDS)
+        pydantic_ms, fast_ms = time_serialization(rows)
+        print(f"{page_size:>6}{pydantic_ms:>14.2f}{fast_ms:>10.2f}{pydantic_ms / fast_ms:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON response throughput")
+    parser.add_argument("--rows", type=int, default=5000, help="Rows in the local store (default: 5000)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run (default: 5)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
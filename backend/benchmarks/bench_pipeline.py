@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+End-to-end offline benchmark of the video pipeline
+
+Renders a synthetic road video, builds the stub ONNX model (see
+``benchmarks.synthetic``) and runs ``process_video_task`` against the local
+storage backend, so no network, Supabase project or real model is needed.
+Reports frames/s, per-stage latency from the ``/metrics`` stage histogram,
+peak RSS and every storage backend call, and writes them as JSON so runs
+from different commits can be compared.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --frames 300 --output results.json
+    python -m benchmarks.bench_pipeline --output new.json --compare results.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+WORK_DIR = tempfile.mkdtemp(prefix="pipeline-bench-")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["LOCAL_STORAGE_DIR"] = os.path.join(WORK_DIR, "data")
+os.environ["SPOOL_DIR"] = os.path.join(WORK_DIR, "spool")
+os.environ["MODEL_PATH"] = os.path.join(WORK_DIR, "stub.onnx")
+
+from app.api import routes
+from app.api.resources import AppResources
+from app.config import settings
+from app.services.local_backend import LocalStorageBackend
+from app.services.spool import DetectionSpool
+from app.services.storage_service import DamageStorageService
+from app.utils.metrics import STAGE_SECONDS, bucket_quantile
+from benchmarks.bench_export import RssSampler, rss_mb
+from benchmarks.synthetic import build_stub_model, make_road_video
+
+
+class CountingBackend:
+    """Forwards to a storage backend, counting calls, time and uploaded bytes"""
+    
+    def __init__(self, backend):
+        self._backend = backend
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.upload_bytes = 0
+        self.records_inserted = 0
+    
+    def __getattr__(self, name):
+        attribute = getattr(self._backend, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+        
+        def counted(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    stats = self.calls.setdefault(name, {"calls": 0, "total_ms": 0.0})
+                    stats["calls"] += 1
+                    stats["total_ms"] += elapsed
+                    if name == "upload_image":
+                        self.upload_bytes += len(args[0])
+                    elif name == "insert_records":
+                        self.records_inserted += len(args[0])
+        return counted
+    
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "calls": {
+                    name: {"calls": stats["calls"], "total_ms": round(stats["total_ms"], 2)}
+                    for name, stats in sorted(self.calls.items())
+                },
+                "upload_bytes": self.upload_bytes,
+                "records_inserted": self.records_inserted
+            }
+
+
+def stage_snapshot() -> dict:
+    return {
+        values[0]: (list(child.counts), child.sum)
+        for values, child in list(STAGE_SECONDS._children.items())
+    }
+
+
+def stage_report(before: dict, after: dict) -> dict:
+    """Per-stage latency over the run, from the difference of two snapshots"""
+    report = {}
+    for stage, (counts, total) in sorted(after.items()):
+        previous_counts, previous_total = before.get(stage, ([0] * len(counts), 0.0))
+        delta = [now - then for now, then in zip(counts, previous_counts)]
+        count = sum(delta)
+        if not count:
+            continue
+        seconds = total - previous_total
+        report[stage] = {
+            "count": count,
+            "total_ms": round(seconds * 1000, 2),
+            "mean_ms": round(seconds * 1000 / count, 3),
+            "p50_ms": round(bucket_quantile(STAGE_SECONDS.bounds, delta, 0.5) * 1000, 3),
+            "p95_ms": round(bucket_quantile(STAGE_SECONDS.bounds, delta, 0.95) * 1000, 3)
+        }
+    return report
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def wait_for_spool(service: DamageStorageService, timeout: float):
+    """Let the spool drainer finish uploading what the job spooled"""
+    deadline = time.perf_counter() + timeout
+    while service.spool is not None and service.spool.pending_count() and time.perf_counter() < deadline:
+        service.drainer.wake()
+        await asyncio.sleep(0.05)
+
+
+async def run(args, video_path: str) -> dict:
+    backend = CountingBackend(LocalStorageBackend(settings.local_storage_dir, settings.local_image_base_url))
+    spool = DetectionSpool(settings.spool_dir) if args.spool else None
+    resources = AppResources.create(settings, storage_service=DamageStorageService(backend, spool=spool))
+    await resources.start()
+    
+    # Load the model up front; startup cost is bench_cold_start's job
+    load_start = time.perf_counter()
+    resources.model_registry.preload()
+    model_load_ms = (time.perf_counter() - load_start) * 1000
+    
+    # process_video_task deletes its input, so each run gets a copy
+    job_video = os.path.join(WORK_DIR, "job.mp4")
+    shutil.copyfile(video_path, job_video)
+    job_id = "bench"
+    routes.job_status[job_id] = {
+        "status": "processing", "processed_frames": 0, "detections_found": 0, "error_message": None
+    }
+    
+    before = stage_snapshot()
+    baseline_rss = rss_mb()
+    with RssSampler(interval=0.01) as sampler:
+        start = time.perf_counter()
+        await routes.process_video_task(resources, job_id, job_video, "synthetic.mp4")
+        job_seconds = time.perf_counter() - start
+        await wait_for_spool(resources.storage_service, args.drain_timeout)
+        total_seconds = time.perf_counter() - start
+    after = stage_snapshot()
+    await resources.close()
+    
+    status = routes.job_status.pop(job_id)
+    if status["status"] != "completed":
+        raise RuntimeError(f"Job failed: {status['error_message']}")
+    
+    return {
+        "frames": status["processed_frames"],
+        "detections_stored": status["detections_found"],
+        "job_seconds": round(job_seconds, 3),
+        "frames_per_second": round(status["processed_frames"] / job_seconds, 2),
+        "seconds_until_stored": round(total_seconds, 3),
+        "model_load_ms": round(model_load_ms, 1),
+        "stages": stage_report(before, after),
+        "rss_mb": {"baseline": round(baseline_rss, 1), "peak": round(sampler.peak, 1)},
+        "storage": backend.report(),
+        "failed_detections": resources.storage_service.failed_detections
+    }
+
+
+def print_report(result: dict):
+    results = result["results"]
+    print(f"frames: {results['frames']}  detections stored: {results['detections_stored']}")
+    print(f"job: {results['job_seconds']:.2f}s  ({results['frames_per_second']:.1f} frames/s), "
+          f"stored after {results['seconds_until_stored']:.2f}s")
+    print(f"peak RSS: {results['rss_mb']['peak']:.0f} MB (baseline {results['rss_mb']['baseline']:.0f} MB)\n")
+    print(f"{'stage':<14}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'total ms':>11}")
+    for stage, stats in results["stages"].items():
+        print(f"{stage:<14}{stats['count']:>8}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}"
+              f"{stats['p95_ms']:>10.3f}{stats['total_ms']:>11.1f}")
+    print("\nstorage calls:")
+    for name, stats in results["storage"]["calls"].items():
+        print(f"  {name:<16}{stats['calls']:>6}  {stats['total_ms']:>9.1f} ms")
+    print(f"  uploaded {results['storage']['upload_bytes'] / 1024:.0f} KB, "
+          f"inserted {results['storage']['records_inserted']} records")
+
+
+def print_comparison(result: dict, baseline: dict):
+    def change(new, old):
+        return f"{100 * (new - old) / old:+.1f}%" if old else "n/a"
+    
+    new, old = result["results"], baseline["results"]
+    print(f"\nagainst {baseline.get('commit', '?')}:")
+    print(f"  frames/s      {old['frames_per_second']:>9.1f} -> {new['frames_per_second']:>9.1f}  "
+          f"{change(new['frames_per_second'], old['frames_per_second'])}")
+    print(f"  peak RSS MB   {old['rss_mb']['peak']:>9.0f} -> {new['rss_mb']['peak']:>9.0f}  "
+          f"{change(new['rss_mb']['peak'], old['rss_mb']['peak'])}")
+    for stage, stats in new["stages"].items():
+        if stage in old["stages"]:
+            before_ms = old["stages"][stage]["mean_ms"]
+            print(f"  {stage:<13} {before_ms:>9.3f} -> {stats['mean_ms']:>9.3f}  {change(stats['mean_ms'], before_ms)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end offline pipeline benchmark")
+    parser.add_argument("--frames", type=int, default=300, help="Frames in the synthetic video (default: 300)")
+    parser.add_argument("--width", type=int, default=1280, help="Frame width (default: 1280)")
+    parser.add_argument("--height", type=int, default=720, help="Frame height (default: 720)")
+    parser.add_argument("--damages", type=int, default=12, help="Damage instances in the clip (default: 12)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the video (default: 0)")
+    parser.add_argument("--backbone-channels", type=int, default=16,
+                        help="Width of the stub model's conv stack; 0 for none (default: 16)")
+    parser.add_argument("--no-spool", dest="spool", action="store_false",
+                        help="Upload directly instead of through the spool")
+    parser.add_argument("--drain-timeout", type=float, default=60.0,
+                        help="Seconds to wait for spooled uploads after the job (default: 60)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    
+    # Per-detection log lines would dominate the run
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    video_path = os.path.join(WORK_DIR, "synthetic.mp4")
+    make_road_video(video_path, args.frames, args.width, args.height, damages=args.damages, seed=args.seed)
+    build_stub_model(settings.model_path, backbone_channels=args.backbone_channels)
+    
+    try:
+        results = asyncio.run(run(args, video_path))
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+    
+    result = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "config": {
+            "frames": args.frames,
+            "resolution": f"{args.width}x{args.height}",
+            "damages": args.damages,
+            "seed": args.seed,
+            "backbone_channels": args.backbone_channels,
+            "spool": args.spool,
+            "image_output_mode": settings.image_output_mode,
+            "image_format": settings.image_format,
+            "encode_workers": settings.encode_workers,
+            "inference_workers": settings.inference_workers
+        },
+        "results": results
+    }
+    print_report(result)
+    
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(result, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Detection accuracy against labelled frames
+
+Boxes are matched per frame and per class, greedily by confidence, at an
+IoU threshold (0.5 by default, as in PASCAL VOC). Average precision uses
+all-point interpolation of the precision/recall curve, and mAP averages it
+over the classes that appear in the labels.
+"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+
+def box_iou(box: Sequence[float], boxes: np.ndarray) -> np.ndarray:
+    """IoU of one ``(x1, y1, x2, y2)`` box with each row of ``boxes``"""
+    if len(boxes) == 0:
+        return np.zeros(0)
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    union = area + areas - intersection
+    return np.divide(intersection, union, out=np.zeros(len(boxes)), where=union > 0)
+
+
+def match_frame(detections, truths, iou_threshold: float = 0.5) -> List[Optional[int]]:
+    """Index into ``truths`` matched by each detection, or ``None``.
+    
+    ``detections`` have ``bbox``, ``class_id`` and ``confidence``;
+    ``truths`` have ``class_id`` and ``x1..y2``. Each truth is matched at
+    most once, by the most confident detection that overlaps it enough.
+    """
+    matches: List[Optional[int]] = [None] * len(detections)
+    if not truths:
+        return matches
+    truth_boxes = np.array([(t.x1, t.y1, t.x2, t.y2) for t in truths], dtype=np.float64)
+    truth_classes = np.array([t.class_id for t in truths])
+    taken = np.zeros(len(truths), dtype=bool)
+    for index in sorted(range(len(detections)), key=lambda i: -detections[i].confidence):
+        detection = detections[index]
+        overlaps = box_iou(detection.bbox, truth_boxes)
+        overlaps[(truth_classes != detection.class_id) | taken] = -1
+        best = int(np.argmax(overlaps))
+        if overlaps[best] >= iou_threshold:
+            taken[best] = True
+            matches[index] = best
+    return matches
+
+
+def average_precision(confidences: Sequence[float], hits: Sequence[bool], positives: int) -> float:
+    """Area under the interpolated precision/recall curve"""
+    if positives == 0 or len(confidences) == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(confidences), kind="stable")
+    hits = np.asarray(hits, dtype=np.float64)[order]
+    true_positives = np.cumsum(hits)
+    recall = true_positives / positives
+    precision = true_positives / np.arange(1, len(hits) + 1)
+    # Precision envelope, then sum precision at each recall step
+    recall = np.concatenate([[0.0], recall, [1.0]])
+    precision = np.concatenate([[0.0], precision, [0.0]])
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    steps = np.nonzero(recall[1:] != recall[:-1])[0]
+    return float(np.sum((recall[steps + 1] - recall[steps]) * precision[steps + 1]))
+
+
+class DetectionEvaluator:
+    """Accumulates matches over many frames and clips"""
+    
+    def __init__(self, iou_threshold: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.confidences: Dict[int, List[float]] = {}
+        self.hits: Dict[int, List[bool]] = {}
+        self.positives: Dict[int, int] = {}
+    
+    def add_frame(self, detections, truths) -> List[Optional[int]]:
+        for truth in truths:
+            self.positives[truth.class_id] = self.positives.get(truth.class_id, 0) + 1
+        matches = match_frame(detections, truths, self.iou_threshold)
+        for detection, match in zip(detections, matches):
+            self.confidences.setdefault(detection.class_id, []).append(detection.confidence)
+            self.hits.setdefault(detection.class_id, []).append(match is not None)
+        return matches
+    
+    def summary(self) -> dict:
+        per_class = {
+            class_id: average_precision(
+                self.confidences.get(class_id, []), self.hits.get(class_id, []), positives
+            )
+            for class_id, positives in sorted(self.positives.items())
+        }
+        true_positives = sum(sum(hits) for hits in self.hits.values())
+        predictions = sum(len(hits) for hits in self.hits.values())
+        positives = sum(self.positives.values())
+        return {
+            "map": float(np.mean(list(per_class.values()))) if per_class else 0.0,
+            "recall": true_positives / positives if positives else 0.0,
+            "precision": true_positives / predictions if predictions else 0.0,
+            "ap_per_class": {str(class_id): round(ap, 4) for class_id, ap in per_class.items()}
+        }
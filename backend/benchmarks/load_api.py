@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Load test the API with concurrent uploads, status polls and dashboard reads
+
+Starts the service with uvicorn in a subprocess on this machine, against
+the local storage backend and the stub ONNX model from
+``benchmarks.synthetic``, then drives it for a fixed duration with:
+  
+  uploaders  POST /api/v1/process-video?force=true with a short synthetic clip
+             (forced, or every repeat would be answered from the dedup index)
+  pollers    GET /api/v1/processing-status/{job_id} for uploaded jobs
+  readers    GET /api/v1/damages/latest
+
+Reports throughput, p50/p95/p99 latency and error rate per endpoint, and
+the server's event loop lag over the run (from its /metrics lag histogram).
+
+Usage (from backend/):
+    python -m benchmarks.load_api --uploaders 2 --pollers 4 --readers 16 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+import httpx
+import numpy as np
+from app.utils.metrics import DEFAULT_BUCKETS, bucket_quantile
+from benchmarks.synthetic import build_stub_model, make_road_video
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAG_METRIC = "road_damage_event_loop_lag_seconds"
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.error_samples = {}
+    
+    def record(self, endpoint: str, seconds: float, error: str = None):
+        self.latencies[endpoint].append(seconds)
+        if error is not None:
+            self.errors[endpoint] += 1
+            self.error_samples.setdefault(endpoint, error)
+    
+    def report(self, duration: float) -> dict:
+        report = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            values = np.array(latencies) * 1000
+            report[endpoint] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / duration, 2),
+                "errors": self.errors[endpoint],
+                "error_rate": round(self.errors[endpoint] / len(values), 4),
+                "p50_ms": round(float(np.percentile(values, 50)), 2),
+                "p95_ms": round(float(np.percentile(values, 95)), 2),
+                "p99_ms": round(float(np.percentile(values, 99)), 2),
+                "max_ms": round(float(values.max()), 2)
+            }
+            if endpoint in self.error_samples:
+                report[endpoint]["first_error"] = self.error_samples[endpoint]
+        return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(work_dir: str, port: int, args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", ""),
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": os.path.join(work_dir, "data"),
+        "SPOOL_DIR": os.path.join(work_dir, "spool"),
+        "MODEL_PATH": os.path.join(work_dir, "stub.onnx"),
+        "PRELOAD_MODEL": "true",
+        "LOOP_LAG_INTERVAL_MS": str(args.lag_interval_ms)
+    })
+    log = open(os.path.join(work_dir, "server.log"), "w")
+    # Run from the work dir so uploads/ and any .env stay out of the checkout
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning", "--no-access-log",
+            "--workers", str(args.server_workers)
+        ],
+        cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Server exited during startup; see server.log")
+        try:
+            if (await client.get("/health/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError("Server did not become ready")
+
+
+def parse_lag(metrics_text: str) -> dict:
+    """Per-bucket lag counts and the running max from a /metrics body"""
+    cumulative = {}
+    max_lag = 0.0
+    for line in metrics_text.splitlines():
+        if line.startswith(f"{LAG_METRIC}_bucket"):
+            bound = line.split('le="')[1].split('"')[0]
+            cumulative[float("inf") if bound == "+Inf" else float(bound)] = float(line.rsplit(" ", 1)[1])
+        elif line.startswith(f"{LAG_METRIC.replace('_seconds', '_max_seconds')} "):
+            max_lag = float(line.rsplit(" ", 1)[1])
+    counts, previous = [], 0.0
+    for bound in sorted(cumulative):
+        counts.append(cumulative[bound] - previous)
+        previous = cumulative[bound]
+    return {"counts": counts, "max": max_lag}
+
+
+def lag_report(before: dict, after: dict) -> dict:
+    if not after["counts"]:
+        return {}
+    before_counts = before["counts"] or [0] * len(after["counts"])
+    delta = [now - then for now, then in zip(after["counts"], before_counts)]
+    return {
+        "samples": int(sum(delta)),
+        "p50_ms": round(bucket_quantile(DEFAULT_BUCKETS, delta, 0.50) * 1000, 2),
+        "p95_ms": round(bucket_quantile(DEFAULT_BUCKETS, delta, 0.95) * 1000, 2),
+        "p99_ms": round(bucket_quantile(DEFAULT_BUCKETS, delta, 0.99) * 1000, 2),
+        "max_since_start_ms": round(after["max"] * 1000, 2)
+    }
+
+
+async def timed(stats: EndpointStats, endpoint: str, request):
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as e:
+        stats.record(endpoint, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+        return None
+    error = None if response.status_code < 400 else f"HTTP {response.status_code}: {response.text[:200]}"
+    stats.record(endpoint, time.perf_counter() - start, error)
+    return response
+
+
+async def uploader(client, stats, video: bytes, job_ids: list, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        response = await timed(stats, "POST /process-video", client.post(
+            "/api/v1/process-video?force=true", files={"video": ("clip.mp4", video, "video/mp4")}
+        ))
+        if response is not None and response.status_code == 200:
+            job_ids.append(response.json()["job_id"])
+        await asyncio.sleep(think)
+
+
+async def poller(client, stats, job_ids: list, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        job_id = random.choice(job_ids)
+        await timed(stats, "GET /processing-status", client.get(f"/api/v1/processing-status/{job_id}"))
+        await asyncio.sleep(think)
+
+
+async def reader(client, stats, limit: int, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        await timed(stats, "GET /damages/latest", client.get(f"/api/v1/damages/latest?limit={limit}"))
+        await asyncio.sleep(think)
+
+
+async def drive(args, base_url: str, process: subprocess.Popen, video: bytes) -> dict:
+    limits = httpx.Limits(max_connections=args.uploaders + args.pollers + args.readers + 2)
+    timeout = httpx.Timeout(args.request_timeout)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        await wait_ready(client, process, args.startup_timeout)
+        
+        # One unmeasured job so pollers have an id and readers have rows
+        warmup = await client.post("/api/v1/process-video?force=true", files={"video": ("clip.mp4", video, "video/mp4")})
+        warmup.raise_for_status()
+        job_ids = [warmup.json()["job_id"]]
+        
+        lag_before = parse_lag((await client.get("/metrics")).text)
+        stats = EndpointStats()
+        stop = asyncio.Event()
+        think = args.think_ms / 1000
+        tasks = (
+            [uploader(client, stats, video, job_ids, stop, think) for _ in range(args.uploaders)]
+            + [poller(client, stats, job_ids, stop, think) for _ in range(args.pollers)]
+            + [reader(client, stats, args.limit, stop, think) for _ in range(args.readers)]
+        )
+        start = time.perf_counter()
+        running = [asyncio.create_task(task) for task in tasks]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        # Requests in flight finish; they count towards the run
+        await asyncio.gather(*running)
+        duration = time.perf_counter() - start
+        lag_after = parse_lag((await client.get("/metrics")).text)
+    
+    return {
+        "duration_seconds": round(duration, 2),
+        "jobs_uploaded": len(job_ids) - 1,
+        "endpoints": stats.report(duration),
+        "event_loop_lag": lag_report(lag_before, lag_after)
+    }
+
+
+def print_report(results: dict):
+    print(f"ran {results['duration_seconds']:.1f}s, {results['jobs_uploaded']} jobs uploaded\n")
+    print(f"{'endpoint':<24}{'req':>7}{'req/s':>9}{'err%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for endpoint, stats in results["endpoints"].items():
+        print(f"{endpoint:<24}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}"
+              f"{100 * stats['error_rate']:>7.1f}{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}"
+              f"{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+        if "first_error" in stats:
+            print(f"  first error: {stats['first_error']}")
+    lag = results["event_loop_lag"]
+    if lag:
+        print(f"\nserver event loop lag ({lag['samples']} samples): p50 {lag['p50_ms']:.1f} ms, "
+              f"p95 {lag['p95_ms']:.1f} ms, p99 {lag['p99_ms']:.1f} ms, "
+              f"max since start {lag['max_since_start_ms']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent API load test against a local server")
+    parser.add_argument("--uploaders", type=int, default=2, help="Concurrent video uploaders (default: 2)")
+    parser.add_argument("--pollers", type=int, default=4, help="Concurrent status pollers (default: 4)")
+    parser.add_argument("--readers", type=int, default=16, help="Concurrent /damages/latest readers (default: 16)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (default: 30)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a client's requests (default: 0)")
+    parser.add_argument("--limit", type=int, default=20, help="Rows per /damages/latest request (default: 20)")
+    parser.add_argument("--frames", type=int, default=60, help="Frames in the uploaded clip (default: 60)")
+    parser.add_argument("--width", type=int, default=640, help="Clip width (default: 640)")
+    parser.add_argument("--height", type=int, default=360, help="Clip height (default: 360)")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--lag-interval-ms", type=float, default=50.0, help="Server lag probe interval (default: 50)")
+    parser.add_argument("--request-timeout", type=float, default=300.0, help="Per-request timeout (default: 300)")
+    parser.add_argument("--startup-timeout", type=float, default=60.0, help="Seconds to wait for readiness")
+    parser.add_argument("--keep", action="store_true", help="Keep the work dir (server.log, local store)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+    
+    work_dir = tempfile.mkdtemp(prefix="api-load-")
+    video_path = os.path.join(work_dir, "clip.mp4")
+    make_road_video(video_path, args.frames, args.width, args.height)
+    build_stub_model(os.path.join(work_dir, "stub.onnx"))
+    with open(video_path, "rb") as f:
+        video = f.read()
+    
+    port = free_port()
+    process = start_server(work_dir, port, args)
+    try:
+        results = asyncio.run(drive(args, f"http://127.0.0.1:{port}", process, video))
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if args.keep:
+            print(f"work dir: {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    results["config"] = {
+        key: getattr(args, key)
+        for key in ("uploaders", "pollers", "readers", "think_ms", "limit", "frames", "width", "height", "server_workers")
+    }
+    print_report(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
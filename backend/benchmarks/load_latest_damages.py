@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Load test: /api/v1/damages/latest latency while detections are uploading
+
+Runs the FastAPI app in-process against a stand-in storage client whose
+calls block for a fixed simulated network latency. Read latency is measured
+with no uploads in flight and then with several concurrent upload streams.
+Pass --inline to run storage calls directly on the event loop (the previous
+behaviour) for comparison. The response cache is disabled unless --cache is
+given, so every read reaches storage.
+
+Usage (from backend/):
+    python -m benchmarks.load_latest_damages --uploaders 8 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+import httpx
+import numpy as np
+from app.main import app
+from app.api.resources import AppResources
+from app.config import settings
+from app.services.detection_types import BBox, FrameDetection
+from app.services.storage_backend import SupabaseStorageBackend
+from app.services.storage_service import DamageStorageService
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client, payload=None):
+        self.client = client
+        self.payload = payload
+    
+    def insert(self, payload):
+        return _Query(self.client, payload)
+    
+    def upsert(self, payload, **kwargs):
+        return _Query(self.client, payload)
+    
+    def select(self, *args, **kwargs):
+        return self
+    
+    def order(self, *args, **kwargs):
+        return self
+    
+    def limit(self, *args, **kwargs):
+        return self
+    
+    def execute(self):
+        time.sleep(self.client.latency)
+        if self.payload is not None:
+            return _Result([{"id": "bench"}])
+        row = {
+            "id": "bench",
+            "damage_type": "pothole",
+            "severity": "medium",
+            "latitude": 0.0,
+            "longitude": 0.0,
+            "confidence_score": 0.9,
+            "detected_at": datetime.utcnow().isoformat(),
+            "image_url": "http://example.invalid/bench.jpg",
+        }
+        return _Result([row] * 10)
+
+
+class _Bucket:
+    def __init__(self, client):
+        self.client = client
+    
+    def upload(self, *args, **kwargs):
+        time.sleep(self.client.latency)
+    
+    def get_public_url(self, filename):
+        return f"http://example.invalid/{filename}"
+
+
+class _Storage:
+    def __init__(self, client):
+        self.client = client
+    
+    def from_(self, bucket):
+        return _Bucket(self.client)
+
+
+class LatencyClient:
+    """Synchronous stand-in for the supabase client with fixed call latency"""
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000.0
+        self.storage = _Storage(self)
+    
+    def table(self, name):
+        return _Query(self)
+
+
+class LatencyClientService:
+    def __init__(self, latency_ms: float):
+        self.client = LatencyClient(latency_ms)
+    
+    def get_client(self):
+        return self.client
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def read_loop(client, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/api/v1/damages/latest", params={"limit": 10})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        # The in-process transport never suspends on socket I/O
+        await asyncio.sleep(0)
+
+
+async def upload_loop(service, stop: asyncio.Event, frame: np.ndarray, counter: list):
+    detection = FrameDetection(BBox(10, 10, 100, 100), 1, 0.9)
+    frame_number = 0
+    while not stop.is_set():
+        await service.store_detection(detection, frame, frame_number, "bench.mp4")
+        frame_number += 1
+        counter[0] += 1
+
+
+async def run_phase(service, uploaders: int, readers: int, duration: float, frame):
+    stop = asyncio.Event()
+    latencies = []
+    uploads = [0]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        tasks = [asyncio.create_task(read_loop(client, stop, latencies)) for _ in range(readers)]
+        tasks += [
+            asyncio.create_task(upload_loop(service, stop, frame, uploads))
+            for _ in range(uploaders)
+        ]
+        await asyncio.sleep(duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return latencies, uploads[0]
+
+
+def make_inline(service: DamageStorageService):
+    """Run storage calls directly on the event loop, as before the thread pools"""
+    async def run_inline(func, *args):
+        result = func(*args)
+        # Yield once so other tasks get scheduled between blocking calls
+        await asyncio.sleep(0)
+        return result
+    service._run_read = run_inline
+    service._run_write = run_inline
+    service._run_encode = run_inline
+
+
+async def main_async(args):
+    service = DamageStorageService(SupabaseStorageBackend(LatencyClientService(args.latency_ms)))
+    if args.inline:
+        make_inline(service)
+    # ASGITransport does not run the lifespan, so start the resources here
+    resources = AppResources.create(settings, storage_service=service)
+    await resources.start()
+    app.state.resources = resources
+    if not args.cache:
+        resources.damages_cache.ttl_seconds = 0
+    
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    
+    print(f"Simulated storage latency: {args.latency_ms} ms, "
+          f"mode: {'inline (blocking)' if args.inline else 'thread pools'}, "
+          f"cache: {'on' if args.cache else 'off'}")
+    for uploaders in (0, args.uploaders):
+        latencies, uploads = await run_phase(service, uploaders, args.readers, args.duration, frame)
+        print(
+            f"  uploaders={uploaders:3d}  reads={len(latencies):5d}  "
+            f"p50={statistics.median(latencies):7.1f} ms  "
+            f"p95={percentile(latencies, 95):7.1f} ms  "
+            f"max={max(latencies):7.1f} ms  uploads={uploads}"
+        )
+    if args.cache:
+        print(f"  cache: {resources.damages_cache.stats()}")
+    await resources.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /damages/latest latency under upload load")
+    parser.add_argument("--uploaders", type=int, default=8, help="Concurrent upload streams (default: 8)")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent readers (default: 4)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Simulated call latency (default: 50)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per phase (default: 5)")
+    parser.add_argument("--inline", action="store_true", help="Run storage calls on the event loop")
+    parser.add_argument("--cache", action="store_true", help="Keep the /damages/latest response cache on")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
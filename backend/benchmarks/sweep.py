@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+Accuracy-vs-speed sweep over pipeline settings
+
+Runs every combination of model variant (file, input size, quantization),
+frame stride, confidence threshold, IoU threshold and tracking window over
+a set of labelled clips, and reports per combination:
+
+- mAP@0.5, recall and precision of the per-frame detections,
+- unique defects found (labelled damage with at least one stored detection)
+  against detections stored, i.e. what the tracker lets through,
+- frames/s estimated from measured decode, inference and post-processing
+  time, and the storage writes (records plus images) the run would make.
+
+Only inference depends on the model, so each clip is run through each model
+once and its raw output is cached by clip hash and model version (see
+``app.services.raw_outputs``). Every other setting, frame stride included,
+is replayed from the cache, and cached outputs are reused by later sweeps.
+Frames/s counts decoding every frame even when striding, which slightly
+understates the gain because skipped frames are only grabbed.
+
+Clips are ``--clips DIR`` (videos with ``<name>.labels.json`` next to them,
+a list of ``{"frame", "class_id", "bbox": [x1, y1, x2, y2], "damage_id"}``),
+or synthetic clips from ``benchmarks.synthetic``. Without ``--model`` the
+stub detector is built at each ``--stub-sizes`` input size.
+
+Usage (from backend/):
+    python -m benchmarks.sweep --output sweep.json --plot pareto.svg
+    python -m benchmarks.sweep --clips clips/ --model yolo=models/road_damage_yolo.onnx --quantize \\
+        --confidence 0.3 0.5 0.7 --stride 1 2 4 --csv sweep.csv
+"""
+import argparse
+import csv
+import glob
+import itertools
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+
+from app.services.detection_tracker import DetectionTracker
+from app.services.detection_types import detections_from_array
+from app.services.onnx_service import ONNXModelService
+from app.services.raw_outputs import RawOutputs, RawOutputStore
+from app.services.video_processor import VideoProcessor
+from app.utils.hashing import file_sha256
+from app.utils.timing import StageTimer
+from benchmarks.evaluation import DetectionEvaluator
+from benchmarks.synthetic import GroundTruth, build_stub_model, make_road_video
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+IMAGES_PER_DETECTION = {"full": 1, "crop": 1, "thumbnail": 1, "both": 2}
+ACCURACY_METRICS = ("map", "recall", "defect_recall")
+
+
+class Clip(NamedTuple):
+    name: str
+    path: str
+    sha256: str
+    truths: Dict[int, List[GroundTruth]]
+
+
+class ModelVariant(NamedTuple):
+    name: str
+    path: str
+    version: str
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_labels(path: str) -> Dict[int, List[GroundTruth]]:
+    with open(path) as f:
+        rows = json.load(f)
+    truths: Dict[int, List[GroundTruth]] = {}
+    for row in rows:
+        x1, y1, x2, y2 = row["bbox"]
+        truths.setdefault(int(row["frame"]), []).append(GroundTruth(
+            int(row["frame"]), row.get("damage_id"), int(row["class_id"]), x1, y1, x2, y2
+        ))
+    return truths
+
+
+def write_labels(path: str, truths: List[GroundTruth]):
+    with open(path, "w") as f:
+        json.dump([
+            {
+                "frame": t.frame_number,
+                "damage_id": t.damage_id,
+                "class_id": t.class_id,
+                "bbox": [t.x1, t.y1, t.x2, t.y2]
+            }
+            for t in truths
+        ], f)
+
+
+def labelled_clips(clip_dir: str) -> List[Clip]:
+    clips = []
+    for path in sorted(glob.glob(os.path.join(clip_dir, "*"))):
+        stem, extension = os.path.splitext(path)
+        if extension.lower() not in VIDEO_EXTENSIONS:
+            continue
+        labels = f"{stem}.labels.json"
+        if not os.path.exists(labels):
+            logging.warning(f"Skipping {path}: no {os.path.basename(labels)}")
+            continue
+        clips.append(Clip(os.path.basename(path), path, file_sha256(path), load_labels(labels)))
+    return clips
+
+
+def synthetic_clips(args) -> List[Clip]:
+    """Render the synthetic clips once; they are deterministic, so later sweeps reuse them"""
+    clip_dir = os.path.join(args.cache_dir, "clips")
+    os.makedirs(clip_dir, exist_ok=True)
+    clips = []
+    for seed in range(args.synthetic):
+        name = f"synthetic-{seed}-{args.frames}f-{args.width}x{args.height}-{args.damages}d"
+        path = os.path.join(clip_dir, f"{name}.mp4")
+        labels = os.path.join(clip_dir, f"{name}.labels.json")
+        if not (os.path.exists(path) and os.path.exists(labels)):
+            truths = make_road_video(path, args.frames, args.width, args.height, damages=args.damages, seed=seed)
+            write_labels(labels, truths)
+        clips.append(Clip(name, path, file_sha256(path), load_labels(labels)))
+    return clips
+
+
+def quantized_variant(model: ModelVariant, model_dir: str) -> Optional[ModelVariant]:
+    """Dynamic int8 quantization of ``model`` with onnxruntime's quantizer"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    
+    path = os.path.join(model_dir, f"{model.name}-{model.version}-int8.onnx")
+    if not os.path.exists(path):
+        try:
+            quantize_dynamic(model.path, path, weight_type=QuantType.QUInt8)
+        except Exception as e:
+            logging.warning(f"Cannot quantize {model.path}: {e}")
+            return None
+    return ModelVariant(f"{model.name}-int8", path, file_sha256(path)[:16])
+
+
+def model_variants(args) -> List[ModelVariant]:
+    model_dir = os.path.join(args.cache_dir, "models")
+    os.makedirs(model_dir, exist_ok=True)
+    models = []
+    if args.model:
+        for spec in args.model:
+            name, _, path = spec.rpartition("=")
+            path = path or spec
+            models.append(ModelVariant(name or os.path.splitext(os.path.basename(path))[0], path, file_sha256(path)[:16]))
+    else:
+        for size in args.stub_sizes:
+            path = os.path.join(model_dir, f"stub-{size}.onnx")
+            build_stub_model(path, input_size=size, backbone_channels=args.backbone_channels)
+            models.append(ModelVariant(f"stub-{size}", path, file_sha256(path)[:16]))
+    if args.quantize:
+        quantized = [quantized_variant(model, model_dir) for model in models]
+        models += [variant for variant in quantized if variant is not None]
+    return models
+
+
+def cached_outputs(store: RawOutputStore, clip: Clip, model: ModelVariant, floor: float) -> Optional[RawOutputs]:
+    outputs = store.open(clip.sha256, model.version)
+    if outputs is None:
+        return None
+    if outputs.meta["min_confidence"] > floor or "infer_ms" not in outputs.meta["columns"]:
+        return None
+    return outputs
+
+
+def run_inference(store: RawOutputStore, clip: Clip, model: ModelVariant, floor: float) -> RawOutputs:
+    """Decode every frame of ``clip``, run ``model`` on it and cache the raw output with timings"""
+    service = ONNXModelService(model.path)
+    input_height, input_width = service.input_size()
+    processor = VideoProcessor(clip.path)
+    metadata = processor.validate_video()
+    writer = store.writer(
+        clip.sha256,
+        model.version,
+        {
+            "clip": clip.name,
+            "model": model.name,
+            "frame_width": metadata.width,
+            "frame_height": metadata.height,
+            "input_width": input_width,
+            "input_height": input_height
+        },
+        min_confidence=floor
+    )
+    frames = processor.extract_frames()
+    try:
+        while True:
+            start = time.perf_counter()
+            frame = next(frames, None)
+            decode_ms = (time.perf_counter() - start) * 1000
+            if frame is None:
+                break
+            timer = StageTimer()
+            raw_output = service.infer_raw(frame.image, timer)
+            writer.append(
+                frame.frame_number,
+                raw_output,
+                decode_ms=decode_ms,
+                infer_ms=timer.totals_ms["preprocess"] + timer.totals_ms["session_run"]
+            )
+    finally:
+        processor.close()
+    return writer.close()
+
+
+def replay(
+    outputs: RawOutputs,
+    clip: Clip,
+    evaluator: DetectionEvaluator,
+    stride: int,
+    confidence: float,
+    iou: float,
+    window: int
+) -> dict:
+    """Run filtering and tracking over cached outputs as ``process_video_task`` would"""
+    tracker = DetectionTracker(window_size=window, iou_threshold=iou)
+    scale, frame_size = outputs.scale, outputs.frame_size
+    infer_ms = outputs.column("infer_ms")
+    found, stored, repeats, unmatched, detections, processed = set(), 0, 0, 0, 0, 0
+    post_seconds = 0.0
+    
+    for index, (frame_number, rows) in enumerate(outputs):
+        if frame_number % stride:
+            continue
+        processed += 1
+        start = time.perf_counter()
+        frame_detections = detections_from_array(rows, confidence, scale, frame_size)
+        unique = []
+        for position, detection in enumerate(frame_detections):
+            if not tracker.is_duplicate(detection, frame_number):
+                tracker.add_detection(detection, frame_number)
+                unique.append(position)
+        tracker.cleanup_old_frames(frame_number)
+        post_seconds += time.perf_counter() - start
+        
+        truths = clip.truths.get(frame_number, [])
+        matches = evaluator.add_frame(frame_detections, truths)
+        detections += len(frame_detections)
+        stored += len(unique)
+        for position in unique:
+            match = matches[position]
+            if match is None or truths[match].damage_id is None:
+                unmatched += match is None
+                continue
+            damage_id = truths[match].damage_id
+            repeats += damage_id in found
+            found.add(damage_id)
+    
+    sampled = infer_ms[np.asarray(outputs.frame_numbers) % stride == 0]
+    return {
+        "frames": len(outputs),
+        "frames_processed": processed,
+        "detections": detections,
+        "stored": stored,
+        "stored_repeats": int(repeats),
+        "stored_unmatched": int(unmatched),
+        "defects_total": len({t.damage_id for ts in clip.truths.values() for t in ts if t.damage_id is not None}),
+        "defects_found": len(found),
+        "decode_ms": float(outputs.column("decode_ms").sum()),
+        "infer_ms": float(sampled.sum()),
+        "post_ms": post_seconds * 1000
+    }
+
+
+def run_config(clips, outputs, model, stride, confidence, iou, window, args) -> dict:
+    evaluator = DetectionEvaluator(iou_threshold=args.match_iou)
+    totals: Dict[str, float] = {}
+    for clip in clips:
+        counts = replay(outputs[(clip.sha256, model.version)], clip, evaluator, stride, confidence, iou, window)
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+    
+    accuracy = evaluator.summary()
+    seconds = (totals["decode_ms"] + totals["infer_ms"] + totals["post_ms"]) / 1000
+    return {
+        "model": model.name,
+        "model_version": model.version,
+        "input_size": outputs[(clips[0].sha256, model.version)].meta["input_width"],
+        "frame_stride": stride,
+        "confidence_threshold": confidence,
+        "iou_threshold": iou,
+        "tracking_window_size": window,
+        "map": round(accuracy["map"], 4),
+        "recall": round(accuracy["recall"], 4),
+        "precision": round(accuracy["precision"], 4),
+        "ap_per_class": accuracy["ap_per_class"],
+        "defects_total": int(totals["defects_total"]),
+        "defects_found": int(totals["defects_found"]),
+        "defect_recall": round(totals["defects_found"] / totals["defects_total"], 4) if totals["defects_total"] else 0.0,
+        "stored_detections": int(totals["stored"]),
+        "stored_repeats": int(totals["stored_repeats"]),
+        "stored_unmatched": int(totals["stored_unmatched"]),
+        "storage_writes": int(totals["stored"] * (1 + IMAGES_PER_DETECTION[args.image_output_mode])),
+        "frames": int(totals["frames"]),
+        "frames_processed": int(totals["frames_processed"]),
+        "fps_estimated": round(totals["frames"] / seconds, 2) if seconds else 0.0,
+        "ms_per_frame": {
+            "decode": round(totals["decode_ms"] / totals["frames"], 3),
+            "inference": round(totals["infer_ms"] / max(totals["frames_processed"], 1), 3),
+            "post": round(totals["post_ms"] / max(totals["frames_processed"], 1), 3)
+        }
+    }
+
+
+def mark_pareto(results: List[dict], metric: str):
+    """Flag results no other result beats on both ``metric`` and frames/s"""
+    for result in results:
+        result["pareto"] = not any(
+            other[metric] >= result[metric] and other["fps_estimated"] >= result["fps_estimated"]
+            and (other[metric] > result[metric] or other["fps_estimated"] > result["fps_estimated"])
+            for other in results
+        )
+
+
+def config_label(result: dict) -> str:
+    return (f"{result['model']} s{result['frame_stride']} c{result['confidence_threshold']} "
+            f"i{result['iou_threshold']} w{result['tracking_window_size']}")
+
+
+def write_pareto_svg(results: List[dict], metric: str, path: str):
+    """Scatter of ``metric`` against frames/s with the frontier drawn; plain SVG, no plotting library"""
+    width, height, margin = 760, 480, 60
+    fps = [r["fps_estimated"] for r in results]
+    low, high = min(fps), max(fps)
+    high = high if high > low else low + 1
+    # Accuracy from zero up to just above the best result
+    top = min(1.0, max(r[metric] for r in results) * 1.1) or 1.0
+    
+    def x(value):
+        return margin + (value - low) / (high - low) * (width - 2 * margin)
+    
+    def y(value):
+        return height - margin - value / top * (height - 2 * margin)
+    
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="white"/>',
+        f'<line x1="{margin}" y1="{height - margin}" x2="{width - margin}" y2="{height - margin}" stroke="black"/>',
+        f'<line x1="{margin}" y1="{margin}" x2="{margin}" y2="{height - margin}" stroke="black"/>',
+        f'<text x="{width / 2}" y="{height - 20}" text-anchor="middle">frames/s (estimated)</text>',
+        f'<text x="18" y="{height / 2}" text-anchor="middle" transform="rotate(-90 18 {height / 2})">{metric}</text>'
+    ]
+    for step in range(6):
+        value = low + (high - low) * step / 5
+        parts.append(f'<text x="{x(value):.1f}" y="{height - margin + 16}" text-anchor="middle">{value:.0f}</text>')
+        parts.append(f'<text x="{margin - 8}" y="{y(top * step / 5) + 4:.1f}" text-anchor="end">{top * step / 5:.2f}</text>')
+    for result in results:
+        if not result["pareto"]:
+            parts.append(f'<circle cx="{x(result["fps_estimated"]):.1f}" cy="{y(result[metric]):.1f}" r="3" fill="#bbb"/>')
+    
+    frontier = sorted((r for r in results if r["pareto"]), key=lambda r: r["fps_estimated"])
+    points = " ".join(f'{x(r["fps_estimated"]):.1f},{y(r[metric]):.1f}' for r in frontier)
+    parts.append(f'<polyline points="{points}" fill="none" stroke="#c0392b" stroke-width="1.5"/>')
+    for result in frontier:
+        cx, cy = x(result["fps_estimated"]), y(result[metric])
+        parts.append(f'<circle cx="{cx:.1f}" cy="{cy:.1f}" r="4" fill="#c0392b"/>')
+        parts.append(f'<text x="{cx + 6:.1f}" y="{cy - 6:.1f}">{config_label(result)}</text>')
+    parts.append("</svg>")
+    with open(path, "w") as f:
+        f.write("\n".join(parts) + "\n")
+
+
+def write_csv(results: List[dict], path: str):
+    columns = [key for key, value in results[0].items() if not isinstance(value, dict)]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def print_frontier(results: List[dict], metric: str):
+    frontier = sorted((r for r in results if r["pareto"]), key=lambda r: -r["fps_estimated"])
+    print(f"\nPareto frontier ({metric} vs frames/s), {len(frontier)} of {len(results)} configurations:")
+    print(f"{'configuration':<34}{'fps':>8}{'mAP':>8}{'recall':>8}{'defects':>10}{'stored':>8}{'writes':>8}")
+    for r in frontier:
+        print(f"{config_label(r):<34}{r['fps_estimated']:>8.1f}{r['map']:>8.3f}{r['recall']:>8.3f}"
+              f"{r['defects_found']:>5}/{r['defects_total']:<4}{r['stored_detections']:>8}{r['storage_writes']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy-vs-speed sweep over pipeline settings")
+    parser.add_argument("--clips", help="Directory of videos with <name>.labels.json (default: synthetic clips)")
+    parser.add_argument("--synthetic", type=int, default=3, help="Synthetic clips to render without --clips (default: 3)")
+    parser.add_argument("--frames", type=int, default=150, help="Frames per synthetic clip (default: 150)")
+    parser.add_argument("--width", type=int, default=1280, help="Synthetic frame width (default: 1280)")
+    parser.add_argument("--height", type=int, default=720, help="Synthetic frame height (default: 720)")
+    parser.add_argument("--damages", type=int, default=10, help="Damage instances per synthetic clip (default: 10)")
+    parser.add_argument("--model", action="append", metavar="NAME=PATH",
+                        help="ONNX model to sweep; repeat for several (default: stub models)")
+    parser.add_argument("--stub-sizes", type=int, nargs="+", default=[320, 480, 640],
+                        help="Input sizes of the stub models (default: 320 480 640)")
+    parser.add_argument("--backbone-channels", type=int, default=16, help="Stub model conv width (default: 16)")
+    parser.add_argument("--quantize", action="store_true", help="Also sweep a dynamic int8 variant of each model")
+    parser.add_argument("--stride", type=int, nargs="+", default=[1, 2, 3], help="Frame strides (default: 1 2 3)")
+    parser.add_argument("--confidence", type=float, nargs="+", default=[0.3, 0.5, 0.7],
+                        help="Confidence thresholds (default: 0.3 0.5 0.7)")
+    parser.add_argument("--iou", type=float, nargs="+", default=[0.3, 0.5],
+                        help="Tracker IoU thresholds (default: 0.3 0.5)")
+    parser.add_argument("--window", type=int, nargs="+", default=[10, 30],
+                        help="Tracking window sizes in frames (default: 10 30)")
+    parser.add_argument("--match-iou", type=float, default=0.5, help="IoU for a detection to match a label (default: 0.5)")
+    parser.add_argument("--metric", choices=ACCURACY_METRICS, default="map",
+                        help="Accuracy axis of the Pareto frontier (default: map)")
+    parser.add_argument("--image-output-mode", choices=sorted(IMAGES_PER_DETECTION), default="crop",
+                        help="Image mode used to count storage writes (default: crop)")
+    parser.add_argument("--cache-dir", default="./sweep_cache",
+                        help="Raw model outputs, rendered clips and quantized models (default: ./sweep_cache)")
+    parser.add_argument("--output", help="Write all results to this JSON file")
+    parser.add_argument("--csv", help="Write all results to this CSV file")
+    parser.add_argument("--plot", help="Write the Pareto plot to this SVG file")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING)
+    clips = labelled_clips(args.clips) if args.clips else synthetic_clips(args)
+    if not clips:
+        parser.error("no labelled clips found")
+    models = model_variants(args)
+    
+    # Cache everything above the lowest threshold swept, so one inference
+    # pass serves every threshold
+    floor = min(args.confidence)
+    store = RawOutputStore(os.path.join(args.cache_dir, "raw"))
+    outputs = {}
+    inference_start = time.perf_counter()
+    reused = 0
+    for clip, model in itertools.product(clips, models):
+        cached = cached_outputs(store, clip, model, floor)
+        reused += cached is not None
+        outputs[(clip.sha256, model.version)] = cached or run_inference(store, clip, model, floor)
+    inference_seconds = time.perf_counter() - inference_start
+    print(f"{len(clips)} clips x {len(models)} models: {reused} raw outputs reused from cache, "
+          f"{len(outputs) - reused} computed in {inference_seconds:.1f}s")
+    
+    replay_start = time.perf_counter()
+    results = [
+        run_config(clips, outputs, model, stride, confidence, iou, window, args)
+        for model, stride, confidence, iou, window in itertools.product(
+            models, args.stride, args.confidence, args.iou, args.window
+        )
+    ]
+    print(f"{len(results)} configurations replayed in {time.perf_counter() - replay_start:.1f}s")
+    mark_pareto(results, args.metric)
+    print_frontier(results, args.metric)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "benchmark": "sweep",
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "environment": {
+                    "python": sys.version.split()[0],
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count()
+                },
+                "clips": [{"name": clip.name, "sha256": clip.sha256} for clip in clips],
+                "models": [model._asdict() for model in models],
+                "metric": args.metric,
+                "match_iou": args.match_iou,
+                "results": results
+            }, f, indent=2)
+        print(f"\nwrote {args.output}")
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"wrote {args.csv}")
+    if args.plot:
+        write_pareto_svg(results, args.metric, args.plot)
+        print(f"wrote {args.plot}")
+
+
+if __name__ == "__main__":
+    main()
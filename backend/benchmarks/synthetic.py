@@ -0,0 +1,256 @@
+"""
+Synthetic inputs for offline pipeline benchmarks
+
+``make_road_video`` renders a road seen from a forward-moving camera:
+textured asphalt, dashed lane markings and damage (cracks, potholes,
+patches, manholes) scrolling towards the camera, and returns the ground
+truth boxes per frame.
+
+``build_stub_model`` writes a small ONNX model with the I/O contract of
+``road_damage_yolo.onnx``: ``images`` ``[1, 3, 640, 640]`` float RGB in
+0-1, ``output0`` ``[1, N, 6]`` rows of ``[x1, y1, x2, y2, class_id,
+confidence]`` in input pixels; with ``dynamic_batch`` the leading dimension
+is free. It splits the input into a grid and scores
+each cell by how much of it has the colour of each damage class, so its
+detections follow the rendered damage. An optional conv backbone adds
+realistic compute.
+"""
+from typing import List, NamedTuple, Tuple
+import cv2
+import numpy as np
+
+ROAD_BGR = (110, 110, 110)
+MARKING_BGR = (235, 235, 235)
+
+# Indexed by class id, as in storage_service.DAMAGE_TYPE_MAPPING. Each
+# class differs from the road in its own colour direction, which is what the
+# stub model keys on.
+DAMAGE_BGR = (
+    (50, 50, 50),     # crack
+    (30, 60, 110),    # pothole
+    (110, 60, 30),    # patch
+    (150, 150, 40),   # manhole
+)
+
+
+class GroundTruth(NamedTuple):
+    frame_number: int
+    damage_id: int
+    class_id: int
+    x1: int
+    y1: int
+    x2: int
+    y2: int
+
+
+def _damage_layout(count: int, width: int, height: int, frames: int, rng: np.random.Generator) -> List[dict]:
+    damages = []
+    for damage_id in range(count):
+        class_id = int(rng.integers(0, len(DAMAGE_BGR)))
+        w = int(rng.uniform(0.04, 0.12) * width)
+        h = int(rng.uniform(0.04, 0.10) * height) if class_id != 0 else int(rng.uniform(0.02, 0.04) * height)
+        speed = float(rng.uniform(0.6, 1.4)) * height / max(frames, 1)
+        damages.append({
+            "id": damage_id,
+            "class_id": class_id,
+            "x": int(rng.uniform(0.1, 0.9 - w / width) * width),
+            # Spread entry times over the clip; some start in view
+            "y0": float(rng.uniform(-1.5, 0.8) * height),
+            "w": w,
+            "h": h,
+            "speed": speed,
+            "seed": int(rng.integers(0, 2 ** 31))
+        })
+    return damages
+
+
+def _draw_damage(frame: np.ndarray, damage: dict, x1: int, y1: int, x2: int, y2: int):
+    color = DAMAGE_BGR[damage["class_id"]]
+    class_id = damage["class_id"]
+    if class_id == 0:
+        # Jagged crack across the box
+        rng = np.random.default_rng(damage["seed"])
+        xs = np.linspace(x1, x2, 8)
+        ys = rng.uniform(y1, y2, size=8)
+        points = np.stack([xs, ys], axis=1).astype(np.int32)
+        cv2.polylines(frame, [points], False, color, thickness=max(3, (y2 - y1) // 3))
+    elif class_id == 1:
+        cv2.ellipse(frame, ((x1 + x2) // 2, (y1 + y2) // 2), ((x2 - x1) // 2, (y2 - y1) // 2), 0, 0, 360, color, -1)
+    elif class_id == 2:
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, -1)
+    else:
+        radius = min(x2 - x1, y2 - y1) // 2
+        cv2.circle(frame, ((x1 + x2) // 2, (y1 + y2) // 2), radius, color, -1)
+
+
+def render_frames(
+    frames: int = 120,
+    width: int = 1280,
+    height: int = 720,
+    damages: int = 8,
+    seed: int = 0
+):
+    """Yield ``(frame, ground_truth)`` for each frame of the synthetic clip"""
+    rng = np.random.default_rng(seed)
+    layout = _damage_layout(damages, width, height, frames, rng)
+    texture = rng.normal(0, 8, size=(height, width, 1))
+    road = np.clip(np.array(ROAD_BGR, dtype=np.float32) + texture, 0, 255).astype(np.uint8)
+    # Stacked twice so scrolling is a slice that wraps seamlessly
+    road = np.concatenate([road, road])
+    dash = height // 6
+    scroll = max(1, height // 90)
+    
+    for frame_number in range(frames):
+        offset = (frame_number * scroll) % height
+        frame = road[height - offset:2 * height - offset].copy()
+        
+        # Dashed centre line moving with the road
+        for y in range(-dash * 2 + (frame_number * scroll) % (dash * 2), height, dash * 2):
+            cv2.rectangle(frame, (width // 2 - 6, y), (width // 2 + 6, y + dash), MARKING_BGR, -1)
+        
+        truth = []
+        for damage in layout:
+            y1 = int(damage["y0"] + damage["speed"] * frame_number)
+            x1, x2, y2 = damage["x"], damage["x"] + damage["w"], y1 + damage["h"]
+            if y2 <= 0 or y1 >= height:
+                continue
+            _draw_damage(frame, damage, x1, y1, x2, y2)
+            truth.append(GroundTruth(
+                frame_number, damage["id"], damage["class_id"],
+                x1, max(y1, 0), x2, min(y2, height)
+            ))
+        yield frame, truth
+
+
+def make_road_video(
+    path: str,
+    frames: int = 120,
+    width: int = 1280,
+    height: int = 720,
+    fps: float = 30.0,
+    damages: int = 8,
+    seed: int = 0
+) -> List[GroundTruth]:
+    """Write the synthetic clip to ``path`` (mp4v) and return its ground truth"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"OpenCV cannot write {path}")
+    truth = []
+    try:
+        for frame, frame_truth in render_frames(frames, width, height, damages, seed):
+            writer.write(frame)
+            truth.extend(frame_truth)
+    finally:
+        writer.release()
+    return truth
+
+
+def _cell_boxes(input_size: int, grid: int) -> np.ndarray:
+    cell = input_size / grid
+    boxes = [
+        (col * cell, row * cell, (col + 1) * cell, (row + 1) * cell)
+        for row in range(grid) for col in range(grid)
+    ]
+    return np.array(boxes, dtype=np.float32)[None]
+
+
+def build_stub_model(
+    path: str,
+    input_size: int = 640,
+    grid: int = 16,
+    backbone_channels: int = 16,
+    opset: int = 13,
+    dynamic_batch: bool = False
+) -> Tuple[Tuple, Tuple]:
+    """Write the stub detector to ``path``; returns its input and output shapes"""
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+    
+    cells = grid * grid
+    stride = input_size // grid
+    road = np.array(ROAD_BGR[::-1], dtype=np.float32) / 255
+    # 1x1 conv projecting each cell's mean colour onto every class direction,
+    # scaled so a cell fully covered by that class scores 1
+    directions = np.array([color[::-1] for color in DAMAGE_BGR], dtype=np.float32) / 255 - road
+    weights = directions / (directions ** 2).sum(axis=1, keepdims=True)
+    bias = -(weights * road).sum(axis=1)
+    
+    initializers = [
+        numpy_helper.from_array(weights.reshape(len(DAMAGE_BGR), 3, 1, 1), "class_w"),
+        numpy_helper.from_array(bias.astype(np.float32), "class_b"),
+        numpy_helper.from_array(_cell_boxes(input_size, grid), "cell_boxes"),
+        numpy_helper.from_array(np.array([-1 if dynamic_batch else 1, cells, 1], dtype=np.int64), "column_shape"),
+        numpy_helper.from_array(np.array(10.0, dtype=np.float32), "sharpness"),
+        numpy_helper.from_array(np.array(0.25, dtype=np.float32), "coverage_threshold")
+    ]
+    nodes = [
+        helper.make_node("AveragePool", ["images"], ["cell_means"], kernel_shape=[stride, stride], strides=[stride, stride]),
+        helper.make_node("Conv", ["cell_means", "class_w", "class_b"], ["class_scores"]),
+        helper.make_node("ArgMax", ["class_scores"], ["class_index"], axis=1, keepdims=1),
+        helper.make_node("Cast", ["class_index"], ["class_float"], to=TensorProto.FLOAT),
+        helper.make_node("Reshape", ["class_float", "column_shape"], ["class_column"]),
+        helper.make_node("ReduceMax", ["class_scores"], ["coverage"], axes=[1], keepdims=1),
+        helper.make_node("Sub", ["coverage", "coverage_threshold"], ["coverage_margin"]),
+        helper.make_node("Mul", ["coverage_margin", "sharpness"], ["logits"])
+    ]
+    
+    logits = "logits"
+    if backbone_channels:
+        # Compute that does not change the answer: a strided conv stack whose
+        # pooled activation is added with weight zero
+        rng = np.random.default_rng(0)
+        channels_in, layer_input = 3, "images"
+        for layer, channels_out in enumerate((backbone_channels, backbone_channels * 2, backbone_channels * 4)):
+            weight = rng.normal(0, 0.1, size=(channels_out, channels_in, 3, 3)).astype(np.float32)
+            initializers.append(numpy_helper.from_array(weight, f"backbone_w{layer}"))
+            nodes.append(helper.make_node(
+                "Conv", [layer_input, f"backbone_w{layer}"], [f"backbone_c{layer}"],
+                kernel_shape=[3, 3], strides=[2, 2], pads=[1, 1, 1, 1]
+            ))
+            nodes.append(helper.make_node("Relu", [f"backbone_c{layer}"], [f"backbone_r{layer}"]))
+            channels_in, layer_input = channels_out, f"backbone_r{layer}"
+        initializers.append(numpy_helper.from_array(np.array(0.0, dtype=np.float32), "backbone_weight"))
+        nodes += [
+            helper.make_node("ReduceMean", [layer_input], ["backbone_pooled"], axes=[1, 2, 3], keepdims=1),
+            helper.make_node("Mul", ["backbone_pooled", "backbone_weight"], ["backbone_term"]),
+            helper.make_node("Add", ["logits", "backbone_term"], ["logits_total"])
+        ]
+        logits = "logits_total"
+    
+    boxes = "cell_boxes"
+    if dynamic_batch:
+        # The same cell boxes for every image of the batch
+        initializers += [
+            numpy_helper.from_array(np.array([0], dtype=np.int64), "batch_start"),
+            numpy_helper.from_array(np.array([1], dtype=np.int64), "batch_end"),
+            numpy_helper.from_array(np.array([cells, 4], dtype=np.int64), "box_dims")
+        ]
+        nodes += [
+            helper.make_node("Shape", ["images"], ["image_shape"]),
+            helper.make_node("Slice", ["image_shape", "batch_start", "batch_end"], ["batch_dim"]),
+            helper.make_node("Concat", ["batch_dim", "box_dims"], ["boxes_shape"], axis=0),
+            helper.make_node("Expand", ["cell_boxes", "boxes_shape"], ["batch_boxes"])
+        ]
+        boxes = "batch_boxes"
+    
+    nodes += [
+        helper.make_node("Sigmoid", [logits], ["confidence"]),
+        helper.make_node("Reshape", ["confidence", "column_shape"], ["confidence_column"]),
+        helper.make_node("Concat", [boxes, "class_column", "confidence_column"], ["output0"], axis=2)
+    ]
+    
+    batch = "batch" if dynamic_batch else 1
+    input_shape = (batch, 3, input_size, input_size)
+    output_shape = (batch, cells, 6)
+    graph = helper.make_graph(
+        nodes,
+        "road_damage_stub",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, list(input_shape))],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, list(output_shape))],
+        initializers
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", opset)])
+    model.ir_version = 8
+    onnx.checker.check_model(model)
+    onnx.save(model, path)
+    return input_shape, output_shape
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Export road damage records as NDJSON, CSV, GeoJSON, Parquet or Arrow
+
+Reads the configured storage backend one keyset page at a time and writes
+each page as it is encoded, so memory stays flat however many rows match.
+Filters are the same as GET /api/v1/damages.
+
+Usage:
+    python export_damages.py --format csv --output damages.csv
+    python export_damages.py --format geojson --damage-type pothole --since 2025-01-01
+    STORAGE_BACKEND=local python export_damages.py --format parquet -o damages.parquet
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from app.config import settings
+from app.services.damage_query import ROAD_DAMAGE_COLUMNS, DamageQuery, parse_fields
+from app.services.export import EXPORT_FORMATS, create_exporter, iter_pages
+from app.services.storage_backend import create_storage_backend
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export road damage records")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="Output format (default: ndjson)")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--fields", help="Comma-separated columns (default: all)")
+    parser.add_argument("--damage-type", action="append", default=[], help="Repeatable")
+    parser.add_argument("--severity", action="append", default=[], help="Repeatable")
+    parser.add_argument("--min-confidence", type=float)
+    parser.add_argument("--max-confidence", type=float)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO-8601 timestamp")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="ISO-8601 timestamp")
+    parser.add_argument("--state")
+    parser.add_argument("--district")
+    parser.add_argument("--road-name")
+    parser.add_argument(
+        "--bbox",
+        type=lambda value: tuple(float(v) for v in value.split(",")),
+        help="min_lat,min_lon,max_lat,max_lon"
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=settings.export_page_size,
+        help=f"Rows read per storage query (default: {settings.export_page_size})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.bbox is not None and len(args.bbox) != 4:
+        print("❌ --bbox needs four values: min_lat,min_lon,max_lat,max_lon", file=sys.stderr)
+        sys.exit(2)
+    
+    try:
+        query = DamageQuery(
+            damage_types=tuple(args.damage_type),
+            severities=tuple(args.severity),
+            min_confidence=args.min_confidence,
+            max_confidence=args.max_confidence,
+            detected_after=args.since,
+            detected_before=args.until,
+            state=args.state,
+            district=args.district,
+            road_name=args.road_name,
+            bbox=args.bbox,
+            fields=parse_fields(args.fields) if args.fields else ROAD_DAMAGE_COLUMNS,
+            limit=args.page_size
+        )
+        exporter = create_exporter(args.format, query.fields)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(2)
+    
+    backend = create_storage_backend(settings)
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    start = time.perf_counter()
+    exported = 0
+    try:
+        output.write(exporter.header())
+        for rows in iter_pages(backend, query):
+            output.write(exporter.encode_page(rows))
+            exported += len(rows)
+        output.write(exporter.footer())
+    except Exception as e:
+        print(f"❌ Export failed after {exported} records: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if args.output:
+            output.close()
+        backend.close()
+    
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ Exported {exported} records as {args.format} in {elapsed:.2f}s "
+        f"({exported / elapsed if elapsed else 0:.0f} rows/s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
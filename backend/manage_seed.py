@@ -14,10 +14,11 @@ def print_menu():
     print("\n1. Quick seed (20 records, placeholder images)")
     print("2. Realistic seed (20 records, generated images)")
     print("3. Custom seed (specify count)")
-    print("4. View seed statistics")
-    print("5. Clear all seed data")
-    print("6. Test database connection")
-    print("7. Exit")
+    print("4. Bulk seed for load testing (resumable)")
+    print("5. View seed statistics")
+    print("6. Clear all seed data")
+    print("7. Test database connection")
+    print("8. Exit")
     print()
 
 
@@ -61,8 +62,10 @@ def custom_seed():
     
     try:
         count_int = int(count)
-        if count_int < 1 or count_int > 1000:
-            print("❌ Count must be between 1 and 1000")
+        # Placeholder seeding inserts everything in one request
+        max_count = 1000 if choice == "1" else None
+        if count_int < 1 or (max_count and count_int > max_count):
+            print("❌ Count must be between 1 and 1000 (use option 2 or bulk seed for more)")
             return False
     except ValueError:
         print("❌ Invalid number")
@@ -80,6 +83,28 @@ def custom_seed():
         return run_command(f"python seed_with_images.py --count {count} {clear_flag}")
 
 
+def bulk_seed():
+    """Bulk seed with generated images, resuming an interrupted run"""
+    count = input("Enter number of records (default 100000): ").strip() or "100000"
+    seed = input("Random seed (default 0): ").strip() or "0"
+    try:
+        if int(count) < 1:
+            raise ValueError
+        int(seed)
+    except ValueError:
+        print("❌ Invalid number")
+        return False
+    
+    resume = input("Resume an interrupted run? (y/n): ").strip().lower()
+    resume_flag = "--resume" if resume == "y" else ""
+    
+    print(f"\n🏗️  Bulk seeding {count} records...")
+    return run_command(
+        f"python seed_with_images.py --count {count} --seed {seed} "
+        f"--upload-concurrency 16 --insert-concurrency 4 {resume_flag}"
+    )
+
+
 def view_stats():
     """View seed statistics"""
     print("\n📊 Viewing seed statistics...")
@@ -109,7 +134,7 @@ def main():
     """Main entry point"""
     while True:
         print_menu()
-        choice = input("Select option (1-7): ").strip()
+        choice = input("Select option (1-8): ").strip()
         
         if choice == "1":
             success = quick_seed()
@@ -118,16 +143,18 @@ def main():
         elif choice == "3":
             success = custom_seed()
         elif choice == "4":
-            success = view_stats()
+            success = bulk_seed()
         elif choice == "5":
-            success = clear_seed()
+            success = view_stats()
         elif choice == "6":
-            success = test_connection()
+            success = clear_seed()
         elif choice == "7":
+            success = test_connection()
+        elif choice == "8":
             print("\n👋 Goodbye!")
             sys.exit(0)
         else:
-            print("❌ Invalid choice. Please select 1-7.")
+            print("❌ Invalid choice. Please select 1-8.")
             continue
         
         if success:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rebuild the statistics rollups from every road_damage row
+
+Rollups are normally kept current by triggers as detections are stored; run
+this after bulk loads that bypassed them or to repair drift. With the
+Supabase backend, SUPABASE_KEY must be the service-role key.
+
+Usage:
+    python rebuild_stats.py
+    STORAGE_BACKEND=local python rebuild_stats.py
+"""
+import sys
+import time
+from app.config import settings
+from app.services.rollups import summarize_rollups
+from app.services.storage_backend import create_storage_backend
+
+
+def main():
+    backend = create_storage_backend(settings)
+    
+    print(f"Rebuilding statistics rollups ({settings.storage_backend} backend)...")
+    start = time.perf_counter()
+    try:
+        backend.rebuild_rollups()
+        statistics = summarize_rollups(backend.select_rollups())
+    except Exception as e:
+        print(f"❌ Rebuild failed: {e}")
+        sys.exit(1)
+    finally:
+        backend.close()
+    
+    elapsed = time.perf_counter() - start
+    print(f"✅ Rebuilt rollups for {statistics['total']} records in {elapsed:.2f}s")
+    for dimension in ("by_damage_type", "by_severity", "by_road_category"):
+        print(f"   {dimension}: {statistics[dimension]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import sys
 from datetime import datetime, timedelta
 import random
 from dotenv import load_dotenv
-from supabase import create_client
+from app.services.supabase_client import get_shared_client
 
 # Load environment variables
 load_dotenv()
@@ -111,8 +111,8 @@ def seed_database(count: int = 20, clear_existing: bool = False):
     print(f"Connecting to Supabase: {supabase_url}")
     
     try:
-        # Create Supabase client
-        supabase = create_client(supabase_url, supabase_key)
+        # Shared client: uploads and inserts reuse pooled connections
+        supabase = get_shared_client(supabase_url, supabase_key)
         
         # Clear existing seed data if requested
         if clear_existing:
@@ -183,7 +183,7 @@ def clear_seed_data():
         sys.exit(1)
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         
         print("🗑️  Clearing all seed data...")
         result = supabase.table('road_damage').delete().eq('metadata->>seed_data', 'true').execute()
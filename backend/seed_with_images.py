@@ -1,20 +1,47 @@
 #!/usr/bin/env python3
 """
-Advanced seed script that generates actual images and uploads them to Supabase storage
+Advanced seed script that generates actual images and uploads them to storage
+
+Scales from a handful of records for the frontend to millions for load
+testing the map and query APIs:
+
+- Images are generated with array operations and uploaded on a pool of
+  --upload-concurrency threads. Large seeds reuse a pool of --image-pool
+  images instead of uploading one per record.
+- Records are generated a chunk at a time from --seed, so the same seed and
+  --base-time always produce the same rows and ids. Chunks of --chunk-size
+  are inserted by --insert-concurrency threads.
+- Progress is saved to --progress-file after every chunk. --resume continues
+  an interrupted run. Ids are deterministic and inserts skip existing ids,
+  so re-inserting a chunk is harmless.
+
+Works against Supabase or the local SQLite/filesystem backend
+(--backend local, or STORAGE_BACKEND=local).
+
+Usage:
+    python seed_with_images.py --count 20
+    python seed_with_images.py --count 2000000 --upload-concurrency 16 --insert-concurrency 4
+    python seed_with_images.py --count 2000000 --resume
 """
 import os
 import sys
-from datetime import datetime, timedelta
-import random
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from supabase import create_client
 import numpy as np
 import cv2
-from io import BytesIO
 
-# Load environment variables
+# Load environment variables before the settings are read
 load_dotenv()
 
+from app.config import settings
+from app.services.storage_backend import STORAGE_BACKENDS, StorageBackend, create_storage_backend
+
 # Sample damage data
 DAMAGE_TYPES = ["crack", "pothole", "patch", "manhole"]
 SEVERITIES = ["low", "medium", "high"]
@@ -33,56 +60,44 @@ SAMPLE_LOCATIONS = [
     {"lat": 42.3601, "lng": -71.0589, "name": "Boston"},
 ]
 
+# Record ids are uuid5(SEED_NAMESPACE, "<seed>:<index>")
+SEED_NAMESPACE = uuid.UUID("6f0b6a52-3c1e-4e8a-9a43-2f8f5d2c7b10")
 
-def generate_sample_image(damage_type: str, index: int) -> bytes:
-    """Generate a sample image with damage type label"""
-    # Create a 640x480 image
+# Color schemes for different damage types (BGR)
+IMAGE_COLORS = {
+    "crack": (107, 107, 255),      # Red-ish
+    "pothole": (196, 205, 78),     # Teal-ish
+    "patch": (211, 225, 149),      # Light green
+    "manhole": (129, 129, 243)     # Pink-ish
+}
+
+
+def generate_sample_image(damage_type: str, index: int, rng: Optional[np.random.Generator] = None) -> bytes:
+    """Generate a 640x480 sample JPEG with a damage type label"""
+    rng = rng or np.random.default_rng()
     width, height = 640, 480
+    bg_color = np.array(IMAGE_COLORS.get(damage_type, (200, 200, 200)), dtype=np.float32)
     
-    # Color schemes for different damage types
-    colors = {
-        "crack": (107, 107, 255),      # Red-ish
-        "pothole": (196, 205, 78),     # Teal-ish
-        "patch": (211, 225, 149),      # Light green
-        "manhole": (129, 129, 243)     # Pink-ish
-    }
-    
-    bg_color = colors.get(damage_type, (200, 200, 200))
-    
-    # Create image with gradient background
-    img = np.zeros((height, width, 3), dtype=np.uint8)
-    for y in range(height):
-        factor = y / height
-        color = tuple(int(c * (0.7 + 0.3 * factor)) for c in bg_color)
-        img[y, :] = color
+    # Vertical gradient: one row of factors broadcast across width and channels
+    factor = 0.7 + 0.3 * np.arange(height, dtype=np.float32) / height
+    gradient = (factor[:, None, None] * bg_color).astype(np.int16)
     
     # Add some noise for texture
-    noise = np.random.randint(-20, 20, (height, width, 3), dtype=np.int16)
-    img = np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    noise = rng.integers(-20, 20, (height, width, 3), dtype=np.int16)
+    img = np.clip(gradient + noise, 0, 255).astype(np.uint8)
     
     # Draw a bounding box to simulate detection
-    bbox_x1 = random.randint(100, 200)
-    bbox_y1 = random.randint(100, 200)
-    bbox_x2 = bbox_x1 + random.randint(150, 250)
-    bbox_y2 = bbox_y1 + random.randint(100, 150)
-    
+    bbox_x1, bbox_y1 = (int(v) for v in rng.integers(100, 201, 2))
+    bbox_x2 = bbox_x1 + int(rng.integers(150, 251))
+    bbox_y2 = bbox_y1 + int(rng.integers(100, 151))
     cv2.rectangle(img, (bbox_x1, bbox_y1), (bbox_x2, bbox_y2), (0, 255, 0), 3)
     
     # Add text labels
     font = cv2.FONT_HERSHEY_SIMPLEX
-    
-    # Damage type label
     label = f"{damage_type.upper()} #{index}"
     cv2.putText(img, label, (20, 50), font, 1.5, (255, 255, 255), 3)
     cv2.putText(img, label, (20, 50), font, 1.5, (0, 0, 0), 2)
     
-    # Confidence score
-    confidence = random.uniform(0.65, 0.98)
-    conf_text = f"Confidence: {confidence:.1%}"
-    cv2.putText(img, conf_text, (20, 100), font, 0.8, (255, 255, 255), 2)
-    cv2.putText(img, conf_text, (20, 100), font, 0.8, (0, 0, 0), 1)
-    
-    # Sample ID
     sample_text = "SAMPLE DATA"
     cv2.putText(img, sample_text, (20, height - 20), font, 0.6, (255, 255, 255), 2)
     
@@ -91,155 +106,257 @@ def generate_sample_image(damage_type: str, index: int) -> bytes:
     return buffer.tobytes()
 
 
-def upload_image_to_storage(supabase, image_bytes: bytes, filename: str) -> str:
-    """Upload image to Supabase storage and return public URL"""
-    try:
-        # Upload to damage-images bucket
-        result = supabase.storage.from_('damage-images').upload(
-            filename,
-            image_bytes,
-            file_options={"content-type": "image/jpeg"}
-        )
-        
-        # Get public URL
-        public_url = supabase.storage.from_('damage-images').get_public_url(filename)
-        
-        return public_url
-        
-    except Exception as e:
-        # If file already exists, try to get its URL
-        if "already exists" in str(e).lower():
-            return supabase.storage.from_('damage-images').get_public_url(filename)
-        raise
+def record_id(seed: int, index: int) -> str:
+    return str(uuid.uuid5(SEED_NAMESPACE, f"{seed}:{index}"))
 
 
-def seed_database_with_images(count: int = 20, clear_existing: bool = False):
-    """Seed the database with sample data and actual images"""
+def upload_image_pool(
+    backend: StorageBackend,
+    seed: int,
+    size: int,
+    concurrency: int
+) -> Dict[str, List[str]]:
+    """Generate and upload ``size`` images, cycling through the damage types.
     
-    # Get Supabase credentials
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_KEY")
+    Returns the image URLs per damage type. Each image is generated and
+    uploaded on the pool, so at most ``concurrency`` uploads are in flight.
+    Names are derived from the seed, so a resumed run overwrites rather than
+    duplicates.
+    """
+    def upload(slot: int) -> Tuple[str, str]:
+        damage_type = DAMAGE_TYPES[slot % len(DAMAGE_TYPES)]
+        image_bytes = generate_sample_image(damage_type, slot + 1, np.random.default_rng([seed, slot]))
+        url = backend.upload_image(image_bytes, f"seed_{seed}_{slot:06d}_{damage_type}.jpg", "image/jpeg")
+        return damage_type, url
     
-    if not supabase_url or not supabase_key:
-        print("❌ Error: SUPABASE_URL and SUPABASE_KEY must be set in .env file")
-        sys.exit(1)
+    urls = {damage_type: [] for damage_type in DAMAGE_TYPES}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="seed-upload") as pool:
+        for done, (damage_type, url) in enumerate(pool.map(upload, range(size)), start=1):
+            urls[damage_type].append(url)
+            print(f"   Uploaded image {done}/{size}...", end="\r")
+    print()
+    return urls
+
+
+def generate_records(
+    start: int,
+    stop: int,
+    seed: int,
+    base_time: datetime,
+    image_urls: Dict[str, List[str]],
+    days: float = 3.0
+) -> List[dict]:
+    """Records ``start`` to ``stop`` of a seed, drawn column by column.
     
-    print(f"Connecting to Supabase: {supabase_url}")
+    Every chunk has its own generator keyed by ``(seed, start)``, so chunks
+    can be generated in any order and a resumed run reproduces them.
+    """
+    rng = np.random.default_rng([seed, start])
+    n = stop - start
     
-    try:
-        # Create Supabase client
-        supabase = create_client(supabase_url, supabase_key)
-        
-        # Clear existing seed data if requested
-        if clear_existing:
-            print("🗑️  Clearing existing seed data...")
-            try:
-                result = supabase.table('road_damage').delete().eq('metadata->>seed_data', 'true').execute()
-                print(f"   Deleted {len(result.data) if result.data else 0} existing seed records")
-            except Exception as e:
-                print(f"   Warning: Could not clear existing data: {e}")
-        
-        # Generate and upload records
-        print(f"📝 Generating {count} sample records with images...")
-        records = []
-        base_time = datetime.utcnow()
-        
-        for i in range(count):
-            print(f"   Processing record {i + 1}/{count}...", end="\r")
-            
-            # Random damage type and severity
-            damage_type = random.choice(DAMAGE_TYPES)
-            severity = random.choice(SEVERITIES)
-            
-            # Random location
-            location = random.choice(SAMPLE_LOCATIONS)
-            lat_offset = random.uniform(-0.05, 0.05)
-            lng_offset = random.uniform(-0.05, 0.05)
-            
-            # Random confidence score
-            confidence = random.uniform(0.65, 0.98)
-            
-            # Stagger timestamps
-            time_offset = timedelta(hours=random.randint(0, 72))
-            detected_at = base_time - time_offset
-            
-            # Generate image
-            image_bytes = generate_sample_image(damage_type, i + 1)
-            
-            # Upload image to storage
-            filename = f"seed_{damage_type}_{i + 1}_{int(datetime.now().timestamp())}.jpg"
-            image_url = upload_image_to_storage(supabase, image_bytes, filename)
-            
-            # Create metadata
-            metadata = {
-                "frame_number": random.randint(0, 1000),
-                "video_filename": f"test_video_{random.randint(1, 5)}.mp4",
-                "bbox": {
-                    "x1": random.randint(50, 200),
-                    "y1": random.randint(50, 200),
-                    "x2": random.randint(250, 400),
-                    "y2": random.randint(250, 400)
-                },
+    damage_index = rng.integers(0, len(DAMAGE_TYPES), n)
+    severity_index = rng.integers(0, len(SEVERITIES), n)
+    location_index = rng.integers(0, len(SAMPLE_LOCATIONS), n)
+    latitudes = np.array([loc["lat"] for loc in SAMPLE_LOCATIONS])[location_index] + rng.uniform(-0.05, 0.05, n)
+    longitudes = np.array([loc["lng"] for loc in SAMPLE_LOCATIONS])[location_index] + rng.uniform(-0.05, 0.05, n)
+    confidences = np.round(rng.uniform(0.65, 0.98, n), 3)
+    # Second resolution, so millions of rows do not pile up on a few timestamps
+    age_seconds = rng.integers(0, max(1, int(days * 86400)), n)
+    frame_numbers = rng.integers(0, 1001, n)
+    videos = rng.integers(1, 6, n)
+    x1 = rng.integers(50, 201, n)
+    y1 = rng.integers(50, 201, n)
+    x2 = rng.integers(250, 401, n)
+    y2 = rng.integers(250, 401, n)
+    image_slots = rng.integers(0, 2 ** 31, n)
+    
+    records = []
+    columns = zip(
+        damage_index.tolist(), severity_index.tolist(), location_index.tolist(),
+        latitudes.tolist(), longitudes.tolist(), confidences.tolist(), age_seconds.tolist(),
+        frame_numbers.tolist(), videos.tolist(), x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist(),
+        image_slots.tolist()
+    )
+    for offset, (d, s, loc, lat, lng, conf, age, frame, video, bx1, by1, bx2, by2, slot) in enumerate(columns):
+        damage_type = DAMAGE_TYPES[d]
+        urls = image_urls.get(damage_type) or [None]
+        location = SAMPLE_LOCATIONS[loc]
+        records.append({
+            "id": record_id(seed, start + offset),
+            "damage_type": damage_type,
+            "severity": SEVERITIES[s],
+            "latitude": lat,
+            "longitude": lng,
+            "confidence_score": conf,
+            "detected_at": (base_time - timedelta(seconds=age)).isoformat(),
+            "city": location["name"],
+            "image_url": urls[slot % len(urls)],
+            "metadata": {
+                "frame_number": frame,
+                "video_filename": f"test_video_{video}.mp4",
+                "bbox": {"x1": bx1, "y1": by1, "x2": bx2, "y2": by2},
                 "location_name": location["name"],
-                "seed_data": True
-            }
-            
-            record = {
-                "damage_type": damage_type,
-                "severity": severity,
-                "latitude": location["lat"] + lat_offset,
-                "longitude": location["lng"] + lng_offset,
-                "confidence_score": round(confidence, 3),
-                "detected_at": detected_at.isoformat(),
-                "image_url": image_url,
-                "metadata": metadata
+                "seed_data": True,
+                "seed": seed
             }
-            
-            records.append(record)
-        
-        print(f"\n💾 Inserting {len(records)} records into database...")
-        result = supabase.table('road_damage').insert(records).execute()
-        
-        if result.data:
-            print(f"✅ Successfully inserted {len(result.data)} records with images!")
-            
-            # Print summary
-            print("\n📊 Summary:")
-            damage_counts = {}
-            severity_counts = {}
-            
+        })
+    return records
+
+
+class SeedProgress:
+    """Parameters and completed chunks of a seed run, kept in a JSON file.
+    
+    Chunks finish out of order. ``next_chunk`` only moves past chunks that
+    are all done, and a resumed run starts there.
+    """
+    
+    def __init__(self, path: str, params: dict, image_urls: Optional[dict] = None, next_chunk: int = 0):
+        self.path = path
+        self.params = params
+        self.image_urls = image_urls
+        self.next_chunk = next_chunk
+        self._done = set()
+    
+    @classmethod
+    def load(cls, path: str) -> Optional["SeedProgress"]:
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        return cls(path, state["params"], state["image_urls"], state["next_chunk"])
+    
+    def complete(self, chunk: int):
+        self._done.add(chunk)
+        while self.next_chunk in self._done:
+            self._done.discard(self.next_chunk)
+            self.next_chunk += 1
+    
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"params": self.params, "image_urls": self.image_urls, "next_chunk": self.next_chunk}, f)
+        os.replace(temp_path, self.path)
+
+
+def insert_with_retry(backend: StorageBackend, records: List[dict], retries: int):
+    for attempt in range(retries + 1):
+        try:
+            backend.insert_records(records)
+            return
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = min(2 ** attempt, 30)
+            print(f"\n   ⚠️  Insert failed ({e}); retrying in {delay}s")
+            time.sleep(delay)
+
+
+def seed_database_with_images(
+    backend: StorageBackend,
+    count: int = 20,
+    seed: int = 0,
+    base_time: Optional[datetime] = None,
+    image_pool: Optional[int] = None,
+    chunk_size: int = 1000,
+    upload_concurrency: int = 8,
+    insert_concurrency: int = 4,
+    retries: int = 3,
+    days: float = 3.0,
+    progress_file: Optional[str] = None,
+    resume: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """Seed ``count`` records with generated images; returns counts by damage type and severity"""
+    params = {
+        "count": count,
+        "seed": seed,
+        "base_time": (base_time or datetime.now(timezone.utc).replace(microsecond=0)).isoformat(),
+        "image_pool": min(count, 256) if image_pool is None else image_pool,
+        "chunk_size": chunk_size,
+        "days": days
+    }
+    progress = SeedProgress.load(progress_file) if resume and progress_file else None
+    if progress is not None:
+        if resume and base_time is None:
+            params["base_time"] = progress.params["base_time"]
+        if progress.params != params:
+            raise ValueError(
+                f"{progress_file} is from a run with other settings: {progress.params}; "
+                f"remove it or pass the same options"
+            )
+        print(f"↩️  Resuming at record {progress.next_chunk * chunk_size} of {count}")
+    else:
+        progress = SeedProgress(progress_file, params) if progress_file else SeedProgress(None, params)
+    
+    # Upload images
+    if progress.image_urls is None:
+        print(f"🖼️  Generating and uploading {params['image_pool']} images "
+              f"({upload_concurrency} uploads at a time)...")
+        start = time.perf_counter()
+        progress.image_urls = upload_image_pool(backend, seed, params["image_pool"], upload_concurrency)
+        print(f"   {params['image_pool']} images in {time.perf_counter() - start:.1f}s")
+        if progress.path:
+            progress.save()
+    
+    # Insert records chunk by chunk, keeping a bounded number in flight
+    base = datetime.fromisoformat(params["base_time"])
+    chunks = range(progress.next_chunk, -(-count // chunk_size))
+    counts = {"damage_type": {}, "severity": {}}
+    counts_lock = threading.Lock()
+    
+    def insert_chunk(chunk: int) -> int:
+        records = generate_records(
+            chunk * chunk_size, min((chunk + 1) * chunk_size, count), seed, base, progress.image_urls, days
+        )
+        insert_with_retry(backend, records, retries)
+        with counts_lock:
             for record in records:
-                damage_type = record["damage_type"]
-                severity = record["severity"]
-                
-                damage_counts[damage_type] = damage_counts.get(damage_type, 0) + 1
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            
-            print("\n   Damage Types:")
-            for dtype, count in sorted(damage_counts.items()):
-                print(f"   - {dtype}: {count}")
-            
-            print("\n   Severities:")
-            for sev, count in sorted(severity_counts.items()):
-                print(f"   - {sev}: {count}")
-            
-            print(f"\n   Time range: Last 72 hours")
-            print(f"   Locations: {len(SAMPLE_LOCATIONS)} cities")
-            print(f"   Images uploaded: {len(records)}")
-            
-            print("\n🎉 Database seeded successfully with images!")
-            print("\nYou can now test the frontend with this data.")
-            print("API endpoint: GET http://localhost:8000/api/v1/damages/latest")
-            
-        else:
-            print("❌ Error: No data was inserted")
-            sys.exit(1)
-            
+                for column in ("damage_type", "severity"):
+                    counts[column][record[column]] = counts[column].get(record[column], 0) + 1
+        return chunk
+    
+    print(f"💾 Inserting {count - progress.next_chunk * chunk_size} records in chunks of {chunk_size} "
+          f"({insert_concurrency} at a time)...")
+    start = time.perf_counter()
+    inserted = 0
+    with ThreadPoolExecutor(max_workers=insert_concurrency, thread_name_prefix="seed-insert") as pool:
+        pending = set()
+        chunk_iter = iter(chunks)
+        while True:
+            for chunk in chunk_iter:
+                pending.add(pool.submit(insert_chunk, chunk))
+                if len(pending) >= insert_concurrency * 2:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = future.result()
+                inserted += min((chunk + 1) * chunk_size, count) - chunk * chunk_size
+                progress.complete(chunk)
+            if progress.path:
+                progress.save()
+            elapsed = time.perf_counter() - start
+            rate = inserted / elapsed if elapsed else 0.0
+            remaining = count - progress.next_chunk * chunk_size
+            eta = f", ~{remaining / rate:.0f}s left" if rate and remaining > 0 else ""
+            print(f"   {progress.next_chunk * chunk_size:,}/{count:,} records ({rate:,.0f}/s{eta})    ", end="\r")
+    print()
+    return counts
+
+
+def clear_seed_data(backend_name: str):
+    """Delete every seed record; only the Supabase backend supports it"""
+    if backend_name != "supabase":
+        print("   Warning: --clear is only supported with the Supabase backend; "
+              "remove the local data directory instead")
+        return
+    from app.services.supabase_client import SupabaseClientService
+    client = SupabaseClientService().get_client()
+    try:
+        result = client.table('road_damage').delete().eq('metadata->>seed_data', 'true').execute()
+        print(f"   Deleted {len(result.data) if result.data else 0} existing seed records")
     except Exception as e:
-        print(f"\n❌ Error seeding database: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
+        print(f"   Warning: Could not clear existing data: {e}")
 
 
 def main():
@@ -247,26 +364,83 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Seed database with sample data and images")
-    parser.add_argument(
-        "--count",
-        type=int,
-        default=20,
-        help="Number of records to create (default: 20)"
-    )
-    parser.add_argument(
-        "--clear",
-        action="store_true",
-        help="Clear existing seed data before inserting new data"
-    )
+    parser.add_argument("--count", type=int, default=20, help="Number of records to create (default: 20)")
+    parser.add_argument("--clear", action="store_true", help="Clear existing seed data before inserting new data")
+    parser.add_argument("--backend", choices=STORAGE_BACKENDS, default=settings.storage_backend,
+                        help=f"Storage backend (default: STORAGE_BACKEND, {settings.storage_backend})")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed; same seed, same records (default: 0)")
+    parser.add_argument("--base-time", type=datetime.fromisoformat,
+                        help="Newest detection time, ISO format (default: now; kept by --resume)")
+    parser.add_argument("--days", type=float, default=3.0, help="Spread of detection times in days (default: 3)")
+    parser.add_argument("--image-pool", type=int,
+                        help="Images generated and shared by the records (default: count, at most 256)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Records per insert (default: 1000)")
+    parser.add_argument("--upload-concurrency", type=int, default=8, help="Parallel image uploads (default: 8)")
+    parser.add_argument("--insert-concurrency", type=int, default=4, help="Parallel chunk inserts (default: 4)")
+    parser.add_argument("--retries", type=int, default=3, help="Retries of a failed chunk insert (default: 3)")
+    parser.add_argument("--progress-file", default=".seed_progress.json",
+                        help="Where progress is kept for --resume (default: .seed_progress.json)")
+    parser.add_argument("--resume", action="store_true", help="Continue the run recorded in --progress-file")
     
     args = parser.parse_args()
+    if args.count < 1 or args.chunk_size < 1 or args.upload_concurrency < 1 or args.insert_concurrency < 1:
+        parser.error("--count, --chunk-size and the concurrencies must be at least 1")
     
     print("=" * 60)
     print("Road Damage Detection - Database Seeder (with Images)")
     print("=" * 60)
     print()
     
-    seed_database_with_images(count=args.count, clear_existing=args.clear)
+    settings.storage_backend = args.backend
+    backend = create_storage_backend(settings)
+    print(f"Storage backend: {args.backend}")
+    
+    try:
+        if args.clear:
+            print("🗑️  Clearing existing seed data...")
+            clear_seed_data(args.backend)
+        
+        start = time.perf_counter()
+        counts = seed_database_with_images(
+            backend,
+            count=args.count,
+            seed=args.seed,
+            base_time=args.base_time,
+            image_pool=args.image_pool,
+            chunk_size=args.chunk_size,
+            upload_concurrency=args.upload_concurrency,
+            insert_concurrency=args.insert_concurrency,
+            retries=args.retries,
+            days=args.days,
+            progress_file=args.progress_file,
+            resume=args.resume
+        )
+        elapsed = time.perf_counter() - start
+    except Exception as e:
+        print(f"\n❌ Error seeding database: {e}")
+        if args.progress_file and os.path.exists(args.progress_file):
+            print(f"   Progress is saved; re-run with --resume to continue")
+        sys.exit(1)
+    finally:
+        backend.close()
+    
+    # The run is finished; a later --resume would have nothing to do
+    if args.progress_file and os.path.exists(args.progress_file):
+        os.remove(args.progress_file)
+    
+    print(f"✅ Seeded {args.count:,} records in {elapsed:.1f}s ({args.count / elapsed:,.0f} records/s)")
+    print("\n📊 Summary (this run):")
+    print("\n   Damage Types:")
+    for dtype, n in sorted(counts["damage_type"].items()):
+        print(f"   - {dtype}: {n}")
+    print("\n   Severities:")
+    for sev, n in sorted(counts["severity"].items()):
+        print(f"   - {sev}: {n}")
+    print(f"\n   Time range: Last {args.days:g} days")
+    print(f"   Locations: {len(SAMPLE_LOCATIONS)} cities")
+    
+    print("\n🎉 Database seeded successfully with images!")
+    print("API endpoint: GET http://localhost:8000/api/v1/damages/latest")
 
 
 if __name__ == "__main__":
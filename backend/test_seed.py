@@ -5,7 +5,8 @@ Quick test script to verify seeding and API functionality
 import os
 import sys
 from dotenv import load_dotenv
-from supabase import create_client
+from app.services.http_pool import pool_stats
+from app.services.supabase_client import get_shared_client
 
 load_dotenv()
 
@@ -22,7 +23,7 @@ def test_connection():
         return False
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         result = supabase.table('road_damage').select('id').limit(1).execute()
         print("✅ Connection successful")
         return True
@@ -39,7 +40,7 @@ def test_table_exists():
     supabase_key = os.getenv("SUPABASE_KEY")
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         result = supabase.table('road_damage').select('*').limit(1).execute()
         print("✅ Table exists")
         return True
@@ -56,7 +57,7 @@ def test_storage_bucket():
     supabase_key = os.getenv("SUPABASE_KEY")
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         # Try to list files in bucket
         result = supabase.storage.from_('damage-images').list()
         print("✅ Storage bucket exists")
@@ -75,15 +76,17 @@ def count_seed_records():
     supabase_key = os.getenv("SUPABASE_KEY")
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         
-        # Count all records
-        all_result = supabase.table('road_damage').select('id', count='exact').execute()
-        total_count = all_result.count if hasattr(all_result, 'count') else len(all_result.data)
+        # Count on the server; head=True returns only the count, no rows
+        all_result = supabase.table('road_damage').select('id', count='exact', head=True).execute()
+        total_count = all_result.count
         
-        # Count seed records
-        seed_result = supabase.table('road_damage').select('*').execute()
-        seed_count = sum(1 for r in seed_result.data if r.get('metadata', {}).get('seed_data'))
+        seed_result = supabase.table('road_damage') \
+            .select('id', count='exact', head=True) \
+            .eq('metadata->>seed_data', 'true') \
+            .execute()
+        seed_count = seed_result.count
         
         print(f"✅ Total records: {total_count}")
         print(f"   Seed records: {seed_count}")
@@ -103,7 +106,7 @@ def show_sample_records():
     supabase_key = os.getenv("SUPABASE_KEY")
     
     try:
-        supabase = create_client(supabase_url, supabase_key)
+        supabase = get_shared_client(supabase_url, supabase_key)
         result = supabase.table('road_damage').select('*').order('detected_at', desc=True).limit(3).execute()
         
         for i, record in enumerate(result.data, 1):
@@ -141,6 +144,14 @@ def main():
     for test in tests:
         results.append(test())
     
+    # Every check shares one client, so only the first should connect
+    stats = pool_stats()
+    if stats:
+        print(
+            f"\nHTTP pool: {stats['requests']} requests over "
+            f"{stats['connections_opened']} connection(s), {stats['connections_reused']} reused"
+        )
+    
     print("\n" + "=" * 60)
     if all(results[:3]):  # First 3 tests are critical
         print("✅ All critical tests passed!")
@@ -0,0 +1,31 @@
+import pytest
+from app.services.local_backend import LocalStorageBackend
+
+
+def record_id(index):
+    return f"00000000-0000-4000-8000-{index:012d}"
+
+
+def make_record(index, detected_at=None, **extra):
+    """A road_damage record whose fields vary with ``index``; ``extra`` overrides them"""
+    record = {
+        "id": record_id(index),
+        "damage_type": "pothole" if index % 2 else "crack",
+        "severity": ["low", "medium", "high"][index % 3],
+        "latitude": 50.0 + index * 0.01,
+        "longitude": 10.0 + index * 0.01,
+        "confidence_score": 0.55 + (index % 4) * 0.1,
+        "detected_at": detected_at or f"2025-01-{1 + index % 28:02d}T10:00:{index % 60:02d}+00:00",
+        "image_url": None,
+        "metadata": {"frame_number": index}
+    }
+    record.update(extra)
+    return record
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """An empty local backend; modules needing rows override it to insert them"""
+    backend = LocalStorageBackend(str(tmp_path))
+    yield backend
+    backend.close()
@@ -0,0 +1,76 @@
+import asyncio
+import numpy as np
+from app.services.clustering import (
+    DamageClusterService,
+    TileCache,
+    cluster_points,
+    tile_bounds,
+    tiles_for_bbox
+)
+from app.services.storage_service import DamageStorageService
+from tests.unit.conftest import make_record
+
+
+def test_tiles_for_bbox_and_tile_bounds_agree():
+    tiles = tiles_for_bbox((48.0, 11.0, 48.5, 11.9), 8)
+    
+    assert tiles and all(tile[0] == 8 for tile in tiles)
+    for tile in tiles:
+        min_lat, min_lon, max_lat, max_lon = tile_bounds(*tile)
+        assert min_lat < 48.5 and max_lat > 48.0
+        assert min_lon < 11.9 and max_lon > 11.0
+
+
+def test_cluster_points_counts_centroids_and_types():
+    latitude = np.array([48.1001, 48.1003, 48.1002, 52.5])
+    longitude = np.array([11.5001, 11.5003, 11.5002, 13.4])
+    types = np.array(["pothole", "crack", "pothole", "crack"], dtype=object)
+    
+    tiles = cluster_points(latitude, longitude, types, zoom=10, grid_size=4)
+    clusters = sorted((c for tile in tiles.values() for c in tile), key=lambda c: -c["count"])
+    
+    assert len(clusters) == 2
+    assert clusters[0]["count"] == 3
+    assert clusters[0]["types"] == {"pothole": 2, "crack": 1}
+    assert abs(clusters[0]["latitude"] - 48.1002) < 1e-9
+    assert clusters[1]["types"] == {"crack": 1}
+
+
+def test_invalidate_points_only_drops_tiles_containing_them():
+    cache = TileCache()
+    munich = tiles_for_bbox((48.13, 11.57, 48.13, 11.57), 10)[0]
+    berlin = tiles_for_bbox((52.52, 13.40, 52.52, 13.40), 10)[0]
+    cache.put(munich, (), [{"count": 1}], cache.generation)
+    cache.put(berlin, (), [{"count": 1}], cache.generation)
+    
+    cache.invalidate_points(np.array([48.13]), np.array([11.57]))
+    
+    assert cache.get(munich, ()) is None
+    assert cache.get(berlin, ()) == [{"count": 1}]
+
+
+def test_viewport_switches_to_points_above_max_zoom_and_refreshes_on_insert(backend):
+    async def scenario():
+        storage = DamageStorageService(backend)
+        service = DamageClusterService(storage, max_zoom=14)
+        await storage.insert_records([make_record(i, latitude=48.1 + i * 1e-4, longitude=11.5) for i in range(5)])
+        
+        viewport = (48.0, 11.4, 48.2, 11.6)
+        first = await service.get_viewport(viewport, 10)
+        await storage.insert_records([make_record(99, latitude=48.15, longitude=11.55)])
+        second = await service.get_viewport(viewport, 10)
+        points = await service.get_viewport(viewport, 16)
+        capped = DamageClusterService(storage, max_zoom=14, max_load_points=4)
+        partial = [await capped.get_viewport(viewport, 10) for _ in range(2)]
+        await storage.close()
+        return first, second, points, partial
+    
+    first, second, points, partial = asyncio.run(scenario())
+    
+    assert first["mode"] == "clusters" and first["total"] == 5
+    assert second["total"] == 6 and second["tiles_loaded"] == 1
+    assert points["mode"] == "points" and len(points["points"]) == 6
+    assert not second["truncated"]
+    # Loads past the cap are partial and never cached
+    assert all(viewport["truncated"] and viewport["total"] == 4 for viewport in partial)
+    assert partial[1]["tiles_loaded"] == 1
@@ -0,0 +1,82 @@
+import asyncio
+import gzip
+import brotli
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from app.api.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = b'{"id":"abc","damage_type":"pothole"}' * 100
+
+
+async def large(request):
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+async def small(request):
+    return Response(b'{"ok":true}', media_type="application/json")
+
+
+async def image(request):
+    return Response(BODY, media_type="image/jpeg")
+
+
+async def stream(request):
+    async def chunks():
+        for _ in range(5):
+            yield BODY
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+app = Starlette(routes=[Route(path, endpoint) for path, endpoint in (
+    ("/large", large), ("/small", small), ("/image", image), ("/stream", stream)
+)])
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+def get(path, accept_encoding):
+    async def request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+                # The encoded bytes, not httpx's decoded content
+                return response.headers, b"".join([chunk async for chunk in response.aiter_raw()])
+    return asyncio.run(request())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_encoding_prefers_brotli(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+def test_large_responses_are_compressed_with_weak_etag():
+    headers, raw = get("/large", "br")
+    
+    assert headers["content-encoding"] == "br"
+    assert headers["etag"] == 'W/"v1"'
+    assert "accept-encoding" in headers["vary"].lower()
+    assert brotli.decompress(raw) == BODY
+    assert int(headers["content-length"]) == len(raw) < len(BODY)
+
+
+def test_small_excluded_and_identity_responses_pass_through():
+    assert "content-encoding" not in get("/small", "gzip, br")[0]
+    assert "content-encoding" not in get("/image", "gzip, br")[0]
+    headers, raw = get("/large", "identity")
+    assert "content-encoding" not in headers and raw == BODY
+
+
+def test_streamed_responses_are_compressed_chunk_by_chunk():
+    headers, raw = get("/stream", "gzip")
+    
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(raw) == BODY * 5
@@ -0,0 +1,87 @@
+import pytest
+from app.services.damage_query import (
+    DEFAULT_FIELDS,
+    DamageQuery,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    parse_fields
+)
+from tests.unit.conftest import make_record, record_id
+
+
+@pytest.fixture
+def backend(backend):
+    # Pairs of records share a timestamp so pages must break ties on id
+    backend.insert_records([
+        make_record(i, f"2025-01-01T00:{i // 2:02d}:00+00:00", state="Bavaria" if i < 10 else "Hesse")
+        for i in range(25)
+    ])
+    return backend
+
+
+def fetch_all(backend, query):
+    pages, cursor = [], None
+    while True:
+        items, cursor = paginate(backend.query_damages(query._replace(cursor=cursor)), query)
+        pages.append(items)
+        if cursor is None:
+            return pages
+        cursor = decode_cursor(cursor)
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("2025-01-01T01:00:00+01:00", record_id(1).upper())
+    assert decode_cursor(token) == ("2025-01-01T00:00:00.000000+00:00", record_id(1))
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+    # Values that would end up in a PostgREST filter string
+    for detected_at, record in [
+        ('2025-01-01T00:00:00"),id.gt.(0', record_id(1)),
+        ("2025-01-01T00:00:00+00:00", "1),or(id.gt.0"),
+        (1, record_id(1))
+    ]:
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor(detected_at, record))
+
+
+def test_parse_fields_defaults_and_rejects_unknown_columns():
+    assert parse_fields(None) == DEFAULT_FIELDS
+    assert parse_fields("id, severity,id") == ("id", "severity")
+    with pytest.raises(ValueError):
+        parse_fields("id,password")
+
+
+def test_keyset_pages_cover_every_row_once_in_order(backend):
+    pages = fetch_all(backend, DamageQuery(limit=4))
+    
+    rows = [row for page in pages for row in page]
+    keys = [(row["detected_at"], row["id"]) for row in rows]
+    assert len(rows) == 25
+    assert keys == sorted(keys, reverse=True)
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 4, 1]
+
+
+def test_filters_and_projection(backend):
+    query = DamageQuery(
+        damage_types=("pothole",),
+        min_confidence=0.7,
+        state="Bavaria",
+        fields=("id", "confidence_score"),
+        limit=50
+    )
+    
+    items, cursor = paginate(backend.query_damages(query), query)
+    
+    assert cursor is None
+    assert items and all(set(item) == {"id", "confidence_score"} for item in items)
+    assert all(item["confidence_score"] >= 0.7 for item in items)
+    assert {item["id"] for item in items} <= {record_id(i) for i in range(1, 10, 2)}
+
+
+def test_bounding_box_filter(backend):
+    query = DamageQuery(bbox=(50.0, 10.0, 50.045, 10.045), limit=50)
+    
+    items, _ = paginate(backend.query_damages(query), query)
+    
+    assert sorted(item["id"] for item in items) == [record_id(i) for i in range(5)]
@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+from app.services.detection_types import BBox, FrameDetection, detections_from_array
+from app.services.detection_tracker import DetectionTracker
+
+
+def test_detections_from_array_converts_rows():
+    raw = np.array([
+        [1.7, 2.2, 10.9, 20.1, 1.0, 0.8],
+        [5.0, 5.0, 15.0, 15.0, 3.0, 0.6],
+    ], dtype=np.float32)
+    
+    detections = detections_from_array(raw)
+    
+    assert len(detections) == 2
+    assert detections[0].bbox == BBox(1, 2, 10, 20)
+    assert detections[0].class_id == 1
+    assert detections[0].confidence == pytest.approx(0.8)
+    assert isinstance(detections[1].bbox.x1, int)
+
+
+def test_detections_from_array_applies_confidence_threshold():
+    raw = np.array([
+        [0, 0, 10, 10, 0, 0.5],
+        [0, 0, 10, 10, 0, 0.51],
+        [0, 0, 10, 10, 0, 0.2],
+    ], dtype=np.float32)
+    
+    detections = detections_from_array(raw, min_confidence=0.5)
+    
+    assert len(detections) == 1
+    assert detections[0].confidence > 0.5
+
+
+def test_detections_from_array_rejects_bad_shape():
+    assert detections_from_array(np.zeros((3, 5), dtype=np.float32)) == []
+    assert detections_from_array(np.zeros((0, 6), dtype=np.float32)) == []
+
+
+def test_tracker_accepts_frame_detections():
+    tracker = DetectionTracker(window_size=5, iou_threshold=0.5)
+    
+    tracker.add_detection(FrameDetection(BBox(0, 0, 10, 10), 0, 0.8), frame_number=0)
+    
+    assert tracker.is_duplicate(FrameDetection(BBox(1, 1, 11, 11), 0, 0.9), frame_number=1)
+    assert not tracker.is_duplicate(FrameDetection(BBox(50, 50, 60, 60), 0, 0.9), frame_number=1)
@@ -0,0 +1,103 @@
+import asyncio
+import csv
+import io
+import json
+import threading
+import pytest
+from app.services.damage_query import ROAD_DAMAGE_COLUMNS, DamageQuery
+from app.services.export import DamageExporter, NdjsonExporter, create_exporter, iter_pages, stream_export
+from app.services.storage_service import DamageStorageService
+from tests.unit.conftest import make_record
+
+
+@pytest.fixture
+def backend(backend):
+    backend.insert_records([make_record(i) for i in range(25)])
+    return backend
+
+
+def export_bytes(backend, export_format, **query):
+    # Small pages so every format is exercised across page boundaries
+    query = DamageQuery(**{"fields": ROAD_DAMAGE_COLUMNS, "limit": 4, **query})
+    exporter = create_exporter(export_format, query.fields)
+    
+    async def collect():
+        service = DamageStorageService(backend)
+        chunks = [chunk async for chunk in stream_export(service, exporter, query)]
+        await service.close()
+        return b"".join(chunks)
+    
+    return asyncio.run(collect())
+
+
+def test_text_formats_cover_every_row_once(backend):
+    ndjson = [json.loads(line) for line in export_bytes(backend, "ndjson").splitlines()]
+    rows = list(csv.DictReader(io.StringIO(export_bytes(backend, "csv").decode())))
+    geojson = json.loads(export_bytes(backend, "geojson"))
+    
+    assert len({row["id"] for row in ndjson}) == 25
+    assert ndjson[0]["metadata"] == {"frame_number": ndjson[0]["metadata"]["frame_number"]}
+    assert [row["id"] for row in rows] == [row["id"] for row in ndjson]
+    assert json.loads(rows[0]["metadata"]) == ndjson[0]["metadata"]
+    assert len(geojson["features"]) == 25
+    feature = geojson["features"][0]
+    assert feature["geometry"]["coordinates"] == [ndjson[0]["longitude"], ndjson[0]["latitude"]]
+    assert "latitude" not in feature["properties"]
+
+
+def test_export_applies_query_filters(backend):
+    lines = export_bytes(backend, "ndjson", damage_types=("pothole",)).splitlines()
+    
+    assert len(lines) == 12
+    assert {json.loads(line)["damage_type"] for line in lines} == {"pothole"}
+
+
+def test_columnar_formats_round_trip(backend):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    
+    table = pq.read_table(io.BytesIO(export_bytes(backend, "parquet")))
+    stream = pa.ipc.open_stream(export_bytes(backend, "arrow")).read_all()
+    
+    assert table.num_rows == stream.num_rows == 25
+    assert table.schema.field("detected_at").type == pa.timestamp("us", tz="UTC")
+    assert json.loads(table.column("metadata")[0].as_py())["frame_number"] >= 0
+
+
+def test_create_exporter_rejects_unknown_format_and_geojson_without_coordinates():
+    with pytest.raises(ValueError):
+        create_exporter("xml", ROAD_DAMAGE_COLUMNS)
+    with pytest.raises(ValueError):
+        create_exporter("geojson", ("id", "damage_type"))
+    with pytest.raises(TypeError):
+        DamageExporter(("id",))
+
+
+def test_pages_are_encoded_off_the_event_loop(backend):
+    class RecordingExporter(NdjsonExporter):
+        threads = set()
+        
+        def encode_page(self, rows):
+            self.threads.add(threading.get_ident())
+            return super().encode_page(rows)
+    
+    query = DamageQuery(fields=("id",), limit=10)
+    
+    async def collect():
+        service = DamageStorageService(backend)
+        chunks = [chunk async for chunk in stream_export(service, RecordingExporter(query.fields), query)]
+        await service.close()
+        return threading.get_ident(), b"".join(chunks)
+    
+    loop_thread, body = asyncio.run(collect())
+    assert len(body.splitlines()) == 25
+    assert RecordingExporter.threads and loop_thread not in RecordingExporter.threads
+
+
+def test_iter_pages_matches_streaming_order(backend):
+    query = DamageQuery(fields=("id",), limit=7)
+    pages = list(iter_pages(backend, query))
+    
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    streamed = [json.loads(line)["id"] for line in export_bytes(backend, "ndjson", fields=("id",)).splitlines()]
+    assert [row["id"] for page in pages for row in page] == streamed
@@ -0,0 +1,30 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+import numpy as np
+from app.utils.fast_json import FastJSONResponse, dumps
+
+
+def test_dumps_handles_storage_and_numpy_values():
+    value = {
+        "latitude": Decimal("52.5"),
+        "count": np.int64(3),
+        "scores": np.array([0.5, 1.0]),
+        "detected_at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "metadata": {"frame_number": 1}
+    }
+    
+    decoded = json.loads(dumps(value))
+    
+    assert decoded["latitude"] == 52.5
+    assert decoded["count"] == 3
+    assert decoded["scores"] == [0.5, 1.0]
+    assert decoded["detected_at"].startswith("2025-01-02T03:04:05")
+    assert decoded["metadata"] == {"frame_number": 1}
+
+
+def test_fast_json_response_renders_compact_json():
+    response = FastJSONResponse({"items": [], "next_cursor": None})
+    
+    assert response.body == b'{"items":[],"next_cursor":null}'
+    assert response.media_type == "application/json"
@@ -0,0 +1,68 @@
+import numpy as np
+from app.services.detection_types import BBox, FrameDetection
+from app.services.frame_index import PerceptualFrameIndex, gps_bucket
+
+SHAPE = (720, 1280, 3)
+CRACK = FrameDetection(BBox(128, 72, 256, 144), 0, 0.9)
+
+
+def road_frame(seed: int, shift: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (9, 16, 3), dtype=np.uint8)
+    frame = np.kron(small, np.ones((80, 80, 1), dtype=np.uint8))
+    return np.roll(frame, shift, axis=1)
+
+
+def test_near_frames_reuse_detections_scaled_to_the_frame():
+    index = PerceptualFrameIndex(max_distance=4)
+    frame_hash = index.hash_frame(road_frame(1))
+    index.add(frame_hash, SHAPE, [CRACK], bucket="model", source="job-1")
+    
+    match = index.lookup(index.hash_frame(road_frame(1, shift=4)), SHAPE, "model")
+    assert match is not None and match.distance <= 4 and match.source == "job-1"
+    [detection] = match.detections
+    assert detection.bbox == CRACK.bbox and detection.class_id == 0
+    assert abs(detection.confidence - 0.9) < 1e-6
+    
+    # Half the resolution, same relative box
+    half = index.lookup(frame_hash, (360, 640, 3), "model").detections[0]
+    assert half.bbox == BBox(64, 36, 128, 72)
+    
+    assert index.lookup(index.hash_frame(road_frame(2)), SHAPE, "model") is None
+    assert index.lookup(frame_hash, SHAPE, "other-model") is None
+    assert index.lookup(frame_hash, SHAPE, "model", exclude_source="job-1") is None
+    assert index.stats()["hits"] == 2
+
+
+def test_hamming_lookup_finds_every_hash_within_distance():
+    index = PerceptualFrameIndex(max_distance=4)
+    rng = np.random.default_rng(0)
+    stored = [int(h) for h in rng.integers(0, 2**63, 200, dtype=np.int64)]
+    for value in stored:
+        index.add(value, SHAPE, [], source=str(value))
+    for value in stored[:50]:
+        flipped = value
+        for bit in rng.choice(64, size=4, replace=False):
+            flipped ^= 1 << int(bit)
+        assert index.lookup(flipped, SHAPE).source == str(value)
+
+
+def test_entries_are_evicted_by_size_and_age(monkeypatch):
+    import app.services.frame_index as frame_index
+    
+    index = PerceptualFrameIndex(max_distance=0, max_entries=2, ttl_seconds=60)
+    index.add(1, SHAPE, [])
+    index.add(2, SHAPE, [])
+    # Using 1 makes 2 the least recently used
+    assert index.lookup(1, SHAPE) is not None
+    index.add(3, SHAPE, [])
+    assert index.lookup(2, SHAPE) is None
+    assert len(index) == 2 and index.evictions == 1
+    
+    now = frame_index.time.monotonic()
+    monkeypatch.setattr(frame_index.time, "monotonic", lambda: now + 61)
+    assert index.lookup(1, SHAPE) is None
+    assert index.expirations == 1
+    
+    assert gps_bucket(52.37021, 4.89517, 0.001) == gps_bucket(52.37049, 4.89599, 0.001)
+    assert gps_bucket(52.37021, 4.89517, 0.001) != gps_bucket(52.37121, 4.89517, 0.001)
@@ -0,0 +1,44 @@
+import asyncio
+import subprocess
+import sys
+import httpx
+from app.config import settings
+from app.main import app
+
+
+def test_importing_app_skips_heavy_modules():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('cv2', 'onnxruntime', 'supabase') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_liveness_and_readiness(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    monkeypatch.setattr(settings, "local_storage_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "spool_enabled", False)
+    monkeypatch.setattr(settings, "preload_model", False)
+    monkeypatch.setattr(settings, "video_index_path", str(tmp_path / "video_index.db"))
+    
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            # Before startup the process is alive but not ready
+            app.state.resources = None
+            assert (await client.get("/health/live")).status_code == 200
+            assert (await client.get("/health")).json() == {"status": "healthy"}
+            assert (await client.get("/health/ready")).status_code == 503
+            
+            async with app.router.lifespan_context(app):
+                live = await client.get("/health/live")
+                ready = await client.get("/health/ready")
+        return live, ready
+    
+    live, ready = asyncio.run(run())
+    assert live.json() == {"status": "alive"}
+    assert ready.status_code == 200
+    body = ready.json()
+    assert body["checks"] == {"storage": True}
+    assert body["cold_start_ms"]["total"] >= body["cold_start_ms"]["startup"]
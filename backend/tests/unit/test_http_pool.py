@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services import http_pool
+from app.services.http_pool import PoolMetrics, close_http_client, create_http_client, get_http_client
+from app.services.supabase_client import get_shared_client
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_metrics_count_connection_reuse(server_url):
+    metrics = PoolMetrics()
+    client = create_http_client(metrics)
+    for _ in range(5):
+        client.get(f"{server_url}/rest/v1/road_damage").raise_for_status()
+    open_connections = client._transport.open_connections()
+    client.close()
+    
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 5
+    assert snapshot["connections_opened"] == 1
+    assert snapshot["connections_reused"] == 4
+    assert snapshot["in_flight"] == 0
+    assert open_connections == 1
+
+
+def test_shared_supabase_client_uses_the_pool(server_url):
+    close_http_client()
+    try:
+        client = get_shared_client(server_url, "eyJhbGciOiJIUzI1NiJ9.e30.test")
+        assert get_shared_client(server_url, "eyJhbGciOiJIUzI1NiJ9.e30.test") is client
+        
+        for _ in range(3):
+            client.table("road_damage").select("id").limit(1).execute()
+        stats = http_pool.pool_stats()
+        assert stats["requests"] == 3
+        assert stats["connections_reused"] == 2
+        
+        # A closed pool is replaced, and cached Supabase clients with it
+        close_http_client()
+        assert http_pool.pool_stats() == {}
+        rebuilt = get_shared_client(server_url, "eyJhbGciOiJIUzI1NiJ9.e30.test")
+        assert rebuilt is not client
+        assert rebuilt.options.httpx_client is get_http_client()
+    finally:
+        close_http_client()
@@ -0,0 +1,166 @@
+import asyncio
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import pytest
+from app.services.image_batch import ImageInput, expand_archives
+from app.services.onnx_service import ONNXModelService
+from app.utils.errors import ImageError
+
+
+def jpeg(width=64, height=48) -> bytes:
+    return cv2.imencode(".jpg", np.full((height, width, 3), 120, dtype=np.uint8))[1].tobytes()
+
+
+def zip_of(**members) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name.replace("__", "/"), data)
+    return buffer.getvalue()
+
+
+def test_expand_archives_unpacks_images_and_enforces_limits():
+    archive = zip_of(**{"a.jpg": jpeg(), "road__b.PNG": jpeg(), "notes.txt": b"x", "__MACOSX__._a.jpg": b"x"})
+    uploads = [ImageInput("photos.zip", archive), ImageInput("c.jpg", jpeg())]
+    
+    images = expand_archives(uploads, max_images=10, max_bytes=10 ** 6)
+    assert [image.filename for image in images] == ["photos.zip/a.jpg", "photos.zip/road/b.PNG", "c.jpg"]
+    assert images[0].data == jpeg()
+    
+    with pytest.raises(ImageError, match="maximum of 2 images"):
+        expand_archives(uploads, max_images=2, max_bytes=10 ** 6)
+    with pytest.raises(ImageError, match="maximum size"):
+        expand_archives(uploads, max_images=10, max_bytes=len(jpeg()) * 2)
+    with pytest.raises(ImageError, match="zip"):
+        expand_archives([ImageInput("broken.zip", b"PK\x03\x04 truncated")], 10, 10 ** 6)
+
+
+@pytest.mark.parametrize("compression, method", [
+    (zipfile.ZIP_STORED, None),
+    (zipfile.ZIP_DEFLATED, None),
+    # A compression method zipfile cannot inflate
+    (zipfile.ZIP_STORED, 99)
+])
+def test_expand_archives_rejects_unreadable_members(compression, method):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        archive.writestr("a.jpg", jpeg())
+    data = bytearray(buffer.getvalue())
+    # Corrupt the member's data; the central directory stays intact
+    start = 30 + len("a.jpg")
+    data[start + 10:start + 60] = bytes(50)
+    if method is not None:
+        data[8] = method
+        data[data.index(b"PK\x01\x02") + 10] = method
+    
+    with pytest.raises(ImageError, match="archive member") as error:
+        expand_archives([ImageInput("photos.zip", bytes(data))], 10, 10 ** 6)
+    assert error.value.context["filename"] == "photos.zip/a.jpg"
+
+
+class FakeSession:
+    def __init__(self, batch):
+        self.batch = batch
+        self.runs = []
+    
+    def get_inputs(self):
+        class Input:
+            shape = [self.batch, 3, 32, 32]
+        return [Input()]
+    
+    def run(self, output_names, feeds):
+        images = feeds["images"]
+        self.runs.append(len(images))
+        # One box per image whose confidence is the image's mean pixel
+        means = images.mean(axis=(1, 2, 3))
+        return [np.array([[[0, 0, 16, 16, 1, mean]] for mean in means], dtype=np.float32)]
+
+
+def model_with(batch) -> ONNXModelService:
+    service = ONNXModelService.__new__(ONNXModelService)
+    service.session = FakeSession(batch)
+    service.input_name = "images"
+    service.output_names = ["output0"]
+    return service
+
+
+def test_run_batch_stacks_dynamic_and_pads_fixed_batches():
+    tensors = [np.full((1, 3, 32, 32), value, dtype=np.float32) for value in (0.1, 0.2, 0.3)]
+    
+    dynamic = model_with("batch")
+    outputs = dynamic.run_batch(tensors)
+    assert dynamic.session.runs == [3]
+    assert [round(float(rows[0, 5]), 3) for rows in outputs] == [0.1, 0.2, 0.3]
+    
+    fixed = model_with(2)
+    assert len(fixed.run_batch(tensors)) == 3
+    assert fixed.session.runs == [2, 2]
+    
+    single = model_with(1)
+    single.run_batch(tensors)
+    assert single.session.runs == [1, 1, 1]
+
+
+def test_process_images_returns_per_image_results(monkeypatch):
+    import httpx
+    from app.api import routes
+    from app.config import settings
+    from app.main import app
+    
+    class Registry:
+        def get(self):
+            return model_with("batch")
+    
+    class Storage:
+        stored = []
+        
+        async def store_detection(self, detection, image, frame_number, video_filename, metadata=None):
+            self.stored.append((frame_number, metadata))
+            return f"id-{len(self.stored)}"
+        
+        async def flush(self):
+            return 0
+    
+    class Resources:
+        model_registry = Registry()
+        storage_service = Storage()
+        decode_executor = ThreadPoolExecutor(max_workers=2)
+        inference_executor = ThreadPoolExecutor(max_workers=1)
+    
+    monkeypatch.setattr(settings, "image_batch_size", 2)
+    monkeypatch.setattr(settings, "confidence_threshold", 0.1)
+    
+    async def post(files):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/process-images", files=files)
+    
+    previous = getattr(app.state, "resources", None)
+    app.state.resources = Resources()
+    try:
+        files = [
+            ("images", ("a.jpg", jpeg(), "image/jpeg")),
+            ("images", ("bad.jpg", b"not an image", "image/jpeg")),
+            ("images", ("set.zip", zip_of(**{"b.jpg": jpeg(32, 32), "c.jpg": jpeg()}), "application/zip"))
+        ]
+        body = asyncio.run(post(files)).json()
+        empty = asyncio.run(post([("images", ("empty.zip", zip_of(**{"x.txt": b"x"}), "application/zip"))]))
+    finally:
+        app.state.resources = previous
+        Resources.decode_executor.shutdown()
+        Resources.inference_executor.shutdown()
+    
+    assert body["status"] == "completed"
+    assert (body["images"], body["processed_images"], body["detections_found"]) == (4, 3, 3)
+    results = {result["filename"]: result for result in body["results"]}
+    assert results["bad.jpg"]["status"] == "failed"
+    assert results["set.zip/b.jpg"]["width"] == 32
+    # Boxes map from the 32x32 model input back onto each photo
+    assert results["a.jpg"]["detections"][0]["bbox"] == [0, 0, 32, 24]
+    assert results["a.jpg"]["detections"][0]["damage_type"] == "pothole"
+    assert Storage.stored[0] == (0, {"image_filename": "a.jpg", "batch_job_id": body["job_id"]})
+    assert routes.job_status[body["job_id"]]["processed_frames"] == 3
+    assert empty.status_code == 400
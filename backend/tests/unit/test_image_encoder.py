@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+import cv2
+from app.services.detection_types import BBox
+from app.services.image_encoder import (
+    ImageOutputConfig,
+    attach_image_urls,
+    crop_region,
+    encode_detection_images
+)
+
+
+def make_frame(height=1080, width=1920):
+    return np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+
+def test_crop_region_adds_margin_and_clips():
+    region = crop_region(BBox(10, 10, 110, 60), (100, 200, 3), margin=0.2)
+    
+    assert region == BBox(0, 0, 130, 70)
+
+
+def test_crop_mode_encodes_only_the_region():
+    frame = make_frame()
+    
+    images = encode_detection_images(frame, BBox(100, 200, 300, 400), ImageOutputConfig(mode="crop"))
+    
+    assert [image.kind for image in images] == ["crop"]
+    decoded = cv2.imdecode(np.frombuffer(images[0].data, np.uint8), cv2.IMREAD_COLOR)
+    region = images[0].region
+    assert decoded.shape[:2] == (region.y2 - region.y1, region.x2 - region.x1)
+
+
+def test_both_mode_downscales_thumbnail_and_keeps_frame_untouched():
+    frame = make_frame()
+    original = frame.copy()
+    config = ImageOutputConfig(mode="both", image_format="webp", thumbnail_max_side=480)
+    
+    images = encode_detection_images(frame, BBox(100, 200, 300, 400), config)
+    
+    assert [image.kind for image in images] == ["crop", "thumbnail"]
+    assert all(image.content_type == "image/webp" for image in images)
+    thumbnail = cv2.imdecode(np.frombuffer(images[1].data, np.uint8), cv2.IMREAD_COLOR)
+    assert max(thumbnail.shape[:2]) == 480
+    assert np.array_equal(frame, original)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        ImageOutputConfig(mode="everything")
+
+
+def test_attach_image_urls_prefers_crop():
+    record = {"id": "a", "image_url": None, "metadata": {"frame_number": 1}}
+    
+    updated = attach_image_urls(record, {"thumbnail": "t.jpg", "crop": "c.jpg"})
+    
+    assert updated["image_url"] == "c.jpg"
+    assert updated["metadata"] == {"frame_number": 1, "images": {"thumbnail": "t.jpg", "crop": "c.jpg"}}
+    assert record["image_url"] is None
@@ -0,0 +1,47 @@
+import os
+import sqlite3
+from app.services.local_backend import LocalStorageBackend, normalize_timestamp
+from tests.unit.conftest import make_record, record_id
+
+
+def test_schema_matches_migration_indexes(backend):
+    conn = sqlite3.connect(backend.db_path)
+    indexes = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'road_damage'"
+    )}
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(road_damage)")}
+    conn.close()
+    
+    assert {"idx_road_damage_location", "idx_road_damage_detected_at", "idx_road_damage_type"} <= indexes
+    assert {"road_category", "state", "district", "image_url", "metadata"} <= columns
+
+
+def test_insert_ignores_existing_ids_and_selects_newest_first(backend):
+    backend.insert_records([
+        make_record(0, "2025-01-01T10:00:00"),
+        make_record(1, "2025-01-02T10:00:00+00:00"),
+    ])
+    backend.insert_records([make_record(0, "2025-03-01T10:00:00", severity="high")])
+    
+    rows = backend.select_latest(10)
+    
+    assert [row["id"] for row in rows] == [record_id(1), record_id(0)]
+    assert rows[1]["severity"] == "low"
+    assert rows[1]["metadata"] == {"frame_number": 0}
+    assert rows[1]["road_category"] == "municipal"
+
+
+def test_upload_image_writes_file_and_returns_url(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path), image_base_url="/images/")
+    
+    url = backend.upload_image(b"jpeg-bytes", "abc_crop.jpg", "image/jpeg")
+    backend.close()
+    
+    assert url == "/images/abc_crop.jpg"
+    with open(os.path.join(backend.images_dir, "abc_crop.jpg"), "rb") as f:
+        assert f.read() == b"jpeg-bytes"
+
+
+def test_normalize_timestamp_converts_to_utc():
+    assert normalize_timestamp("2025-01-01T12:00:00+02:00") == "2025-01-01T10:00:00.000000+00:00"
+    assert normalize_timestamp("2025-01-01T10:00:00Z") == "2025-01-01T10:00:00.000000+00:00"
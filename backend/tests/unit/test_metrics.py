@@ -0,0 +1,109 @@
+import asyncio
+import time
+import httpx
+import pytest
+from app.utils.loop_lag import LoopLagMonitor
+from app.utils.metrics import MetricsRegistry, _Metric, bucket_quantile
+from app.utils.timing import StageTimer
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(0.01, 0.1))
+    series = histogram.labels("decode")
+    for value in (0.005, 0.05, 0.05, 3.0):
+        series.observe(value)
+    
+    lines = registry.render().decode().splitlines()
+    
+    assert lines[:2] == ["# HELP stage_seconds Stage time", "# TYPE stage_seconds histogram"]
+    assert 'stage_seconds_bucket{stage="decode",le="0.01"} 1' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="0.1"} 3' in lines
+    assert 'stage_seconds_bucket{stage="decode",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="decode"} 3.105' in lines
+    assert 'stage_seconds_count{stage="decode"} 4' in lines
+
+
+def test_counters_gauges_and_label_checks():
+    registry = MetricsRegistry()
+    frames = registry.counter("frames_total", "Frames")
+    errors = registry.counter("errors_total", "Errors", ["stage"])
+    pending = registry.gauge("pending", "Pending")
+    frames.inc()
+    frames.inc(2)
+    errors.labels('up"load').inc()
+    pending.set_function(lambda: 7)
+    
+    body = registry.render().decode()
+    
+    assert "frames_total 3" in body
+    assert 'errors_total{stage="up\\"load"} 1' in body
+    assert "pending 7" in body
+    with pytest.raises(ValueError):
+        errors.labels()
+    with pytest.raises(ValueError):
+        registry.counter("frames_total", "Again")
+
+
+def test_metric_missing_an_override_fails_on_creation():
+    class Unrendered(_Metric):
+        def _new_child(self):
+            return None
+    
+    with pytest.raises(TypeError):
+        Unrendered("unrendered_total", "Unrendered")
+
+
+def test_stage_timer_exports_to_histogram():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", ["stage"])
+    timer = StageTimer(histogram=histogram)
+    with timer.measure("tracking"):
+        pass
+    timer.add("tracking", 2.0)
+    
+    assert timer.counts["tracking"] == 2
+    assert histogram.labels("tracking").counts[-1] == 0
+    assert sum(histogram.labels("tracking").counts) == 2
+
+
+def test_metrics_endpoint_serves_text_format():
+    from app.main import app
+    
+    async def fetch():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+    
+    response = asyncio.run(fetch())
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE road_damage_stage_seconds histogram" in response.text
+    assert "road_damage_frames_total" in response.text
+
+
+def test_bucket_quantile_interpolates_within_buckets():
+    bounds = (0.01, 0.1, 1.0)
+    counts = [50, 40, 10, 0]
+    
+    assert bucket_quantile(bounds, counts, 0.5) == pytest.approx(0.01)
+    assert bucket_quantile(bounds, counts, 0.7) == pytest.approx(0.055)
+    assert bucket_quantile(bounds, counts, 0.99) == pytest.approx(0.91)
+    assert bucket_quantile(bounds, [0, 0, 0, 5], 0.5) == 1.0
+    assert bucket_quantile(bounds, [0, 0, 0, 0], 0.5) == 0.0
+
+
+def test_loop_lag_monitor_sees_a_blocked_loop():
+    monitor = LoopLagMonitor(interval=0.01)
+    
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+    
+    asyncio.run(run())
+    assert monitor.samples >= 2
+    assert monitor.max_lag >= 0.05
@@ -0,0 +1,29 @@
+import pytest
+from app.services.model_registry import ModelRegistry
+from app.utils.errors import ModelError
+
+
+def test_missing_model_raises_and_is_reported(tmp_path):
+    registry = ModelRegistry(str(tmp_path / "missing.onnx"))
+    with pytest.raises(ModelError):
+        registry.get()
+    
+    assert not registry.is_loaded()
+    status = registry.status()
+    assert status["loaded"] == {}
+    assert str(tmp_path / "missing.onnx") in status["errors"]
+
+
+def test_loaded_model_is_shared():
+    registry = ModelRegistry("default.onnx")
+    sentinel = object()
+    registry._models["default.onnx"] = sentinel
+    registry._load_ms["default.onnx"] = 12.34
+    
+    assert registry.get() is sentinel
+    assert registry.get("default.onnx") is sentinel
+    assert registry.is_loaded()
+    assert registry.status()["loaded"] == {"default.onnx": {"load_ms": 12.3}}
+    
+    registry.close()
+    assert not registry.is_loaded()
@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+from app.services.profiler import SamplingProfiler, profile_paths, save_profile
+
+
+def busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_samples_attached_threads_and_skips_idle_ones(tmp_path):
+    stop = threading.Event()
+    idle = threading.Event()
+    profiler = SamplingProfiler(interval=0.002)
+    worker = threading.Thread(target=profiler.call, args=(busy_loop, stop), name="busy-worker")
+    other = threading.Thread(target=busy_loop, args=(stop,), name="other-job")
+    sleeper = threading.Thread(target=profiler.call, args=(idle.wait,), name="idle-worker")
+    worker.start()
+    other.start()
+    sleeper.start()
+    profiler.start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    idle.set()
+    for thread in (worker, other, sleeper):
+        thread.join()
+    
+    collapsed = profiler.collapsed()
+    assert profiler.samples > 10
+    assert any(line.startswith("busy-worker;") and "busy_loop" in line for line in collapsed.splitlines())
+    assert "idle-worker" not in collapsed
+    # Busy, but not running anything of the profiled job
+    assert "other-job" not in collapsed
+    assert not profiler._attached
+    
+    top = {entry["function"]: entry for entry in profiler.top()}
+    assert top["test_profiler.py:busy_loop"]["total_samples"] > 0
+
+
+def test_save_profile_writes_collapsed_stacks_and_summary(tmp_path):
+    profiler = SamplingProfiler()
+    profiler.stacks[(("main", ""), ("a.py", "outer"), ("b.py", "inner"))] = 3
+    profiler.stacks[(("main", ""), ("a.py", "outer"))] = 1
+    profiler.samples = 4
+    
+    summary = save_profile(profiler, str(tmp_path), "job-1", limit=5)
+    paths = profile_paths(str(tmp_path), "job-1")
+    
+    with open(paths["collapsed"]) as f:
+        assert f.read().splitlines() == ["main;a.py:outer;b.py:inner 3", "main;a.py:outer 1"]
+    with open(paths["summary"]) as f:
+        assert json.load(f) == summary
+    assert summary["top"][0] == {
+        "function": "b.py:inner",
+        "self_samples": 3,
+        "total_samples": 3,
+        "self_pct": 75.0,
+        "total_pct": 75.0
+    }
+    assert summary["top"][1]["function"] == "a.py:outer"
+    assert summary["top"][1]["total_pct"] == 100.0
+
+
+def test_profile_download_requires_a_profiled_job():
+    import asyncio
+    import httpx
+    from app.api.routes import job_status
+    from app.main import app
+    
+    job_status["unprofiled-job"] = {"status": "completed", "processed_frames": 0, "detections_found": 0}
+    
+    async def fetch(path):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path)
+    
+    try:
+        assert asyncio.run(fetch("/api/v1/processing-status/unprofiled-job/profile")).status_code == 404
+        assert asyncio.run(fetch("/api/v1/processing-status/missing/profile")).status_code == 404
+        assert asyncio.run(fetch("/api/v1/processing-status/unprofiled-job/profile?format=pstats")).status_code == 422
+    finally:
+        job_status.pop("unprofiled-job")
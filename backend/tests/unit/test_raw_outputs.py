@@ -0,0 +1,55 @@
+import numpy as np
+from app.services.detection_types import detections_from_array
+from app.services.raw_outputs import RawOutputStore
+from app.utils.hashing import file_sha256
+
+
+def test_round_trip_keeps_rows_above_floor_per_frame(tmp_path):
+    store = RawOutputStore(str(tmp_path))
+    meta = {"frame_width": 1280, "frame_height": 720, "input_width": 640, "input_height": 640}
+    writer = store.writer("videohash", "modelv1", meta, min_confidence=0.1)
+    writer.append(0, np.array([[[10, 10, 50, 50, 1, 0.9], [0, 0, 5, 5, 0, 0.05]]], dtype=np.float32), infer_ms=4.0)
+    writer.append(1, np.empty((0, 6), dtype=np.float32), infer_ms=5.0)
+    writer.append(2, np.array([[100, 100, 200, 300, 2, 0.4]], dtype=np.float32), infer_ms=6.0)
+    writer.close()
+    
+    outputs = store.open("videohash", "modelv1")
+    assert len(outputs) == 3
+    assert outputs.meta["rows"] == 2
+    assert outputs.meta["min_confidence"] == 0.1
+    assert [frame for frame, _ in outputs] == [0, 1, 2]
+    assert [len(rows) for _, rows in outputs] == [1, 0, 1]
+    assert outputs.column("infer_ms").tolist() == [4.0, 5.0, 6.0]
+    
+    assert outputs.scale == (2.0, 1.125)
+    detections = detections_from_array(outputs.rows(2), 0.3, outputs.scale, outputs.frame_size)
+    assert [tuple(d.bbox) for d in detections] == [(200, 112, 400, 337)]
+    assert detections_from_array(outputs.rows(2), 0.5, outputs.scale, outputs.frame_size) == []
+
+
+def test_store_keys_by_video_model_and_variant(tmp_path):
+    store = RawOutputStore(str(tmp_path))
+    assert store.open("videohash", "modelv1") is None
+    
+    store.writer("videohash", "modelv1", {}, variant="stride2").close()
+    assert store.open("videohash", "modelv1") is None
+    assert store.open("videohash", "modelv2", variant="stride2") is None
+    outputs = store.open("videohash", "modelv1", variant="stride2")
+    assert len(outputs) == 0
+    assert outputs.meta["video_hash"] == "videohash"
+    assert outputs.meta["model_version"] == "modelv1"
+    
+    # Rewriting replaces the earlier output
+    writer = store.writer("videohash", "modelv1", {}, variant="stride2")
+    writer.append(0, np.zeros((1, 6), dtype=np.float32) + [0, 0, 1, 1, 0, 1])
+    writer.close()
+    assert len(store.open("videohash", "modelv1", variant="stride2")) == 1
+
+
+def test_file_sha256_matches_hashlib(tmp_path):
+    import hashlib
+    
+    path = tmp_path / "video.bin"
+    data = bytes(range(256)) * 5000
+    path.write_bytes(data)
+    assert file_sha256(str(path), chunk_size=1000) == hashlib.sha256(data).hexdigest()
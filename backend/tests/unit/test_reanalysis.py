@@ -0,0 +1,142 @@
+import asyncio
+import numpy as np
+from app.services.detection_types import BBox, FrameDetection
+from app.services.raw_outputs import RawOutputStore
+from app.services.reanalysis import diff_run, run_detection, run_manifest, track_raw_outputs
+
+
+def write_outputs(tmp_path):
+    store = RawOutputStore(str(tmp_path))
+    meta = {"frame_width": 640, "frame_height": 640, "input_width": 640, "input_height": 640}
+    writer = store.writer("video", "model", meta, min_confidence=0.05)
+    box = [100, 100, 200, 200]
+    writer.append(0, np.array([box + [0, 0.9], [300, 300, 350, 350, 1, 0.4]], dtype=np.float32))
+    # The same crack again, then a new pothole
+    writer.append(1, np.array([[102, 101, 201, 199, 0, 0.8]], dtype=np.float32))
+    writer.append(2, np.array([[400, 400, 450, 480, 1, 0.6]], dtype=np.float32))
+    return writer.close()
+
+
+def test_track_raw_outputs_filters_and_deduplicates(tmp_path):
+    outputs = write_outputs(tmp_path)
+    
+    unique, frames = track_raw_outputs(outputs, 0.5, 0.5, 30)
+    assert frames == 3
+    assert [(frame, tuple(d.bbox)) for frame, d in unique] == [(0, (100, 100, 200, 200)), (2, (400, 400, 450, 480))]
+    
+    # A lower threshold keeps the weak box
+    unique, _ = track_raw_outputs(outputs, 0.3, 0.5, 30)
+    assert len(unique) == 3
+    
+    unique, frames = track_raw_outputs(outputs, 0.5, 0.5, 30, frame_stride=2)
+    assert frames == 2
+    assert [frame for frame, _ in unique] == [0, 2]
+
+
+def test_diff_run_reports_added_removed_and_unchanged():
+    kept = FrameDetection(BBox(100, 100, 200, 200), 0, 0.9)
+    dropped = FrameDetection(BBox(300, 300, 350, 350), 1, 0.4)
+    new = FrameDetection(BBox(400, 400, 450, 480), 1, 0.6)
+    previous = [run_detection("a", 0, kept), run_detection("b", 0, dropped)]
+    
+    diff = diff_run(previous, [(0, kept), (2, new)])
+    assert diff.added == [(2, new)]
+    assert [entry["id"] for entry in diff.removed] == ["b"]
+    assert [entry["id"] for entry in diff.unchanged] == ["a"]
+    
+    # Same box on another frame is a different detection
+    diff = diff_run(previous, [(1, kept), (0, dropped)])
+    assert [frame for frame, _ in diff.added] == [1]
+    assert [entry["id"] for entry in diff.removed] == ["a"]
+
+
+def test_removed_detections_are_restored_not_stored_again():
+    kept = FrameDetection(BBox(100, 100, 200, 200), 0, 0.9)
+    dropped = FrameDetection(BBox(300, 300, 350, 350), 1, 0.4)
+    original = [run_detection("a", 0, kept), run_detection("b", 0, dropped)]
+    
+    # Raise the threshold: "b" is removed but stays in the manifest
+    manifest, active = run_manifest(diff_run(original, [(0, kept)]), [])
+    assert active == 1
+    assert [(entry["id"], entry.get("superseded", False)) for entry in manifest] == [("a", False), ("b", True)]
+    
+    # Back to the original settings: "b" comes back without a new record
+    diff = diff_run(manifest, [(0, kept), (0, dropped)])
+    assert diff.added == [] and diff.removed == []
+    assert diff.restored == [original[1]]
+    manifest, active = run_manifest(diff, [])
+    assert active == 2 and not any(entry.get("superseded") for entry in manifest)
+    
+    # Still dropped on a third run: neither removed again nor restored
+    diff = diff_run(run_manifest(diff_run(original, [(0, kept)]), [])[0], [(0, kept)])
+    assert diff.removed == [] and [entry["id"] for entry in diff.superseded] == ["b"]
+
+
+def test_reanalyze_requires_kept_raw_output(tmp_path):
+    import httpx
+    from app.main import app
+    
+    class Resources:
+        raw_output_store = RawOutputStore(str(tmp_path))
+    
+    async def post(path):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path)
+    
+    previous = getattr(app.state, "resources", None)
+    app.state.resources = Resources()
+    try:
+        response = asyncio.run(post("/api/v1/reanalyze/unknown-job"))
+        assert response.status_code == 404
+        assert "keep_raw" in response.json()["detail"]
+        assert asyncio.run(post("/api/v1/reanalyze/unknown-job?confidence_threshold=2")).status_code == 422
+    finally:
+        app.state.resources = previous
+
+
+def test_reanalysis_failure_after_storing_marks_the_job_failed(tmp_path):
+    import httpx
+    from app.api.routes import job_status
+    from app.main import app
+    
+    class FullStore(RawOutputStore):
+        def save_run(self, job_id, run):
+            if run.get("reanalysis_of"):
+                raise OSError("No space left on device")
+            super().save_run(job_id, run)
+    
+    class Storage:
+        async def insert_damage_record(self, detection, image, frame_number, video_filename):
+            return f"id-{frame_number}"
+        
+        async def flush(self):
+            return 0
+    
+    class Resources:
+        raw_output_store = FullStore(str(tmp_path))
+        storage_service = Storage()
+    
+    write_outputs(tmp_path)
+    Resources.raw_output_store.save_run("job-1", {
+        "video_hash": "video",
+        "model_version": "model",
+        "video_filename": "drive.mp4",
+        "detections": []
+    })
+    
+    async def post(path):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path)
+    
+    previous = getattr(app.state, "resources", None)
+    app.state.resources = Resources()
+    try:
+        response = asyncio.run(post("/api/v1/reanalyze/job-1?confidence_threshold=0.5"))
+    finally:
+        app.state.resources = previous
+    assert response.status_code == 500
+    assert "No space left" in response.json()["detail"]
+    [status] = [status for status in job_status.values() if status.get("reanalysis_of") == "job-1"]
+    assert status["status"] == "failed"
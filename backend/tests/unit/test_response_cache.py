@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from app.services.response_cache import ResponseCache, etag_matches
+
+
+class CountingLoader:
+    def __init__(self, body=b"[]", delay=0.0):
+        self.body = body
+        self.delay = delay
+        self.calls = 0
+    
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.body
+
+
+def test_second_lookup_is_a_hit_until_invalidated():
+    async def scenario():
+        cache = ResponseCache(ttl_seconds=60)
+        loader = CountingLoader()
+        first = await cache.get_or_load("k", loader)
+        second = await cache.get_or_load("k", loader)
+        cache.invalidate()
+        third = await cache.get_or_load("k", loader)
+        return cache, loader, first, second, third
+    
+    cache, loader, first, second, third = asyncio.run(scenario())
+    
+    assert (first.hit, second.hit, third.hit) == (False, True, False)
+    assert first.etag == second.etag == third.etag
+    assert loader.calls == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_expired_entries_are_reloaded():
+    async def scenario():
+        cache = ResponseCache(ttl_seconds=0.01)
+        loader = CountingLoader()
+        await cache.get_or_load("k", loader)
+        await asyncio.sleep(0.02)
+        return await cache.get_or_load("k", loader), loader
+    
+    result, loader = asyncio.run(scenario())
+    
+    assert not result.hit
+    assert loader.calls == 2
+
+
+def test_concurrent_misses_share_one_load():
+    async def scenario():
+        cache = ResponseCache()
+        loader = CountingLoader(delay=0.01)
+        results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(10)])
+        return results, loader
+    
+    results, loader = asyncio.run(scenario())
+    
+    assert loader.calls == 1
+    assert sum(not r.hit for r in results) == 1
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    async def scenario():
+        cache = ResponseCache()
+        loader = CountingLoader(delay=0.01)
+        load = asyncio.create_task(cache.get_or_load("k", loader))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        await load
+        return cache
+    
+    cache = asyncio.run(scenario())
+    
+    assert cache.stats()["entries"] == 0
+
+
+def test_failed_load_propagates_and_is_not_cached():
+    async def failing():
+        raise RuntimeError("storage down")
+    
+    async def scenario():
+        cache = ResponseCache()
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("k", failing)
+        return cache
+    
+    assert asyncio.run(scenario()).stats()["entries"] == 0
+
+
+def test_etag_matching_handles_lists_and_weak_tags():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
@@ -0,0 +1,81 @@
+import asyncio
+from app.services.local_backend import LocalStorageBackend
+from app.services.rollups import summarize_rollups
+from app.services.storage_service import DamageStorageService
+from tests.unit.conftest import make_record, record_id
+
+
+def test_rollups_stay_in_step_with_inserts_updates_and_deletes(backend):
+    backend.insert_records([make_record(i) for i in range(12)])
+    # An existing id and a repeat within the batch count once
+    backend.insert_records([make_record(0, damage_type="manhole"), make_record(12), make_record(12)])
+    backend._write_conn.execute("UPDATE road_damage SET state = 'Bayern' WHERE id = ?", (record_id(1),))
+    backend._write_conn.execute("DELETE FROM road_damage WHERE id = ?", (record_id(2),))
+    
+    incremental = summarize_rollups(backend.select_rollups())
+    backend.rebuild_rollups()
+    rebuilt = summarize_rollups(backend.select_rollups())
+    
+    assert incremental == rebuilt
+    assert incremental["total"] == 12
+    assert incremental["by_damage_type"] == {"crack": 6, "pothole": 6}
+    assert incremental["by_state"] == {"Bayern": 1, "unknown": 11}
+    assert incremental["confidence_histogram"] == {"0.5": 4, "0.6": 3, "0.7": 2, "0.8": 3}
+
+
+def test_row_insert_trigger_of_older_databases_is_dropped(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    backend._write_conn.execute(
+        "CREATE TRIGGER road_damage_rollups_insert AFTER INSERT ON road_damage BEGIN "
+        "INSERT INTO road_damage_rollups (dimension, bucket, count) VALUES ('total', 'all', 1) "
+        "ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count; END"
+    )
+    backend.close()
+    
+    reopened = LocalStorageBackend(str(tmp_path))
+    reopened.insert_records([make_record(i) for i in range(3)])
+    total = summarize_rollups(reopened.select_rollups())["total"]
+    reopened.close()
+    
+    assert total == 3
+
+
+def test_existing_database_is_backfilled_on_open(tmp_path):
+    backend = LocalStorageBackend(str(tmp_path))
+    backend.insert_records([make_record(i) for i in range(3)])
+    backend._write_conn.execute("DROP TABLE road_damage_rollups")
+    backend.close()
+    
+    reopened = LocalStorageBackend(str(tmp_path))
+    total = summarize_rollups(reopened.select_rollups())["total"]
+    reopened.close()
+    
+    assert total == 3
+
+
+def test_summarize_limits_day_series_to_recent_days():
+    rows = [
+        {"dimension": "day", "bucket": "2025-01-03", "count": 1},
+        {"dimension": "day", "bucket": "2025-01-01", "count": 2},
+        {"dimension": "day", "bucket": "2025-01-02", "count": 0},
+        {"dimension": "total", "bucket": "all", "count": 3},
+    ]
+    
+    summary = summarize_rollups(rows, days=1)
+    
+    assert summary["total"] == 3
+    assert summary["by_day"] == {"2025-01-03": 1}
+
+
+def test_storage_service_statistics(tmp_path):
+    async def scenario():
+        service = DamageStorageService(LocalStorageBackend(str(tmp_path)))
+        await service.insert_records([make_record(i) for i in range(4)])
+        statistics = await service.get_statistics()
+        await service.close()
+        return statistics
+    
+    statistics = asyncio.run(scenario())
+    
+    assert statistics["total"] == 4
+    assert statistics["by_severity"] == {"low": 2, "medium": 1, "high": 1}
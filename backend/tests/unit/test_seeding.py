@@ -0,0 +1,63 @@
+import sqlite3
+from datetime import datetime, timezone
+import cv2
+import numpy as np
+import pytest
+from app.services.local_backend import LocalStorageBackend
+from seed_with_images import generate_records, generate_sample_image, seed_database_with_images
+
+BASE_TIME = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def test_records_are_reproducible_from_the_seed():
+    urls = {"crack": ["c0", "c1"], "pothole": ["p0"], "patch": ["pa0"], "manhole": ["m0"]}
+    
+    first = generate_records(0, 500, 7, BASE_TIME, urls)
+    assert first == generate_records(0, 500, 7, BASE_TIME, urls)
+    assert first != generate_records(0, 500, 8, BASE_TIME, urls)
+    assert len({record["id"] for record in first}) == 500
+    # Ids depend only on the seed and index, so a re-inserted chunk is skipped
+    assert [record["id"] for record in generate_records(250, 500, 7, BASE_TIME, urls)] == \
+        [record["id"] for record in first[250:]]
+    assert all(record["image_url"] in urls[record["damage_type"]] for record in first)
+    assert {record["damage_type"] for record in first} == set(urls)
+
+
+def test_sample_image_is_a_labelled_jpeg():
+    data = generate_sample_image("pothole", 3, np.random.default_rng(0))
+    assert data == generate_sample_image("pothole", 3, np.random.default_rng(0))
+    
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape == (480, 640, 3)
+
+
+def test_resume_after_failed_insert_completes_without_duplicates(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(str(tmp_path / "data"))
+    progress_file = str(tmp_path / "progress.json")
+    options = dict(count=950, seed=3, image_pool=8, chunk_size=100, insert_concurrency=2, retries=0,
+                   progress_file=progress_file)
+    
+    insert = backend.insert_records
+    calls = []
+    
+    def failing_insert(records):
+        calls.append(len(records))
+        if len(calls) == 5:
+            raise RuntimeError("connection reset")
+        insert(records)
+    
+    monkeypatch.setattr(backend, "insert_records", failing_insert)
+    with pytest.raises(RuntimeError):
+        seed_database_with_images(backend, **options)
+    monkeypatch.setattr(backend, "insert_records", insert)
+    
+    with pytest.raises(ValueError, match="other settings"):
+        seed_database_with_images(backend, **{**options, "count": 10}, resume=True)
+    seed_database_with_images(backend, **options, resume=True)
+    backend.close()
+    
+    conn = sqlite3.connect(str(tmp_path / "data" / "road_damage.db"))
+    rows, ids = conn.execute("SELECT COUNT(*), COUNT(DISTINCT id) FROM road_damage").fetchone()
+    conn.close()
+    assert rows == ids == 950
+    assert len(list((tmp_path / "data" / "damage-images").iterdir())) == 8
@@ -0,0 +1,145 @@
+import asyncio
+import os
+import pytest
+from app.services.spool import DetectionSpool, SpoolDrainer
+from app.services.image_encoder import EncodedImage
+
+
+class FakeStorage:
+    def __init__(self, fail_uploads: bool = False, fail_inserts: bool = False, poison_ids=()):
+        self.fail_uploads = fail_uploads
+        self.fail_inserts = fail_inserts
+        self.poison_ids = set(poison_ids)
+        self.uploaded = {}
+        self.inserted = []
+    
+    async def upload_image_bytes(self, image_bytes, filename, content_type):
+        if self.fail_uploads:
+            raise RuntimeError("storage unreachable")
+        self.uploaded[filename] = image_bytes
+        return f"https://storage.test/{filename}"
+    
+    async def insert_records(self, records):
+        if self.fail_inserts:
+            raise RuntimeError("database unreachable")
+        if any(record["id"] in self.poison_ids for record in records):
+            raise ValueError("invalid input syntax")
+        self.inserted.extend(records)
+
+
+def make_spool(tmp_path, count=3):
+    spool = DetectionSpool(str(tmp_path))
+    for i in range(count):
+        images = [
+            EncodedImage("crop", b"crop", "image/jpeg", ".jpg", 1.0),
+            EncodedImage("thumbnail", b"thumb", "image/jpeg", ".jpg", 1.0),
+        ]
+        spool.put(f"id-{i}", {"id": f"id-{i}", "damage_type": "crack", "metadata": {}}, images)
+    return spool
+
+
+def test_claim_leases_entries(tmp_path):
+    spool = make_spool(tmp_path)
+    
+    first = spool.claim_due(10)
+    second = spool.claim_due(10)
+    
+    assert sorted(e.id for e in first) == ["id-0", "id-1", "id-2"]
+    assert second == []
+    assert spool.pending_count() == 3
+
+
+def test_spool_survives_reopen(tmp_path):
+    make_spool(tmp_path).close()
+    
+    reopened = DetectionSpool(str(tmp_path))
+    
+    assert reopened.pending_count() == 3
+
+
+def test_drainer_uploads_and_completes(tmp_path):
+    spool = make_spool(tmp_path)
+    storage = FakeStorage()
+    drainer = SpoolDrainer(spool, storage, batch_size=10)
+    
+    drained = asyncio.run(drainer.drain_once())
+    
+    assert drained == 3
+    assert spool.pending_count() == 0
+    assert sorted(r["id"] for r in storage.inserted) == ["id-0", "id-1", "id-2"]
+    assert storage.inserted[0]["image_url"].endswith("_crop.jpg")
+    assert set(storage.inserted[0]["metadata"]["images"]) == {"crop", "thumbnail"}
+    assert len(storage.uploaded) == 6
+    assert os.listdir(spool.images_dir) == []
+
+
+@pytest.mark.parametrize("storage", [FakeStorage(fail_uploads=True), FakeStorage(fail_inserts=True)])
+def test_drainer_reschedules_failures(tmp_path, storage):
+    spool = make_spool(tmp_path)
+    drainer = SpoolDrainer(spool, storage, batch_size=10, retry_base_seconds=60)
+    
+    asyncio.run(drainer.drain_once())
+    
+    assert spool.pending_count() == 3
+    assert drainer.failures == 3
+    assert spool.claim_due(10) == []
+
+
+def test_poison_record_does_not_block_its_batch(tmp_path):
+    spool = make_spool(tmp_path)
+    storage = FakeStorage(poison_ids={"id-1"})
+    drainer = SpoolDrainer(spool, storage, batch_size=10, retry_base_seconds=60)
+    
+    asyncio.run(drainer.drain_once())
+    
+    assert sorted(r["id"] for r in storage.inserted) == ["id-0", "id-2"]
+    assert spool.pending_count() == 1
+    assert drainer.failures == 1
+
+
+def test_entry_is_dead_lettered_after_max_attempts(tmp_path):
+    spool = make_spool(tmp_path, count=1)
+    drainer = SpoolDrainer(
+        spool,
+        FakeStorage(poison_ids={"id-0"}),
+        retry_base_seconds=0,
+        retry_max_seconds=0,
+        max_attempts=3
+    )
+    
+    for _ in range(3):
+        asyncio.run(drainer.drain_once())
+    
+    assert spool.pending_count() == 0
+    assert spool.claim_due(10) == []
+    assert drainer.stats()["dead_lettered"] == 1
+    attempts, error = spool._conn.execute(
+        "SELECT attempts, last_error FROM failed_detections WHERE id = 'id-0'"
+    ).fetchone()
+    assert attempts == 3 and "invalid input" in error
+    # Images stay on disk alongside the failed entry
+    assert len(os.listdir(spool.images_dir)) == 2
+
+
+def test_backoff_grows_and_is_capped(tmp_path):
+    drainer = SpoolDrainer(make_spool(tmp_path), FakeStorage(), retry_base_seconds=1, retry_max_seconds=30)
+    
+    assert 0.5 <= drainer.backoff_delay(0) <= 1
+    assert 4 <= drainer.backoff_delay(3) <= 8
+    assert drainer.backoff_delay(20) <= 30
+
+
+def test_stop_returns_when_woken_at_the_same_time(tmp_path):
+    drainer = SpoolDrainer(make_spool(tmp_path, count=0), FakeStorage(), poll_interval=5)
+    
+    async def run():
+        drainer.start()
+        task = drainer._task
+        await asyncio.sleep(0.05)
+        # The wake and the cancellation land in the same loop iteration
+        drainer.wake()
+        await asyncio.wait_for(asyncio.shield(drainer.stop()), timeout=2)
+        return task
+    
+    task = asyncio.run(run())
+    assert task.done()
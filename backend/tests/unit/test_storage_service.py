@@ -0,0 +1,30 @@
+import asyncio
+import numpy as np
+from app.services.detection_types import BBox, FrameDetection
+from app.services.local_backend import LocalStorageBackend
+from app.services.storage_service import DamageStorageService
+
+
+def test_store_detection_returns_before_encoding_and_flush_persists(tmp_path):
+    async def scenario():
+        service = DamageStorageService(LocalStorageBackend(str(tmp_path)))
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+        ids = []
+        for frame_number in range(5):
+            ids.append(await service.store_detection(
+                FrameDetection(BBox(10, 10, 60, 60), 1, 0.8),
+                frame,
+                frame_number,
+                "clip.mp4"
+            ))
+        await service.flush()
+        rows = service.backend.select_latest(10)
+        await service.close()
+        return ids, rows, service
+    
+    ids, rows, service = asyncio.run(scenario())
+    
+    assert sorted(row["id"] for row in rows) == sorted(ids)
+    assert all(row["image_url"].endswith("_crop.jpg") for row in rows)
+    assert service.pending_detections == 0
+    assert service.failed_detections == 0
@@ -0,0 +1,25 @@
+from app.utils.timing import StageTimer
+
+
+def test_add_accumulates_per_stage():
+    timer = StageTimer()
+    timer.add("encode", 2.0)
+    timer.add("encode", 4.0)
+    timer.add("decode", 1.0)
+    
+    summary = timer.summary()
+    
+    assert summary["encode"] == {"count": 2, "total_ms": 6.0, "avg_ms": 3.0, "max_ms": 4.0}
+    assert summary["decode"]["count"] == 1
+
+
+def test_measure_records_even_when_block_raises():
+    timer = StageTimer()
+    try:
+        with timer.measure("inference"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    
+    assert timer.counts["inference"] == 1
+    assert timer.totals_ms["inference"] >= 0.0
@@ -0,0 +1,145 @@
+import asyncio
+import os
+from app.services.video_index import ProcessedVideoIndex, settings_key
+
+SETTINGS = {"confidence_threshold": 0.5, "iou_threshold": 0.5, "tracking_window_size": 30, "frame_stride": 1}
+
+
+def test_lookup_matches_hash_model_and_settings(tmp_path):
+    index = ProcessedVideoIndex(str(tmp_path / "index.db"))
+    assert index.lookup("abc", "model1", SETTINGS) is None
+    
+    index.record("abc", "model1", SETTINGS, "job-1", "drive.mp4", 300, 12)
+    previous = index.lookup("abc", "model1", dict(reversed(list(SETTINGS.items()))))
+    assert previous.job_id == "job-1"
+    assert previous.detections_found == 12
+    assert previous.settings == SETTINGS
+    
+    assert index.lookup("abc", "model2", SETTINGS) is None
+    assert index.lookup("abd", "model1", SETTINGS) is None
+    assert index.lookup("abc", "model1", {**SETTINGS, "confidence_threshold": 0.6}) is None
+    
+    # Reprocessing replaces the earlier job, and the index survives a reopen
+    index.record("abc", "model1", SETTINGS, "job-2", "drive.mp4", 300, 11)
+    index.close()
+    reopened = ProcessedVideoIndex(str(tmp_path / "index.db"))
+    assert reopened.lookup("abc", "model1", SETTINGS).job_id == "job-2"
+    assert reopened.count() == 1
+    reopened.close()
+
+
+def test_settings_key_ignores_order():
+    assert settings_key({"a": 1, "b": 2}) == settings_key({"b": 2, "a": 1})
+    assert settings_key({"a": 1}) != settings_key({"a": 2})
+
+
+def test_oversized_upload_is_rejected_and_removed(tmp_path, monkeypatch):
+    import httpx
+    from app.config import settings
+    from app.main import app
+    
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "max_video_size_mb", 1)
+    monkeypatch.setattr(settings, "upload_chunk_size_kb", 64)
+    
+    async def upload():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(
+                "/api/v1/process-video",
+                files={"video": ("big.mp4", b"\0" * (1024 * 1024 + 1), "video/mp4")}
+            )
+    
+    previous = getattr(app.state, "resources", None)
+    app.state.resources = object()
+    try:
+        response = asyncio.run(upload())
+    finally:
+        app.state.resources = previous
+    assert response.status_code == 400
+    assert "1MB" in response.json()["detail"]
+    assert os.listdir(tmp_path / "uploads") == []
+
+
+def write_video(path, frames=3):
+    import cv2
+    import numpy as np
+    
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for value in range(frames):
+        writer.write(np.full((48, 64, 3), 40 * value, dtype=np.uint8))
+    writer.release()
+
+
+def test_video_with_lost_detections_is_partial_and_not_indexed(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.api import routes
+    from app.config import settings
+    from app.services.detection_types import BBox, FrameDetection
+    
+    class Model:
+        version = "model1"
+        
+        def infer(self, frame, min_confidence=None, timer=None):
+            # One new box per frame so the tracker keeps all of them
+            offset = int(frame[0, 0, 0])
+            return [FrameDetection(BBox(offset, 0, offset + 10, 10), 0, 0.9)]
+    
+    class Registry:
+        def get(self):
+            return Model()
+    
+    class WriteBuffer:
+        dead_lettered = 0
+    
+    class Storage:
+        def __init__(self, fail_every):
+            self.fail_every = fail_every
+            self.failed_detections = 0
+            self.write_buffer = WriteBuffer()
+            self.calls = 0
+        
+        async def store_detection(self, detection, image, frame_number, video_filename):
+            self.calls += 1
+            # Every fail_every-th detection is lost in the background write
+            if self.fail_every and self.calls % self.fail_every == 0:
+                self.failed_detections += 1
+            return f"id-{self.calls}"
+        
+        async def flush(self):
+            return 0
+        
+        def image_stats(self):
+            return {}
+    
+    class Resources:
+        model_registry = Registry()
+        video_index = ProcessedVideoIndex(str(tmp_path / "index.db"))
+        frame_index = None
+        inference_executor = ThreadPoolExecutor(max_workers=1)
+    
+    monkeypatch.setattr(settings, "raw_outputs_enabled", False)
+    
+    def run(job_id, video_hash, storage):
+        path = tmp_path / f"{job_id}.avi"
+        write_video(path)
+        Resources.storage_service = storage
+        routes.job_status[job_id] = {
+            "status": "processing",
+            "processed_frames": 0,
+            "detections_found": 0,
+            "frames_from_index": 0,
+            "error_message": None
+        }
+        asyncio.run(routes.process_video_task(Resources, job_id, str(path), "drive.avi", video_hash=video_hash))
+        return routes.job_status.pop(job_id)
+    
+    partial = run("job-partial", "abc", Storage(fail_every=2))
+    assert partial["status"] == "partial"
+    assert partial["error_message"] == "1 detections could not be stored"
+    assert Resources.video_index.lookup("abc", "model1", routes._dedup_settings()) is None
+    
+    completed = run("job-complete", "def", Storage(fail_every=0))
+    assert completed["status"] == "completed"
+    assert Resources.video_index.lookup("def", "model1", routes._dedup_settings()).job_id == "job-complete"
+    Resources.video_index.close()
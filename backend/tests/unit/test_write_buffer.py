@@ -0,0 +1,143 @@
+import asyncio
+import pytest
+from app.services.write_buffer import DamageWriteBuffer
+
+
+class RecordingSink:
+    def __init__(self, fail_times: int = 0):
+        self.batches = []
+        self.fail_times = fail_times
+    
+    async def __call__(self, records):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("insert failed")
+        self.batches.append(list(records))
+
+
+def test_flushes_when_batch_size_reached():
+    async def scenario():
+        sink = RecordingSink()
+        buffer = DamageWriteBuffer(sink, max_batch_size=3, flush_interval=60)
+        for i in range(7):
+            await buffer.add({"id": i})
+        await buffer.close()
+        return sink, buffer
+    
+    sink, buffer = asyncio.run(scenario())
+    
+    assert [len(b) for b in sink.batches] == [3, 3, 1]
+    assert buffer.records_flushed == 7
+    assert len(buffer.batch_latencies_ms) == 3
+
+
+def test_flushes_after_interval():
+    async def scenario():
+        sink = RecordingSink()
+        buffer = DamageWriteBuffer(sink, max_batch_size=100, flush_interval=0.01)
+        await buffer.add({"id": 1})
+        await asyncio.sleep(0.05)
+        return sink, buffer
+    
+    sink, buffer = asyncio.run(scenario())
+    
+    assert sink.batches == [[{"id": 1}]]
+    assert buffer.pending == 0
+
+
+def test_failed_batch_is_retained_for_retry():
+    async def scenario():
+        sink = RecordingSink(fail_times=1)
+        buffer = DamageWriteBuffer(sink, max_batch_size=100, flush_interval=60)
+        await buffer.add({"id": 1})
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        pending = buffer.pending
+        await buffer.add({"id": 2})
+        await buffer.close()
+        return sink, buffer, pending
+    
+    sink, buffer, pending = asyncio.run(scenario())
+    
+    assert pending == 1
+    assert sink.batches == [[{"id": 1}, {"id": 2}]]
+    assert buffer.failed_batches == 1
+
+
+class PoisonSink:
+    """Rejects any batch holding a record marked bad, or everything while down"""
+    
+    def __init__(self):
+        self.batches = []
+        self.down = False
+    
+    async def __call__(self, records):
+        if self.down or any(record.get("bad") for record in records):
+            raise ValueError("violates check constraint")
+        self.batches.append(list(records))
+
+
+def test_poison_record_is_isolated_and_dead_lettered():
+    async def scenario():
+        sink = PoisonSink()
+        dead = []
+        buffer = DamageWriteBuffer(
+            sink, max_batch_size=100, flush_interval=60, max_attempts=2,
+            on_dead_letter=lambda record, error: dead.append(record["id"])
+        )
+        for i in range(10):
+            await buffer.add({"id": i, "bad": i == 6})
+        with pytest.raises(ValueError):
+            await buffer.flush()
+        written = await buffer.flush()
+        return sink, buffer, dead, written
+    
+    sink, buffer, dead, written = asyncio.run(scenario())
+    
+    assert written == 9 and buffer.pending == 0
+    assert sorted(record["id"] for batch in sink.batches for record in batch) == [0, 1, 2, 3, 4, 5, 7, 8, 9]
+    assert dead == [6] and buffer.dead_lettered == 1
+    assert buffer.dead_letters[0]["record"]["id"] == 6
+
+
+def test_outage_is_not_mistaken_for_poison_records():
+    async def scenario():
+        sink = PoisonSink()
+        sink.down = True
+        buffer = DamageWriteBuffer(sink, max_batch_size=100, flush_interval=60, max_attempts=2)
+        for i in range(64):
+            await buffer.add({"id": i})
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await buffer.flush()
+        pending = buffer.pending
+        sink.down = False
+        await buffer.close()
+        return sink, buffer, pending
+    
+    sink, buffer, pending = asyncio.run(scenario())
+    
+    assert pending == 64
+    assert buffer.dead_lettered == 0
+    assert sum(len(batch) for batch in sink.batches) == 64
+
+
+def test_add_waits_for_room_when_buffer_is_full():
+    async def scenario():
+        sink = PoisonSink()
+        sink.down = True
+        buffer = DamageWriteBuffer(sink, max_batch_size=2, flush_interval=0.01, max_pending=4)
+        for i in range(4):
+            await buffer.add({"id": i})
+        blocked = asyncio.create_task(buffer.add({"id": 4}))
+        await asyncio.sleep(0.05)
+        waiting = not blocked.done() and buffer.pending == 4
+        sink.down = False
+        await asyncio.wait_for(blocked, 1)
+        await buffer.close()
+        return sink, buffer, waiting
+    
+    sink, buffer, waiting = asyncio.run(scenario())
+    
+    assert waiting and buffer.backpressure_waits == 1
+    assert sorted(record["id"] for batch in sink.batches for record in batch) == [0, 1, 2, 3, 4]
@@ -52,15 +52,14 @@ def check_env_file():
     
     print("✓ .env file exists")
     
-    required_vars = [
-        'SUPABASE_URL',
-        'SUPABASE_KEY',
-        'MODEL_PATH'
-    ]
-    
     from dotenv import load_dotenv
     load_dotenv()
     
+    # The local backend needs no credentials
+    required_vars = ['MODEL_PATH']
+    if os.getenv('STORAGE_BACKEND', 'supabase') == 'supabase':
+        required_vars = ['SUPABASE_URL', 'SUPABASE_KEY'] + required_vars
+    
     missing = []
     for var in required_vars:
         if not os.getenv(var):
@@ -0,0 +1,90 @@
+-- Statistics rollups for road_damage, kept current by triggers so that
+-- dashboard statistics read a few hundred bucket rows instead of every
+-- detection. The bucket definitions mirror backend/app/services/rollups.py.
+CREATE TABLE public.road_damage_rollups (
+  dimension TEXT NOT NULL,
+  bucket TEXT NOT NULL,
+  count BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (dimension, bucket)
+);
+
+ALTER TABLE public.road_damage_rollups ENABLE ROW LEVEL SECURITY;
+
+-- Aggregates are public, like the statistics table
+CREATE POLICY "Anyone can view road damage rollups"
+  ON public.road_damage_rollups FOR SELECT
+  USING (true);
+
+-- Buckets a single road_damage row counts towards
+CREATE OR REPLACE FUNCTION public.road_damage_rollup_buckets(r public.road_damage)
+RETURNS TABLE (dimension TEXT, bucket TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  VALUES
+    ('total', 'all'),
+    ('damage_type', r.damage_type),
+    ('severity', r.severity),
+    ('state', COALESCE(r.state, 'unknown')),
+    ('road_category', r.road_category),
+    ('day', to_char(r.detected_at AT TIME ZONE 'UTC', 'YYYY-MM-DD')),
+    ('confidence', CASE
+      WHEN r.confidence_score IS NULL THEN 'unknown'
+      ELSE to_char(LEAST(GREATEST(floor(r.confidence_score * 10), 0), 9) / 10.0, 'FM0.0')
+    END)
+$$;
+
+CREATE OR REPLACE FUNCTION public.apply_road_damage_rollups()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+    SELECT b.dimension, b.bucket, -1 FROM public.road_damage_rollup_buckets(OLD) b
+    ON CONFLICT (dimension, bucket) DO UPDATE
+      SET count = road_damage_rollups.count + EXCLUDED.count;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+    SELECT b.dimension, b.bucket, 1 FROM public.road_damage_rollup_buckets(NEW) b
+    ON CONFLICT (dimension, bucket) DO UPDATE
+      SET count = road_damage_rollups.count + EXCLUDED.count;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER road_damage_rollups_changed
+  AFTER INSERT OR UPDATE OR DELETE ON public.road_damage
+  FOR EACH ROW
+  EXECUTE FUNCTION public.apply_road_damage_rollups();
+
+-- Recompute every rollup from scratch (backend: python rebuild_stats.py)
+CREATE OR REPLACE FUNCTION public.rebuild_road_damage_rollups()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  LOCK TABLE public.road_damage IN SHARE MODE;
+  DELETE FROM public.road_damage_rollups WHERE true;
+  INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+  SELECT b.dimension, b.bucket, COUNT(*)
+  FROM public.road_damage r
+  CROSS JOIN LATERAL public.road_damage_rollup_buckets(r) b
+  GROUP BY b.dimension, b.bucket;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.rebuild_road_damage_rollups() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.rebuild_road_damage_rollups() TO service_role;
+
+-- Backfill existing detections
+SELECT public.rebuild_road_damage_rollups();
@@ -0,0 +1,126 @@
+-- Apply road_damage rollups once per statement instead of once per row.
+-- The row trigger upserted every bucket of every inserted row, so each
+-- batch insert from the backend's write buffer queued on the same hot rows
+-- (the total and today's day bucket) once per row, and concurrent batches
+-- could deadlock taking them in different orders. Statement triggers read
+-- the changed rows from transition tables and upsert each bucket once, in
+-- a fixed order. Rollup counts are unchanged.
+
+-- Buckets of one row from its columns, so transition table rows can use it
+CREATE OR REPLACE FUNCTION public.road_damage_rollup_buckets(
+  _damage_type TEXT,
+  _severity TEXT,
+  _state TEXT,
+  _road_category TEXT,
+  _detected_at TIMESTAMP WITH TIME ZONE,
+  _confidence_score DECIMAL
+)
+RETURNS TABLE (dimension TEXT, bucket TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  VALUES
+    ('total', 'all'),
+    ('damage_type', _damage_type),
+    ('severity', _severity),
+    ('state', COALESCE(_state, 'unknown')),
+    ('road_category', _road_category),
+    ('day', to_char(_detected_at AT TIME ZONE 'UTC', 'YYYY-MM-DD')),
+    ('confidence', CASE
+      WHEN _confidence_score IS NULL THEN 'unknown'
+      ELSE to_char(LEAST(GREATEST(floor(_confidence_score * 10), 0), 9) / 10.0, 'FM0.0')
+    END)
+$$;
+
+-- The row form, used by rebuild_road_damage_rollups, shares the definition
+CREATE OR REPLACE FUNCTION public.road_damage_rollup_buckets(r public.road_damage)
+RETURNS TABLE (dimension TEXT, bucket TEXT)
+LANGUAGE sql
+IMMUTABLE
+SET search_path = public
+AS $$
+  SELECT * FROM public.road_damage_rollup_buckets(
+    r.damage_type, r.severity, r.state, r.road_category, r.detected_at, r.confidence_score
+  )
+$$;
+
+CREATE OR REPLACE FUNCTION public.apply_road_damage_rollups()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  -- old_rows and new_rows only exist for the events that declare them;
+  -- PL/pgSQL plans each branch when it first runs
+  IF TG_OP = 'INSERT' THEN
+    INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+    SELECT b.dimension, b.bucket, COUNT(*)
+    FROM new_rows r
+    CROSS JOIN LATERAL public.road_damage_rollup_buckets(
+      r.damage_type, r.severity, r.state, r.road_category, r.detected_at, r.confidence_score
+    ) b
+    GROUP BY b.dimension, b.bucket
+    ORDER BY b.dimension, b.bucket
+    ON CONFLICT (dimension, bucket) DO UPDATE
+      SET count = road_damage_rollups.count + EXCLUDED.count;
+  ELSIF TG_OP = 'DELETE' THEN
+    INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+    SELECT b.dimension, b.bucket, -COUNT(*)
+    FROM old_rows r
+    CROSS JOIN LATERAL public.road_damage_rollup_buckets(
+      r.damage_type, r.severity, r.state, r.road_category, r.detected_at, r.confidence_score
+    ) b
+    GROUP BY b.dimension, b.bucket
+    ORDER BY b.dimension, b.bucket
+    ON CONFLICT (dimension, bucket) DO UPDATE
+      SET count = road_damage_rollups.count + EXCLUDED.count;
+  ELSIF TG_OP = 'UPDATE' THEN
+    -- Net change per bucket; most updates leave every bucket as it was
+    INSERT INTO public.road_damage_rollups (dimension, bucket, count)
+    SELECT d.dimension, d.bucket, SUM(d.delta)
+    FROM (
+      SELECT b.dimension, b.bucket, -1 AS delta
+      FROM old_rows r
+      CROSS JOIN LATERAL public.road_damage_rollup_buckets(
+        r.damage_type, r.severity, r.state, r.road_category, r.detected_at, r.confidence_score
+      ) b
+      UNION ALL
+      SELECT b.dimension, b.bucket, 1
+      FROM new_rows r
+      CROSS JOIN LATERAL public.road_damage_rollup_buckets(
+        r.damage_type, r.severity, r.state, r.road_category, r.detected_at, r.confidence_score
+      ) b
+    ) d
+    GROUP BY d.dimension, d.bucket
+    HAVING SUM(d.delta) <> 0
+    ORDER BY d.dimension, d.bucket
+    ON CONFLICT (dimension, bucket) DO UPDATE
+      SET count = road_damage_rollups.count + EXCLUDED.count;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS road_damage_rollups_changed ON public.road_damage;
+
+-- Transition tables need one trigger per event
+CREATE TRIGGER road_damage_rollups_inserted
+  AFTER INSERT ON public.road_damage
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.apply_road_damage_rollups();
+
+CREATE TRIGGER road_damage_rollups_updated
+  AFTER UPDATE ON public.road_damage
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.apply_road_damage_rollups();
+
+CREATE TRIGGER road_damage_rollups_deleted
+  AFTER DELETE ON public.road_damage
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT
+  EXECUTE FUNCTION public.apply_road_damage_rollups();
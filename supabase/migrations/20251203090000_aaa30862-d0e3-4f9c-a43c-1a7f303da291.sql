@@ -0,0 +1,17 @@
+-- road_damage_rollups was readable by anyone, exposing per-state and per-day
+-- counts of detections that road_damage only shows within a user's
+-- jurisdiction. Buckets such as the total and the days mix every
+-- jurisdiction, so they cannot be filtered per user; only admins and federal
+-- users, who can already see every road_damage row, may read them directly.
+-- The backend reads them with the service-role key, which bypasses RLS.
+DROP POLICY IF EXISTS "Anyone can view road damage rollups" ON public.road_damage_rollups;
+
+CREATE POLICY "Admins and federal users can view road damage rollups"
+ON public.road_damage_rollups
+FOR SELECT
+USING (
+  public.is_admin(auth.uid())
+  OR (EXISTS ( SELECT 1
+     FROM user_roles
+    WHERE ((user_roles.user_id = auth.uid()) AND (user_roles.role = 'federal'::app_role))))
+);